@@ -0,0 +1,69 @@
+"""community question embeddings: cosine HNSW index
+
+Revision ID: 0013_community_embedding_hnsw
+Revises: 0012_community_posts_discovery
+Create Date: 2026-10-19 12:00:00.000000
+
+Replaces the default-opclass (L2) ivfflat index from 0008 with a cosine index
+(vector_cosine_ops), matching the ``<=>`` ordering used by similarity search.
+The type is taken from PGVECTOR_INDEX_TYPE (``hnsw`` by default, or
+``ivfflat`` with lists derived from the current row count). The DDL is inlined
+here (a snapshot of ``app.utils.pgvector_index.index_ddl``) so the migration
+does not change when the app module does.
+
+Postgres only: SQLite deployments search an in-process index instead.
+"""
+import math
+import os
+
+from alembic import op
+from sqlalchemy import inspect as sa_inspect, text
+
+# revision identifiers, used by Alembic.
+revision = '0013_community_embedding_hnsw'
+down_revision = '0012_community_posts_discovery'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "idx_community_questions_embedding"
+
+
+def _index_ddl(rows: int) -> str:
+    kind = os.getenv("PGVECTOR_INDEX_TYPE", "hnsw")
+    if kind == "hnsw":
+        m = int(os.getenv("PGVECTOR_HNSW_M", 16))
+        ef_construction = int(os.getenv("PGVECTOR_HNSW_EF_CONSTRUCTION", 64))
+        params = f"m = {m}, ef_construction = {ef_construction}"
+    elif kind == "ivfflat":
+        lists = int(os.getenv("PGVECTOR_IVFFLAT_LISTS", 0))
+        if not lists:
+            lists = max(10, rows // 1000) if rows <= 1_000_000 else int(math.sqrt(rows))
+        params = f"lists = {lists}"
+    else:
+        raise ValueError(f"Unknown vector index type '{kind}', expected one of ('hnsw', 'ivfflat')")
+    return (
+        f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} "
+        f"ON community_questions USING {kind} (embedding vector_cosine_ops) WITH ({params})"
+    )
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    return table_name in sa_inspect(bind).get_table_names()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _table_exists("community_questions"):
+        return
+    rows = bind.execute(text("SELECT count(*) FROM community_questions")).scalar() or 0
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+    op.execute(_index_ddl(rows))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _table_exists("community_questions"):
+        return
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON community_questions USING ivfflat (embedding)")
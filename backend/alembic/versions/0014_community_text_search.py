@@ -0,0 +1,74 @@
+"""community questions full-text index for hybrid search
+
+Revision ID: 0014_community_text_search
+Revises: 0013_community_embedding_hnsw
+Create Date: 2026-10-19 13:00:00.000000
+
+Postgres: GIN index on to_tsvector('simple', question_text).
+SQLite: FTS5 table community_questions_fts plus sync triggers, backfilled
+from existing rows.
+
+Idempotent (IF NOT EXISTS throughout); the same DDL also runs at startup
+from ``app.utils.text_search``. It is inlined here so the revision stays fixed
+and does not import the app (or its database engine).
+"""
+from alembic import op
+from sqlalchemy import inspect as sa_inspect, text
+
+# revision identifiers, used by Alembic.
+revision = '0014_community_text_search'
+down_revision = '0013_community_embedding_hnsw'
+branch_labels = None
+depends_on = None
+
+FTS_TABLE = "community_questions_fts"
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+        USING fts5(question_id UNINDEXED, question_text, tokenize="unicode61 categories 'L* N* Co M*'")""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON community_questions BEGIN
+        INSERT INTO {FTS_TABLE} (question_id, question_text) VALUES (new.id, new.question_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF question_text ON community_questions BEGIN
+        UPDATE {FTS_TABLE} SET question_text = new.question_text WHERE question_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON community_questions BEGIN
+        DELETE FROM {FTS_TABLE} WHERE question_id = old.id;
+    END""",
+]
+
+_POSTGRES_DDL = [
+    "CREATE INDEX IF NOT EXISTS idx_community_questions_text_search "
+    "ON community_questions USING gin (to_tsvector('simple', coalesce(question_text, '')))",
+]
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    return table_name in sa_inspect(bind).get_table_names()
+
+
+def upgrade() -> None:
+    if not _table_exists("community_questions"):
+        return
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for statement in _SQLITE_DDL:
+            op.execute(statement)
+        if not bind.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar():
+            op.execute(
+                f"INSERT INTO {FTS_TABLE} (question_id, question_text) SELECT id, question_text FROM community_questions"
+            )
+    elif bind.dialect.name == "postgresql":
+        for statement in _POSTGRES_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS idx_community_questions_text_search")
+    elif bind.dialect.name == "sqlite":
+        for suffix in ("ai", "au", "ad"):
+            op.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
@@ -0,0 +1,65 @@
+"""community questions: duplicate_of_id link to an answered thread
+
+Revision ID: 0015_community_duplicate_of
+Revises: 0014_community_text_search
+Create Date: 2026-10-19 14:00:00.000000
+
+Questions matched at post time to an already answered question in the same
+district point at it through duplicate_of_id. Idempotent; the foreign key is
+only declared on Postgres (SQLite cannot add one with ALTER TABLE).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = '0015_community_duplicate_of'
+down_revision = '0014_community_text_search'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    return table_name in sa_inspect(bind).get_table_names()
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    return column_name in [c["name"] for c in sa_inspect(bind).get_columns(table_name)]
+
+
+def _index_exists(index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa_inspect(bind)
+    for table in inspector.get_table_names():
+        if index_name in [i["name"] for i in inspector.get_indexes(table)]:
+            return True
+    return False
+
+
+def upgrade() -> None:
+    if not _table_exists("community_questions"):
+        return
+    if not _column_exists("community_questions", "duplicate_of_id"):
+        if op.get_bind().dialect.name == "postgresql":
+            column = sa.Column("duplicate_of_id", UUID(as_uuid=True),
+                               sa.ForeignKey("community_questions.id"), nullable=True)
+        else:
+            column = sa.Column("duplicate_of_id", sa.String(length=36), nullable=True)
+        op.add_column("community_questions", column)
+    if not _index_exists("ix_community_questions_duplicate_of_id"):
+        op.create_index("ix_community_questions_duplicate_of_id", "community_questions", ["duplicate_of_id"])
+
+
+def downgrade() -> None:
+    try:
+        op.drop_index("ix_community_questions_duplicate_of_id", table_name="community_questions")
+    except Exception:
+        pass
+    if _table_exists("community_questions") and _column_exists("community_questions", "duplicate_of_id"):
+        try:
+            op.drop_column("community_questions", "duplicate_of_id")
+        except Exception:
+            pass
@@ -0,0 +1,59 @@
+"""community feed keyset pagination indexes
+
+Revision ID: 0016_community_feed_keyset_indexes
+Revises: 0015_community_duplicate_of
+Create Date: 2026-10-19 15:00:00.000000
+
+Composite indexes matching the feed's keyset orderings ("new": created_at,
+id; "top": upvotes_count, created_at, id), with and without the district
+filter. Also backfills NULL upvotes_count to 0: a NULL sort key would drop
+rows from keyset comparisons.
+
+Idempotent: existence checks make it safe to re-run on Postgres and SQLite.
+"""
+from alembic import op
+from sqlalchemy import inspect as sa_inspect
+
+# revision identifiers, used by Alembic.
+revision = '0016_community_feed_keyset_indexes'
+down_revision = '0015_community_duplicate_of'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "idx_community_questions_feed_new": ["is_archived", "created_at", "id"],
+    "idx_community_questions_feed_top": ["is_archived", "upvotes_count", "created_at", "id"],
+    "idx_community_questions_feed_district_new": ["district", "is_archived", "created_at", "id"],
+    "idx_community_questions_feed_district_top": ["district", "is_archived", "upvotes_count", "created_at", "id"],
+}
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    return table_name in sa_inspect(bind).get_table_names()
+
+
+def _index_exists(index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa_inspect(bind)
+    for table in inspector.get_table_names():
+        if index_name in [i["name"] for i in inspector.get_indexes(table)]:
+            return True
+    return False
+
+
+def upgrade() -> None:
+    if not _table_exists("community_questions"):
+        return
+    op.execute("UPDATE community_questions SET upvotes_count = 0 WHERE upvotes_count IS NULL")
+    for name, columns in INDEXES.items():
+        if not _index_exists(name):
+            op.create_index(name, "community_questions", columns)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        try:
+            op.drop_index(name, table_name="community_questions")
+        except Exception:
+            pass
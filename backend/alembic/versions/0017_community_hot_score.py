@@ -0,0 +1,103 @@
+"""community questions: stored hot_score for the trending feed
+
+Revision ID: 0017_community_hot_score
+Revises: 0016_community_feed_keyset_indexes
+Create Date: 2026-10-19 16:00:00.000000
+
+Adds hot_score (time-decayed engagement, see app.services.community_ranking),
+backfills it for existing posts, and indexes it for keyset pagination with
+and without the district filter. The backfill uses a copy of the formula with
+the default weights; the periodic recompute job rescores rows if HOT_*
+settings differ.
+
+Idempotent: existence checks make it safe to re-run on Postgres and SQLite.
+"""
+import math
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect as sa_inspect
+
+# revision identifiers, used by Alembic.
+revision = '0017_community_hot_score'
+down_revision = '0016_community_feed_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "idx_community_questions_feed_hot": ["is_archived", "hot_score", "created_at", "id"],
+    "idx_community_questions_feed_district_hot": ["district", "is_archived", "hot_score", "created_at", "id"],
+}
+
+HOT_DECAY_HOURS = 36.0
+HOT_ANSWER_WEIGHT = 2.0
+_EPOCH = datetime(2024, 1, 1)
+
+
+def _hot_score(upvotes, answers, created_at) -> float:
+    engagement = 1 + max(upvotes or 0, 0) + HOT_ANSWER_WEIGHT * max(answers or 0, 0)
+    age_hours = ((created_at or datetime.utcnow()) - _EPOCH).total_seconds() / 3600
+    return round(math.log10(engagement) + age_hours / HOT_DECAY_HOURS, 6)
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    return table_name in sa_inspect(bind).get_table_names()
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    return column_name in [c["name"] for c in sa_inspect(bind).get_columns(table_name)]
+
+
+def _index_exists(index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa_inspect(bind)
+    for table in inspector.get_table_names():
+        if index_name in [i["name"] for i in inspector.get_indexes(table)]:
+            return True
+    return False
+
+
+def upgrade() -> None:
+    if not _table_exists("community_questions"):
+        return
+    if not _column_exists("community_questions", "hot_score"):
+        op.add_column(
+            "community_questions",
+            sa.Column("hot_score", sa.Float(), nullable=False, server_default="0"),
+        )
+
+    # Backfill in Python: SQLite builds may lack log10. The typed column
+    # parses SQLite's stored datetime strings.
+    bind = op.get_bind()
+    questions = sa.table(
+        "community_questions",
+        sa.column("id"), sa.column("upvotes_count"), sa.column("answers_count"),
+        sa.column("created_at", sa.DateTime()),
+    )
+    rows = bind.execute(sa.select(questions)).all()
+    updates = [
+        {"row_id": row_id, "hot": _hot_score(upvotes, answers, created_at)}
+        for row_id, upvotes, answers, created_at in rows
+    ]
+    if updates:
+        bind.execute(sa.text("UPDATE community_questions SET hot_score = :hot WHERE id = :row_id"), updates)
+
+    for name, columns in INDEXES.items():
+        if not _index_exists(name):
+            op.create_index(name, "community_questions", columns)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        try:
+            op.drop_index(name, table_name="community_questions")
+        except Exception:
+            pass
+    if _table_exists("community_questions") and _column_exists("community_questions", "hot_score"):
+        try:
+            op.drop_column("community_questions", "hot_score")
+        except Exception:
+            pass
@@ -23,6 +23,7 @@ from app.services.community_service import (
     toggle_question_upvote,
     can_generate_ai_answer,
     save_ai_answer,
+    get_thread_answer,
 )
 from app.utils.profile_context import get_farmer_context
 from app.crews.krishi_crew import KrishiCrew
@@ -88,8 +89,9 @@ async def _resolve_district(db: AsyncSession, current_user: User, override: Opti
 async def list_posts_endpoint(
     district: Optional[str] = Query(None),
     crop: Optional[str] = Query(None),
-    sort: str = Query("new", pattern="^(top|new)$"),
+    sort: str = Query("new", pattern="^(top|new|hot)$"),
     page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (preferred over page)"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -101,7 +103,10 @@ async def list_posts_endpoint(
             sort=sort,
             page=page,
             viewer_id=current_user.external_id,
+            cursor=cursor,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception:
         logger.exception("Listing community posts failed")
         raise HTTPException(status_code=500, detail="Failed to list posts")
@@ -131,7 +136,12 @@ async def create_post(
             photo_url=payload.photo_url,
             district=district,
         )
-        return {"id": str(question.id), "status": question.status, "district": question.district}
+        response = {"id": str(question.id), "status": question.status, "district": question.district}
+        if question.duplicate_of_id:
+            # Near-identical question already answered in this district: answer right away
+            response["duplicate_of"] = str(question.duplicate_of_id)
+            response["answer"] = await get_thread_answer(db, question.duplicate_of_id)
+        return response
     except Exception:
         logger.exception("Community post creation failed")
         raise HTTPException(status_code=500, detail="Failed to create post")
@@ -220,6 +230,12 @@ async def generate_post_ai_answer(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
+    # Linked duplicates reuse their thread's answer instead of a new generation.
+    if post.get("duplicate_of_id"):
+        thread_answer = await get_thread_answer(db, post["duplicate_of_id"])
+        if thread_answer:
+            return {"ai_answer": thread_answer["answer_text"], "post": post, "duplicate_of": thread_answer}
+
     district_context = await get_farmer_context(current_user.id, db)
 
     # 3. Build the CrewAI task — same setup as the rest of the community module.
@@ -295,13 +311,15 @@ async def submit_question(
 
 @router.get("/questions")
 async def list_questions(
-    query: Optional[str] = Query(None, description="Search query for semantic community question matching"),
+    query: Optional[str] = Query(None, description="Search query (keyword + semantic community question matching)"),
     limit: int = Query(20, ge=1, le=100),
+    crop_type: Optional[str] = Query(None, description="Restrict search results to one crop"),
+    district: Optional[str] = Query(None, description="Restrict search results to one district"),
     db: AsyncSession = Depends(get_db),
 ):
     try:
         if query:
-            return await search_community_questions(db, query, limit=limit)
+            return await search_community_questions(db, query, limit=limit, crop_type=crop_type, district=district)
         return await get_recent_questions(db, limit=limit)
     except Exception as e:
         import logging
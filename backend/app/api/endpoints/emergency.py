@@ -12,9 +12,11 @@ from app.services.emergency_service import (
     list_insurance_providers,
     create_damage_report,
     get_damage_report,
+    ingest_report_photos,
     submit_claim,
     log_helpline_call,
 )
+from app.services.damage_assessment import MAX_REPORT_PHOTOS, assess_damage_batch_async
 from app.crews.krishi_crew import EmergencyResponseCrew
 
 logger = logging.getLogger(__name__)
@@ -32,6 +34,10 @@ class DamageReportCreate(BaseModel):
     voice_statement_transcribed: Optional[str] = None
     image_data: Optional[List[str]] = None
 
+class DamageAssessRequest(BaseModel):
+    crop_type: str = "general"
+    image_data: List[str]
+
 class ClaimRequest(BaseModel):
     insurance_provider_id: Optional[str] = None
 
@@ -51,6 +57,22 @@ async def get_providers(db: AsyncSession = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/reports/assess")
+async def assess_report_photos(
+    payload: DamageAssessRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Batch damage assessment: per-photo and aggregate damage percentages for
+    all photos of a report, computed in one vectorized pass.
+    """
+    if not payload.image_data:
+        raise HTTPException(status_code=400, detail="No images provided")
+    if len(payload.image_data) > MAX_REPORT_PHOTOS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_REPORT_PHOTOS} photos per report")
+    result = await assess_damage_batch_async(payload.image_data)
+    return {"crop_type": payload.crop_type, **result}
+
 @router.post("/reports")
 async def create_report(
     payload: DamageReportCreate,
@@ -61,7 +83,21 @@ async def create_report(
     AI-Powered Damage Assessment.
     Uses EmergencyResponseCrew to generate a structured official report from images and voice.
     """
+    if payload.image_data and len(payload.image_data) > MAX_REPORT_PHOTOS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_REPORT_PHOTOS} photos per report")
     try:
+        # 0. Store and assess all photos in one batch so the crew gets measured evidence
+        photo_paths, photo_assessment = (
+            await ingest_report_photos(payload.image_data) if payload.image_data else (None, None)
+        )
+        photo_summary = ""
+        if photo_assessment and photo_assessment["aggregate"]["count"]:
+            agg = photo_assessment["aggregate"]
+            photo_summary = (
+                f"Photo analysis of {agg['count']} images: mean damage {agg['mean_damage_percent']}%, "
+                f"max {agg['max_damage_percent']}%. "
+            )
+
         # 1. Use the Specialized Emergency Crew to generate the official report text
         from crewai import Task
         from app.agents.emergency_response import emergency_response
@@ -71,6 +107,7 @@ async def create_report(
                 f"Analyze the crop damage for {payload.crop_type}. "
                 f"Cause: {payload.damage_cause}. Estimate: {payload.damage_estimate_percent}%. "
                 f"Voice testimony: {payload.voice_statement_transcribed}. "
+                f"{photo_summary}"
                 "Generate a formal a damage assessment report for insurance and government relief."
             ),
             expected_output="A professional, structured damage assessment report including a summary of loss and specific evidence markers.",
@@ -104,8 +141,14 @@ async def create_report(
             insurance_provider_id=payload.insurance_provider_id,
             voice_statement_transcribed=f"AI Analysis: {str(report_text)}\nOriginal: {payload.voice_statement_transcribed}",
             image_data=payload.image_data,
+            image_paths=photo_paths,
         )
-        return {"id": str(report.id), "status": report.status, "ai_report": str(report_text)}
+        return {
+            "id": str(report.id),
+            "status": report.status,
+            "ai_report": str(report_text),
+            "photo_assessment": photo_assessment,
+        }
     except Exception as e:
         logger.error(f"Emergency report generation failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
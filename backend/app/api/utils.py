@@ -1,56 +1,81 @@
 import os
+import asyncio
+import hashlib
 import aiofiles
-from uuid import uuid4
 from dotenv import load_dotenv
 from fastapi import HTTPException
 from PIL import Image
-import io
+from app.storage import KIND_AUDIO, KIND_IMAGE, get_file_store
+from app.services.image_processing import process_image_file_async
 
 load_dotenv()
 UPLOAD_DIR = os.getenv('UPLOAD_DIR', '/tmp/uploads')
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_AUDIO_BYTES = 25_000_000
+MAX_IMAGE_BYTES = 10_000_000
+
+
+async def stream_upload(upload_file, kind, max_bytes, too_large_detail):
+    """
+    Copy an UploadFile to a temp file in the file store chunk by chunk,
+    hashing as bytes arrive and aborting with 413 once max_bytes is exceeded.
+    Returns (tmp_path, sha256 hex digest).
+    """
+    if upload_file.size is not None and upload_file.size > max_bytes:
+        raise HTTPException(413, too_large_detail)
+
+    tmp_path = get_file_store().temp_path(kind)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, 'wb') as out:
+            while True:
+                chunk = await upload_file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(413, too_large_detail)
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()
+
 
 async def save_audio_local(upload_file):
     """
-    Save UploadFile to local UPLOAD_DIR and return the path.
-    Validates file size (max 25MB).
+    Stream UploadFile into the file store and return the path.
+    The file is named by its sha256 (see app.storage.content_hash).
+    Validates file size (max 25MB) while reading.
     """
-    content = await upload_file.read()
-    
-    # Validate file size (25MB max)
-    if len(content) > 25_000_000:
-        raise HTTPException(413, "Audio too large. Maximum 25MB.")
-    
-    suffix = os.path.splitext(upload_file.filename)[1] or '.webm'
-    dest = os.path.join(UPLOAD_DIR, f"{uuid4().hex}{suffix}")
-    async with aiofiles.open(dest, 'wb') as out:
-        await out.write(content)
-    return dest
+    tmp_path, digest = await stream_upload(upload_file, KIND_AUDIO, MAX_AUDIO_BYTES, "Audio too large. Maximum 25MB.")
+    suffix = os.path.splitext(upload_file.filename or '')[1] or '.webm'
+    return await asyncio.to_thread(get_file_store().commit_file, KIND_AUDIO, tmp_path, digest, suffix)
+
 
 async def save_image_local(upload_file):
     """
-    Save uploaded image file to local UPLOAD_DIR and return the path.
-    Validates file size (max 10MB) and resizes image.
+    Save uploaded image file to the file store and return the path.
+    Validates file size (max 10MB) while streaming, then decodes it once on the
+    CPU executor into a 1024px main image plus WebP size variants.
     """
-    content = await upload_file.read()
-    
-    # Validate file size (10MB max)
-    if len(content) > 10_000_000:
-        raise HTTPException(413, "Image too large. Maximum 10MB.")
-    
-    # Resize image
-    img = Image.open(io.BytesIO(content))
-    img.thumbnail((1024, 1024))
-    buf = io.BytesIO()
-    img.save(buf, format=img.format or 'JPEG', quality=85)
-    content = buf.getvalue()
-    
-    suffix = os.path.splitext(upload_file.filename)[1] or '.jpg'
+    tmp_path, digest = await stream_upload(upload_file, KIND_IMAGE, MAX_IMAGE_BYTES, "Image too large. Maximum 10MB.")
+
+    suffix = (os.path.splitext(upload_file.filename or '')[1] or '.jpg').lower()
     # Ensure valid image extension
     if suffix not in ['.jpg', '.jpeg', '.png', '.webp']:
         suffix = '.jpg'
-    dest = os.path.join(UPLOAD_DIR, f"{uuid4().hex}{suffix}")
-    async with aiofiles.open(dest, 'wb') as out:
-        await out.write(content)
-    return dest
\ No newline at end of file
+    try:
+        processed = await process_image_file_async(tmp_path, digest, suffix)
+    except Image.DecompressionBombError:
+        raise HTTPException(413, "Image dimensions too large.")
+    except (OSError, SyntaxError, ValueError) as e:
+        raise HTTPException(400, f"Invalid image: {e}")
+    finally:
+        os.remove(tmp_path)
+    return processed["path"]
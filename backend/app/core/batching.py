@@ -0,0 +1,116 @@
+"""
+Dynamic micro-batching for in-process model inference.
+
+Callers submit single items from any thread or event loop; one worker thread
+collects them into batches of at most ``max_batch_size``, waiting no longer
+than ``max_wait_ms`` after the first item arrives, and runs ``process_batch``
+once per batch. Under load this turns many small forward passes into a few
+large ones; when idle a lone request only pays the short wait.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class DynamicBatcher(Generic[T, R]):
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], Sequence[R]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "batcher",
+    ) -> None:
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._queue: "queue.Queue[Optional[Tuple[T, Future, float]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item: T) -> "Future[R]":
+        """Queue one item; the future resolves with its result."""
+        self._ensure_worker()
+        future: "Future[R]" = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    async def infer(self, item: T) -> R:
+        return await asyncio.wrap_future(self.submit(item))
+
+    def infer_sync(self, item: T, timeout: Optional[float] = None) -> R:
+        return self.submit(item).result(timeout)
+
+    def _collect(self, first: Tuple[T, Future, float]) -> Tuple[List[Tuple[T, Future, float]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            now = time.perf_counter()
+            for _, _, enqueued in batch:
+                metrics.observe(f"{self.name}_queue_seconds", now - enqueued)
+            batch = [(item, fut) for item, fut, _ in batch if fut.set_running_or_notify_cancel()]
+            if batch:
+                self._execute(batch)
+            if stop:
+                return
+
+    def _execute(self, batch: List[Tuple[T, Future]]) -> None:
+        start = time.perf_counter()
+        try:
+            results = self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: expected {len(batch)} results, got {len(results)}")
+        except Exception as exc:
+            for _, fut in batch:
+                fut.set_exception(exc)
+            metrics.inc(f"{self.name}_errors")
+            return
+        for (_, fut), result in zip(batch, results):
+            fut.set_result(result)
+        metrics.observe(f"{self.name}_batch_size", len(batch))
+        metrics.observe(f"{self.name}_batch_seconds", time.perf_counter() - start)
+
+    def close(self) -> None:
+        """Stop the worker after the items already queued are processed."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._queue.put(None)
+        if thread is not None:
+            thread.join(timeout=5)
@@ -0,0 +1,88 @@
+"""
+Shared executors for blocking work that must stay off the event loop.
+
+Pools are created lazily so importing this module is free; size them with
+environment variables on constrained hosts.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Coroutine, Optional
+
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", os.cpu_count() or 2))
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+SCAN_JOB_TIMEOUT_S = float(os.getenv("SCAN_JOB_TIMEOUT_S", 15))
+
+_cpu_executor: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_lock = threading.Lock()
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Worker pool for image decoding/encoding and other C-level CPU work."""
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+    return _cpu_executor
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Worker processes for CPU work that holds the GIL (barcode decoding, OCR
+    preprocessing). Spawned rather than forked so workers never inherit the
+    app's threads and locks.
+    """
+    global _process_pool
+    with _background_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=SCAN_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+
+async def run_in_process(fn: Callable[..., Any], *args: Any, timeout: float) -> Any:
+    """
+    Run a picklable ``fn`` in the process pool and wait at most ``timeout``
+    seconds (raises ``asyncio.TimeoutError``). The job itself is not killed,
+    so ``fn`` should bound its own runtime too. A broken pool, e.g. after a
+    worker crash, is replaced on the next call.
+    """
+    global _process_pool
+    pool = get_process_pool()
+    try:
+        return await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(pool, fn, *args), timeout)
+    except BrokenProcessPool:
+        with _background_lock:
+            if _process_pool is pool:
+                _process_pool = None
+        raise
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    with _background_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _background_loop
+    with _background_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="async-bridge", daemon=True).start()
+            _background_loop = loop
+    return _background_loop
+
+
+def run_coroutine_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run ``coro`` from synchronous code (crew tools run in worker threads) on a
+    long-lived background loop, so pooled async clients are reused across calls.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
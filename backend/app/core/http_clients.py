@@ -0,0 +1,53 @@
+"""
+Shared, pooled HTTP clients for outbound model APIs.
+
+Async clients hold connections bound to the event loop that created them, so
+one client is kept per running loop: the app's loop for endpoints, and the
+background loop (see ``executors.run_coroutine_sync``) for sync callers such
+as crew tools.
+"""
+
+import asyncio
+import weakref
+from typing import Any, Dict
+
+import httpx
+
+HTTP_MAX_CONNECTIONS = 50
+HTTP_MAX_KEEPALIVE = 20
+
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_groq_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled AsyncClient for the running loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+        )
+        _http_clients[loop] = client
+    return client
+
+
+def get_async_groq(api_key: str):
+    """AsyncGroq client for the running loop, sharing its connection pool."""
+    from groq import AsyncGroq
+
+    loop = asyncio.get_running_loop()
+    clients = _groq_clients.setdefault(loop, {})
+    if api_key not in clients:
+        clients[api_key] = AsyncGroq(api_key=api_key, http_client=get_http_client())
+    return clients[api_key]
+
+
+async def close_http_clients() -> None:
+    """Close the clients owned by the running loop (app shutdown)."""
+    loop = asyncio.get_running_loop()
+    _groq_clients.pop(loop, None)
+    client = _http_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,53 @@
+"""
+Small SQLite-backed persistent tier for in-process caches.
+
+One connection per store, shared across threads behind a lock, in WAL mode so
+readers in other processes are not blocked. Cache modules define their own
+schema through ``init_sql``.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional
+
+
+class SQLiteStore:
+    def __init__(self, path: str, init_sql: str) -> None:
+        self.path = path
+        self._init_sql = init_sql
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._init_sql)
+            self._conn = conn
+        return self._conn
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self._connect().execute(sql, tuple(params)).fetchall()
+
+    def execute(self, sql: str, params: Iterable[Any] = ()) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(sql, tuple(params))
+            conn.commit()
+
+    def executemany(self, sql: str, rows: Iterable[Iterable[Any]]) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(sql, [tuple(r) for r in rows])
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -11,6 +11,7 @@ Switch providers by changing LLM_PROVIDER in .env file
 """
 
 import os
+import threading
 from typing import Optional, Dict, Any
 from enum import Enum
 import logging
@@ -87,6 +88,18 @@ class LLMConfig:
         self.stt_model_id = os.getenv("STT_MODEL_ID", "mozilla-ai/whisper-large-v3-bn")
         self.stt_fallback_model_id = os.getenv("STT_FALLBACK_MODEL_ID", "openai/whisper-large-v2")
         self.huggingface_speech_model = os.getenv("HUGGINGFACE_SPEECH_MODEL", "openai/whisper-large-v2")
+
+        # Local STT tier policy: short clips (or a busy STT queue) use the small
+        # checkpoint, long or unclear clips go to the large one.
+        self.stt_small_model_id = os.getenv("STT_SMALL_MODEL_ID", "openai/whisper-small")
+        self.stt_short_clip_seconds = float(os.getenv("STT_SHORT_CLIP_SECONDS", 8))
+        self.stt_long_clip_seconds = float(os.getenv("STT_LONG_CLIP_SECONDS", 30))
+        self.stt_queue_high_watermark = int(os.getenv("STT_QUEUE_HIGH_WATERMARK", 4))
+        # Clips longer than this are split at silences and transcribed as one
+        # batched pipeline call of up to stt_chunk_batch_size chunks at a time.
+        self.stt_chunk_seconds = float(os.getenv("STT_CHUNK_SECONDS", 25))
+        self.stt_chunk_overlap_seconds = float(os.getenv("STT_CHUNK_OVERLAP_SECONDS", 1.0))
+        self.stt_chunk_batch_size = int(os.getenv("STT_CHUNK_BATCH_SIZE", 4))
         
         if self.provider == LLMProvider.GEMINI and not self.gemini_api_key:
             raise ValueError("GEMINI_API_KEY not set in .env")
@@ -399,19 +412,23 @@ def get_llm_provider() -> BaseLLMProvider:
 
 # Global provider instance (lazy-loaded)
 _provider: Optional[BaseLLMProvider] = None
-_stt_pipeline: Optional[Any] = None
+_stt_pipelines: Dict[str, Any] = {}
+_stt_pipelines_lock = threading.Lock()
+
+STT_TIER_SMALL = "small"
+STT_TIER_LARGE = "large"
 
 
-def _load_local_stt_pipeline() -> Any:
+def _load_local_stt_pipeline(tier: str = STT_TIER_LARGE) -> Any:
     config = get_llm_config()
     try:
         from transformers import pipeline
     except ImportError as exc:
         raise ImportError("transformers is required for local STT support. Install with `pip install transformers`.") from exc
 
-    model_id = config.stt_model_id
+    model_id = config.stt_small_model_id if tier == STT_TIER_SMALL else config.stt_model_id
     fallback_id = config.stt_fallback_model_id
-    if config.is_basic_space and "large" in model_id.lower():
+    if tier == STT_TIER_LARGE and config.is_basic_space and "large" in model_id.lower():
         logger.warning(
             "Hardware constraints detected: forcing STT fallback from %s to %s.", model_id, fallback_id
         )
@@ -425,12 +442,14 @@ def _load_local_stt_pipeline() -> Any:
         return pipeline("automatic-speech-recognition", model=fallback_id, device=device)
 
 
-def init_stt_pipeline() -> Any:
-    global _stt_pipeline
-    if _stt_pipeline is None:
-        _stt_pipeline = _load_local_stt_pipeline()
-        logger.info("Local STT pipeline initialized.")
-    return _stt_pipeline
+def init_stt_pipeline(tier: str = STT_TIER_LARGE) -> Any:
+    """Return the local Whisper pipeline for the given tier, loading it once."""
+    if tier not in _stt_pipelines:
+        with _stt_pipelines_lock:
+            if tier not in _stt_pipelines:
+                _stt_pipelines[tier] = _load_local_stt_pipeline(tier)
+                logger.info("Local STT pipeline initialized (tier=%s).", tier)
+    return _stt_pipelines[tier]
 
 
 def init_llm_provider() -> BaseLLMProvider:
@@ -188,6 +188,24 @@ async def save_conversation_to_db(
         logger.error("Failed to save conversation", error=str(e), user_id=user_db_id)
         return None
 
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-run
+_background_tasks: set = set()
+
+def spawn_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def persist_turn(user_db_id: int, external_id: str, transcript: str, reply_text: str, metadata: dict = None):
+    """Save a finished exchange and extract memory facts on a session of its own."""
+    async with AsyncSessionLocal() as db:
+        saved_conv_id = await save_conversation_to_db(db, user_db_id, transcript, reply_text, metadata=metadata)
+        try:
+            await MemoryService.extract_and_save_facts(db, external_id, transcript, conv_id=saved_conv_id)
+        except Exception as mem_err:
+            logger.warning("Memory extraction failed", error=str(mem_err), user_id=user_db_id)
+
 def _parse_allowed_origins() -> list[str]:
     raw_origins = os.getenv(
         "CORS_ALLOW_ORIGINS",
@@ -240,9 +258,21 @@ async def create_database_tables():
 
             await conn.run_sync(Base.metadata.create_all)
             print("[INFO] Database tables created or already exist.")
+
+            # Full-text index for hybrid search (tables created earlier miss the create hook)
+            from app.utils.text_search import ensure_lexical_index
+            await conn.run_sync(ensure_lexical_index)
     except Exception as e:
         print(f"[ERROR] Database initialization failed: {e}")
 
+    # SQLite has no pgvector: load (or rebuild) the in-process vector indexes
+    try:
+        import app.services.community_service  # noqa: F401 - registers tracked embeddings
+        from app.utils.vector_utils import load_local_indexes
+        await load_local_indexes()
+    except Exception as e:
+        logger.error(f"Vector index load failed: {e}")
+
 app.include_router(api_routes.router, prefix="/api")
 app.include_router(auth_routes.router, prefix="/api/auth", tags=["auth"])
 app.include_router(market_routes.router, prefix="/api/market", tags=["market"])
@@ -312,9 +342,41 @@ async def daily_notification_job():
         except Exception as e:
             logger.error(f"Scheduler error: {e}")
 
+async def storage_gc_job():
+    """Apply per-type retention and quotas to the upload/TTS file store."""
+    from app.storage import get_file_store
+    try:
+        stats = await asyncio.to_thread(get_file_store().gc)
+        logger.info("Storage GC finished", deleted=sum(s["deleted"] for s in stats.values()))
+    except Exception as e:
+        logger.error(f"Storage GC error: {e}")
+
+async def vector_index_save_job():
+    """Persist local vector indexes that changed; reload any another process rewrote."""
+    from app.utils.vector_utils import sync_local_indexes
+    try:
+        await sync_local_indexes()
+    except Exception as e:
+        logger.error(f"Vector index save error: {e}")
+
+async def hot_score_recompute_job():
+    """Rescore community posts in bulk (drift repair; events keep scores current)."""
+    from app.services.community_ranking import recompute_hot_scores
+    try:
+        await recompute_hot_scores()
+    except Exception as e:
+        logger.error(f"Hot score recompute error: {e}")
+
 @app.on_event("startup")
 async def start_scheduler():
+    from app.storage import STORAGE_GC_INTERVAL_MINUTES
+    from app.utils.vector_utils import USE_LOCAL_INDEX
+    from app.services.community_ranking import HOT_RECOMPUTE_INTERVAL_MINUTES
     scheduler.add_job(daily_notification_job, 'cron', hour=6, minute=0)
+    scheduler.add_job(storage_gc_job, 'interval', minutes=STORAGE_GC_INTERVAL_MINUTES)
+    scheduler.add_job(hot_score_recompute_job, 'interval', minutes=HOT_RECOMPUTE_INTERVAL_MINUTES)
+    if USE_LOCAL_INDEX:
+        scheduler.add_job(vector_index_save_job, 'interval', minutes=10)
     scheduler.start()
     logger.info("Scheduler started")
 
@@ -322,9 +384,19 @@ async def start_scheduler():
     asyncio.create_task(task_worker_loop())
     logger.info("Async task worker started")
 
+    # Load the local vision model now rather than on the first diagnosis
+    from app.services.local_classifier import get_local_classifier_async
+    spawn_background(get_local_classifier_async())
+
 @app.on_event("shutdown")
 async def stop_scheduler():
+    from app.core.http_clients import close_http_clients
+    from app.core.executors import shutdown_process_pool
+    from app.utils.vector_utils import save_local_indexes
     scheduler.shutdown()
+    await close_http_clients()
+    shutdown_process_pool()
+    await asyncio.to_thread(save_local_indexes)
     logger.info("Scheduler stopped")
 
 # --- WebSocket Setup for Agent Status ---
@@ -356,6 +428,217 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         ws_manager.disconnect(websocket)
 
+GREETINGS = ["hello", "hi", "hey", "হ্যালো", "সালাম", "আসসালামু আলাইকুম", "hi there", "good morning"]
+GREETING_REPLY = "হ্যালো! আমি আপনার কৃষিবন্ধু। আমি কীভাবে সাহায্য করতে পারি? (Hello! I'm your KrishiBondhu. How can I help you today?)"
+
+
+async def _generate_agent_reply(transcript: str, initial_state: dict) -> str:
+    """Route a transcribed voice message through the interpreter crew."""
+    from app.crews.krishi_crew import KrishiCrew
+    from crewai import Task
+    from app.agents.bengali_interpreter import bengali_interpreter
+
+    clean_msg = transcript.lower().strip()
+    if clean_msg in GREETINGS:
+        return GREETING_REPLY
+
+    route_task = Task(
+        description=(
+            f"Process the user's message: {transcript}. "
+            "Interpret the intent and delegate to the appropriate expert agent to get the answer. "
+            "You must provide the final expert advice directly to the user."
+        ),
+        expected_output="A detailed, helpful answer in plain Bengali/English text. DO NOT output JSON.",
+        agent=bengali_interpreter
+    )
+
+    crew_obj = KrishiCrew()
+    crew = crew_obj.create_crew(tasks=[route_task])
+
+    result = await asyncio.to_thread(crew.kickoff, inputs=initial_state)
+    raw_reply = str(result)
+
+    import json
+    try:
+        data = json.loads(raw_reply)
+        if isinstance(data, dict):
+            parts = []
+            for k, v in data.items():
+                parts.append(f"{str(k).replace('_', ' ').title()}: {v}")
+            return "\n".join(parts)
+        return raw_reply
+    except Exception:
+        return raw_reply
+
+
+@app.websocket("/api/ws/stt")
+async def stt_stream_endpoint(websocket: WebSocket, token: str = ""):
+    """
+    Streaming speech recognition.
+
+    Protocol: an optional JSON ``{"type": "start", "sample_rate": 16000,
+    "lat": .., "lon": .., "lang": ..}`` message (8000, 16000 or 48000 Hz; any
+    other rate closes the socket with code 1003), then binary frames of 16-bit
+    mono PCM. Each VAD segment is transcribed as soon as it closes and sent
+    back as ``{"type": "partial"}``. On end-of-speech (or a ``{"type": "stop"}``
+    message) the server sends ``{"type": "final"}``, runs the agent pipeline
+    and sends ``{"type": "reply"}``. The socket keeps accepting the next
+    utterance while the reply is generated.
+    """
+    import json as _json
+    import numpy as np
+    from app.core.metrics import metrics
+    from app.core.security import decode_access_token
+    from app.services.audio import transcribe_pcm_segment, detect_language_from_text, is_unclear_transcript
+    from app.services.audio_chunking import stitch_transcripts
+    from app.services.streaming_stt import MAX_BACKLOG_SECONDS, MAX_PENDING_SEGMENTS, SUPPORTED_SAMPLE_RATES, StreamingTranscriber
+
+    payload = decode_access_token(token) if token else None
+    username = payload.get("sub") if payload else None
+    user = None
+    if username:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User).where(User.username == username))
+            user = result.scalars().first()
+    if user is None:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    session = {"sample_rate": 16000, "gps": {"lat": None, "lon": None}, "lang": None}
+    transcriber = StreamingTranscriber(sample_rate=session["sample_rate"])
+    texts: list = []
+    pending: list = []
+    backlog: list = []  # segments waiting for a free transcription slot
+    replies: set = set()  # agent replies still running for earlier utterances
+    last_send: asyncio.Task = None
+
+    async def transcribe_and_send(segment, index: int, previous: asyncio.Task):
+        try:
+            stt = await asyncio.to_thread(transcribe_pcm_segment, segment, session["sample_rate"])
+            text = stt.get("text", "").strip()
+        except Exception as e:
+            logger.warning("Streaming STT segment failed", error=str(e))
+            text = ""
+        # Keep partials in segment order even if a later segment finishes first.
+        if previous is not None:
+            await previous
+        texts.append(text)
+        if text:
+            await websocket.send_json({"type": "partial", "index": index, "text": text, "transcript": stitch_transcripts(texts)})
+
+    def schedule(segment=None) -> None:
+        """Transcribe ``segment``, or merge it into the backlog while too many are in flight."""
+        nonlocal last_send
+        if segment is not None:
+            if sum(len(s) for s in backlog) + len(segment) > MAX_BACKLOG_SECONDS * session["sample_rate"]:
+                metrics.inc("stt_stream_segments_dropped")
+                logger.warning("Streaming STT backlog full, dropping segment", user=username)
+                return
+            backlog.append(segment)
+        if not backlog or sum(1 for task in pending if not task.done()) >= MAX_PENDING_SEGMENTS:
+            return
+        merged = backlog[0] if len(backlog) == 1 else np.concatenate(backlog)
+        backlog.clear()
+        last_send = asyncio.create_task(transcribe_and_send(merged, len(pending), last_send))
+        # A finished transcription frees a slot for the backlog
+        last_send.add_done_callback(lambda _: schedule())
+        pending.append(last_send)
+
+    async def finish_utterance() -> None:
+        nonlocal last_send
+        segment = transcriber.flush()
+        if segment is not None:
+            schedule(segment)
+        # Let the backlog drain through the bounded slots before finalizing
+        while True:
+            running = [task for task in pending if not task.done()]
+            if running:
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            elif backlog:
+                schedule()
+            else:
+                break
+        if pending:
+            await asyncio.gather(*pending)
+        transcript = stitch_transcripts(texts)
+        language = session["lang"] or detect_language_from_text(transcript)
+        transcriber.reset()
+        texts.clear()
+        pending.clear()
+        last_send = None
+
+        if is_unclear_transcript(transcript):
+            await websocket.send_json({"type": "final", "transcript": transcript, "language": language, "unclear_audio": True})
+            return
+        await websocket.send_json({"type": "final", "transcript": transcript, "language": language})
+        # Reply in the background so the receive loop keeps reading the next utterance
+        reply = asyncio.create_task(send_reply(transcript, language))
+        replies.add(reply)
+        reply.add_done_callback(replies.discard)
+
+    async def send_reply(transcript: str, language: str) -> None:
+        initial_state = {
+            "user_id": user.external_id,
+            "gps": session["gps"],
+            "image_path": None,
+            "transcript": transcript,
+            "language": language,
+            "messages": [],
+        }
+        try:
+            reply_text = await _generate_agent_reply(transcript, initial_state)
+        except Exception as e:
+            logger.error("Streaming STT reply failed", error=str(e), traceback=traceback.format_exc())
+            await websocket.send_json({"type": "error", "code": "AGENT_ERROR", "message": "Something went wrong. Please try again."})
+            return
+        await websocket.send_json({"type": "reply", "transcript": transcript, "reply_text": reply_text})
+        spawn_background(persist_turn(
+            user.id, user.external_id, transcript, reply_text,
+            metadata={"gps": session["gps"], "stt_source": "streaming"},
+        ))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message.get("type") == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                for segment in transcriber.feed(message["bytes"]):
+                    schedule(segment)
+                if transcriber.end_of_speech:
+                    await finish_utterance()
+            elif message.get("text") is not None:
+                try:
+                    control = _json.loads(message["text"])
+                except ValueError:
+                    continue
+                if control.get("type") == "start":
+                    try:
+                        sample_rate = int(control.get("sample_rate", 16000))
+                    except (TypeError, ValueError):
+                        sample_rate = None
+                    if sample_rate not in SUPPORTED_SAMPLE_RATES:
+                        await websocket.send_json({
+                            "type": "error",
+                            "code": "UNSUPPORTED_SAMPLE_RATE",
+                            "message": f"sample_rate must be one of {', '.join(map(str, SUPPORTED_SAMPLE_RATES))}",
+                        })
+                        await websocket.close(code=1003)
+                        return
+                    session["sample_rate"] = sample_rate
+                    session["gps"] = {"lat": control.get("lat"), "lon": control.get("lon")}
+                    session["lang"] = control.get("lang")
+                    transcriber = StreamingTranscriber(sample_rate=session["sample_rate"])
+                elif control.get("type") == "stop" and (transcriber.heard_speech or pending):
+                    await finish_utterance()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        backlog.clear()
+        for task in [*pending, *replies]:
+            task.cancel()
+
 @app.post('/api/upload_audio')
 @limiter.limit("10/minute")
 async def upload_audio(
@@ -380,10 +663,13 @@ async def upload_audio(
         "messages": []
     }
 
-    stt_result = stt_node(initial_state)
+    # STT is blocking (model inference / remote calls); keep it off the event loop
+    # so concurrent uploads queue up in the STT tier policy instead of stalling.
+    stt_result = await asyncio.to_thread(stt_node, initial_state)
     transcript = stt_result.get("transcript", "").strip()
     language = stt_result.get("language", "en")
     stt_source = stt_result.get("stt_source")
+    stt_model_tier = stt_result.get("stt_model_tier")
 
     if stt_result.get("unclear"):
         return JSONResponse({
@@ -393,6 +679,7 @@ async def upload_audio(
             "language": language,
             "stt_source": stt_source,
             "stt_source_reason": stt_result.get("stt_source_reason"),
+            "stt_model_tier": stt_model_tier,
             "unclear_audio": True
         }, status_code=200)
 
@@ -402,45 +689,7 @@ async def upload_audio(
     initial_state["language"] = header_lang or language
 
     try:
-        # Use the new Crew-based logic
-        from app.crews.krishi_crew import KrishiCrew
-        from crewai import Task
-        from app.agents.bengali_interpreter import bengali_interpreter
-
-        clean_msg = transcript.lower().strip()
-        greetings = ["hello", "hi", "hey", "হ্যালো", "সালাম", "আসসালামু আলাইকুম", "hi there", "good morning"]
-        
-        if clean_msg in greetings:
-            reply_text = "হ্যালো! আমি আপনার কৃষিবন্ধু। আমি কীভাবে সাহায্য করতে পারি? (Hello! I'm your KrishiBondhu. How can I help you today?)"
-        else:
-            route_task = Task(
-                description=(
-                    f"Process the user's message: {transcript}. "
-                    "Interpret the intent and delegate to the appropriate expert agent to get the answer. "
-                    "You must provide the final expert advice directly to the user."
-                ),
-                expected_output="A detailed, helpful answer in plain Bengali/English text. DO NOT output JSON.",
-                agent=bengali_interpreter
-            )
-
-            crew_obj = KrishiCrew()
-            crew = crew_obj.create_crew(tasks=[route_task])
-
-            result = await asyncio.to_thread(crew.kickoff, inputs=initial_state)
-            raw_reply = str(result)
-            
-            import json
-            try:
-                data = json.loads(raw_reply)
-                if isinstance(data, dict):
-                    parts = []
-                    for k, v in data.items():
-                        parts.append(f"{str(k).replace('_', ' ').title()}: {v}")
-                    reply_text = "\n".join(parts)
-                else:
-                    reply_text = raw_reply
-            except Exception:
-                reply_text = raw_reply
+        reply_text = await _generate_agent_reply(transcript, initial_state)
 
         user_db_id = current_user.id
         saved_conv_id = await save_conversation_to_db(
@@ -448,7 +697,12 @@ async def upload_audio(
             user_db_id,
             transcript,
             reply_text,
-            metadata={"gps": initial_state["gps"]},
+            metadata={
+                "gps": initial_state["gps"],
+                "stt_source": stt_source,
+                "stt_model_tier": stt_model_tier,
+                "stt_model": stt_result.get("stt_model"),
+            },
             tts_path=None,
             media_url=image_path
         )
@@ -474,6 +728,8 @@ async def upload_audio(
             "transcript": transcript,
             "reply_text": reply_text,
             "tts_path": tts_path,
+            "stt_source": stt_source,
+            "stt_model_tier": stt_model_tier,
             "user_id": current_user.external_id,
             "gps": initial_state["gps"]
         })
@@ -681,11 +937,19 @@ async def chat_stream(
     current_user: User = Depends(get_current_user),
     lat: float = Form(None),
     lon: float = Form(None),
+    tts: bool = Form(False),
     db: AsyncSession = Depends(get_db)
 ):
-    """SSE streaming endpoint — yields word-by-word chunks as text/event-stream."""
+    """
+    SSE streaming endpoint — yields word-by-word chunks as text/event-stream.
+
+    With ``tts=true`` each sentence is synthesized as soon as it has streamed
+    and sent as an ordered ``audio`` event, so playback starts before the
+    answer is complete.
+    """
     import json as _json
     from app.services.audio import detect_language_from_text
+    from app.services.tts import SentenceSegmenter, SentenceTTSStream
     from sqlalchemy import select, desc
     from app.models.db_models import Conversation as _Conversation
 
@@ -721,6 +985,12 @@ async def chat_stream(
         "messages": messages_ctx
     }
 
+    segmenter = SentenceSegmenter() if tts else None
+    tts_stream = SentenceTTSStream(language=detected_language) if tts else None
+
+    def audio_event(segment):
+        return f"data: {_json.dumps({'type': 'audio', 'index': segment['index'], 'text': segment['text'], 'path': segment['path']})}\n\n"
+
     async def generate():
         try:
             # Signal to the client that we are thinking
@@ -756,36 +1026,42 @@ async def chat_stream(
             for i, word in enumerate(words):
                 chunk += word + ' '
                 if i % 3 == 0:
+                    if tts_stream:
+                        for sentence in segmenter.feed(chunk):
+                            tts_stream.add(sentence)
+                        for segment in tts_stream.ready():
+                            yield audio_event(segment)
                     yield f"data: {_json.dumps({'type': 'chunk', 'text': chunk})}\n\n"
                     chunk = ''
                     await asyncio.sleep(0.05)
             if chunk:
                 yield f"data: {_json.dumps({'type': 'chunk', 'text': chunk})}\n\n"
+            if tts_stream:
+                for sentence in segmenter.feed(chunk) + segmenter.flush():
+                    tts_stream.add(sentence)
+
+            if tts_stream:
+                async for segment in tts_stream.drain():
+                    yield audio_event(segment)
+
+            yield f"data: {_json.dumps({'type': 'done', 'full_text': reply_text})}\n\n"
 
-            # Persist to DB after full response
-            saved_conv_id = await save_conversation_to_db(
-                db,
+            # Persist after the client has everything; memory extraction is an
+            # LLM call and must not hold back the last audio or the done event.
+            spawn_background(persist_turn(
                 user_db_id,
+                current_user.external_id,
                 message,
                 reply_text,
                 metadata={"gps": initial_state["gps"]},
-            )
-
-            try:
-                await MemoryService.extract_and_save_facts(
-                    db,
-                    current_user.external_id,
-                    message,
-                    conv_id=saved_conv_id
-                )
-            except Exception as mem_err:
-                logger.warning("Memory extraction failed in SSE stream", error=str(mem_err))
-
-            yield f"data: {_json.dumps({'type': 'done', 'full_text': reply_text})}\n\n"
+            ))
 
         except Exception as e:
             logger.error("SSE stream error", error=str(e), traceback=traceback.format_exc())
             yield f"data: {_json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+        finally:
+            if tts_stream:
+                tts_stream.cancel()
 
     return StreamingResponse(
         generate(),
@@ -797,20 +1073,93 @@ async def chat_stream(
         }
     )
 
+@app.get('/api/metrics')
+async def get_metrics():
+    """In-process counters and timings (cache hit rates, synthesis latency)."""
+    from app.core.metrics import metrics
+    return metrics.snapshot()
+
 @app.get('/api/get_tts')
-async def get_tts(path: str):
+async def get_tts(request: Request, path: str, format: str = None):
+    """
+    Serve a generated or uploaded audio clip by path or file name.
+
+    Only files in the file store (or loose legacy files in UPLOAD_DIR) are
+    served. ``format=opus`` (or an Accept header preferring audio/ogg) returns
+    a low-bitrate Opus copy. Range requests and If-None-Match are supported.
+    """
     from urllib.parse import unquote
     from app.api.utils import UPLOAD_DIR
-    import re
+    from app.storage import KIND_AUDIO, KIND_TTS, get_file_store
+    from app.services.audio_delivery import audio_file_response, transcode_to_opus, wants_opus
     from fastapi import Response
     decoded_path = unquote(path)
     filename = os.path.basename(decoded_path)
-    if os.path.exists(decoded_path):
-        return FileResponse(decoded_path, media_type='audio/mpeg', filename=filename)
-    upload_dir_path = os.path.join(UPLOAD_DIR, filename)
-    if os.path.exists(upload_dir_path):
-        return FileResponse(upload_dir_path, media_type='audio/mpeg', filename=filename)
-    return Response(status_code=204)
+    store = get_file_store()
+    legacy_dir = os.path.realpath(UPLOAD_DIR)
+
+    resolved = None
+    real = os.path.realpath(decoded_path)
+    audio_dirs = [store.kind_dir(KIND_TTS) + os.sep, store.kind_dir(KIND_AUDIO) + os.sep]
+    if os.path.isfile(real) and (any(real.startswith(d) for d in audio_dirs) or os.path.dirname(real) == legacy_dir):
+        resolved = real
+    else:
+        resolved = store.find(KIND_TTS, filename) or store.find(KIND_AUDIO, filename)
+        if not resolved and os.path.isfile(os.path.join(legacy_dir, filename)):
+            resolved = os.path.join(legacy_dir, filename)
+    if not resolved:
+        return Response(status_code=204)
+
+    if wants_opus(request.headers.get('accept'), format):
+        opus_path = await asyncio.to_thread(transcode_to_opus, resolved)
+        if opus_path:
+            resolved = opus_path
+    return audio_file_response(request, resolved)
+
+@app.get('/api/files/{kind}/{name}')
+async def get_public_file(kind: str, name: str):
+    """Content-addressed public files (QR codes) from the file store."""
+    from app.storage import KIND_QR, get_file_store
+    from app.services.audio_delivery import IMMUTABLE_CACHE_CONTROL
+    if kind != KIND_QR:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    path = get_file_store().find(kind, name)
+    if not path:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    return FileResponse(path, media_type="image/png", headers={"cache-control": IMMUTABLE_CACHE_CONTROL})
+
+@app.post('/api/images')
+@limiter.limit("10/minute")
+async def post_image(
+    request: Request,
+    image: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Store a photo for a community post, listing or report. Returns the URL to
+    save as its ``photo_url`` and the URLs of its WebP size variants.
+    """
+    from app.services.image_processing import VARIANT_SIZES, image_url
+    image_path = await save_image_local(image)
+    return {
+        "url": image_url(image_path),
+        "variants": {size: image_url(image_path, size) for size in VARIANT_SIZES},
+    }
+
+@app.get('/api/images/{name}')
+async def get_image(name: str, size: int = None):
+    """
+    Uploaded images by file name. ``size`` picks the smallest precomputed WebP
+    variant (256/512/1024 px) that covers it; files are content-addressed and
+    cached as immutable.
+    """
+    from app.services.image_processing import find_variant
+    from app.services.audio_delivery import IMMUTABLE_CACHE_CONTROL
+    path = find_variant(name, size)
+    if not path:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    media_type = 'image/webp' if path.endswith('.webp') else None
+    return FileResponse(path, media_type=media_type, headers={"cache-control": IMMUTABLE_CACHE_CONTROL})
 
 @app.get("/{full_path:path}")
 async def serve_spa(full_path: str):
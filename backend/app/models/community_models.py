@@ -50,10 +50,18 @@ class CommunityQuestion(Base):
     ai_answer = Column(Text)
     ai_answer_generated_at = Column(DateTime)
 
+    # Set when the question was matched at post time to an answered question in
+    # the same district; the thread's answer is served instead of generating one.
+    duplicate_of_id = Column(UUID(as_uuid=True), ForeignKey("community_questions.id"), nullable=True, index=True)
+
     # Denormalized counts for cheap list rendering (kept in sync on vote/reply).
     upvotes_count = Column(Integer, default=0, index=True)
     answers_count = Column(Integer, default=0, index=True)
 
+    # Time-decayed trending score, kept current on vote/reply and rescored in
+    # bulk periodically (see app.services.community_ranking).
+    hot_score = Column(Float, default=0.0, nullable=False, server_default="0")
+
     # Status tracking
     status = Column(String(20), default='pending', index=True)  # pending, answered, escalated, removed
     moderation_flag = Column(Boolean, default=False)
@@ -71,8 +79,21 @@ class CommunityQuestion(Base):
     
     __table_args__ = (
         Index('idx_community_questions_crop_stage', 'crop_type', 'growth_stage'),
-        Index('idx_community_questions_embedding', 'embedding', postgresql_using='ivfflat'),
+        # Cosine HNSW index; see app.utils.pgvector_index for ivfflat and tuning
+        Index(
+            'idx_community_questions_embedding', 'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+        ),
         Index('idx_community_questions_status_created', 'status', 'created_at'),
+        # Keyset feed pagination: (filters..., sort key..., created_at, id)
+        Index('idx_community_questions_feed_new', 'is_archived', 'created_at', 'id'),
+        Index('idx_community_questions_feed_top', 'is_archived', 'upvotes_count', 'created_at', 'id'),
+        Index('idx_community_questions_feed_district_new', 'district', 'is_archived', 'created_at', 'id'),
+        Index('idx_community_questions_feed_district_top', 'district', 'is_archived', 'upvotes_count', 'created_at', 'id'),
+        Index('idx_community_questions_feed_hot', 'is_archived', 'hot_score', 'created_at', 'id'),
+        Index('idx_community_questions_feed_district_hot', 'district', 'is_archived', 'hot_score', 'created_at', 'id'),
     )
     
     def __repr__(self):
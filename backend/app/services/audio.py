@@ -2,13 +2,17 @@
 import os
 import mimetypes
 import json
+import tempfile
+import threading
+from contextlib import contextmanager
 import requests
 import google.generativeai as genai
 from dotenv import load_dotenv
 import librosa
 import soundfile as sf
 from app.core.prompts import GEMINI_TRANSCRIPTION_PROMPT
-from app.llm.provider import init_stt_pipeline
+from app.llm.provider import init_stt_pipeline, get_llm_config, STT_TIER_SMALL, STT_TIER_LARGE
+from app.services.audio_chunking import split_on_silence, stitch_transcripts
 
 load_dotenv()
 
@@ -204,32 +208,163 @@ def transcribe_with_google_speech(audio_path: str) -> dict:
     return {"text": transcript_text, "language": language, "unclear": unclear}
 
 
+# Number of local Whisper jobs currently queued or running. Used by the tier
+# policy to shed load onto the small checkpoint when the node is busy.
+_stt_queue_lock = threading.Lock()
+_stt_queue_depth = 0
+
+
+def get_stt_queue_depth() -> int:
+    return _stt_queue_depth
+
+
+@contextmanager
+def _stt_job():
+    global _stt_queue_depth
+    with _stt_queue_lock:
+        _stt_queue_depth += 1
+    try:
+        yield
+    finally:
+        with _stt_queue_lock:
+            _stt_queue_depth -= 1
+
+
+def select_stt_tier(duration_s: float, queue_depth: int) -> str:
+    """
+    Pick the local Whisper tier for a clip.
+
+    Short clips always use the small model and long clips always use the large
+    one. Clips in between use the large model unless the STT queue is at or
+    above the high watermark, in which case they are shed to the small model.
+    """
+    config = get_llm_config()
+    if duration_s <= config.stt_short_clip_seconds:
+        return STT_TIER_SMALL
+    if duration_s >= config.stt_long_clip_seconds:
+        return STT_TIER_LARGE
+    if queue_depth >= config.stt_queue_high_watermark:
+        return STT_TIER_SMALL
+    return STT_TIER_LARGE
+
+
+# HF pipelines are not safe to call from several threads at once, so each
+# tier's pipeline is used by one request at a time.
+_stt_pipeline_locks = {STT_TIER_SMALL: threading.Lock(), STT_TIER_LARGE: threading.Lock()}
+
+
+def _whisper_text(result) -> str:
+    transcript_text = result.get("text") if result else None
+    if not transcript_text:
+        raise Exception("Local Whisper returned empty or invalid response.")
+    return transcript_text.strip()
+
+
+def _transcribe_segments(audio_array, ranges, tier: str) -> list:
+    """
+    Transcribe each [start, end) range of the audio. Multiple segments go
+    through the pipeline as one batched call; a failed segment yields an
+    empty string.
+    """
+    stt_pipeline = init_stt_pipeline(tier)
+    segments = [audio_array[start:end] for start, end in ranges]
+    with _stt_pipeline_locks[tier]:
+        results = None
+        if len(segments) > 1:
+            try:
+                batch_size = min(len(segments), get_llm_config().stt_chunk_batch_size)
+                results = stt_pipeline(segments, batch_size=batch_size)
+            except Exception as e:
+                print(f"[WARN] Batched STT failed, transcribing segments one by one: {e}")
+
+        texts = []
+        for i, segment in enumerate(segments):
+            try:
+                result = results[i] if results is not None else stt_pipeline(segment)
+                texts.append(_whisper_text(result))
+            except Exception as e:
+                # A silent chunk yields no text; keep the rest of the transcript.
+                print(f"[WARN] STT segment failed: {e}")
+                texts.append("")
+    return texts
+
+
+def _segment_ranges(audio_array, sampling_rate: int, duration_s: float) -> list:
+    """Silence-split chunk ranges for long audio, a single range otherwise."""
+    config = get_llm_config()
+    if duration_s <= config.stt_chunk_seconds:
+        return [(0, len(audio_array))]
+    return split_on_silence(
+        audio_array,
+        sampling_rate,
+        chunk_s=config.stt_chunk_seconds,
+        overlap_s=config.stt_chunk_overlap_seconds,
+    )
+
+
+def _model_name(tier: str):
+    return getattr(getattr(init_stt_pipeline(tier), "model", None), "name_or_path", None)
+
+
 def transcribe_with_local_whisper(audio_path: str) -> dict:
     if not os.path.exists(audio_path):
         raise Exception(f"Audio file not found: {audio_path}")
 
     print(f"Transcribing with Local Hugging Face Whisper model...")
     try:
-        # Load local pipeline
-        stt_pipeline = init_stt_pipeline()
-        
         # Whisper requires EXACTLY 16000 Hz. We use librosa to load and resample safely.
         audio_array, sampling_rate = librosa.load(audio_path, sr=16000)
-        
-        # Run inference
-        result = stt_pipeline(audio_array)
-        
-        transcript_text = result.get("text")
+        duration_s = len(audio_array) / float(sampling_rate)
+
+        with _stt_job():
+            # Our own job is already counted, so compare the *other* jobs.
+            queue_depth = get_stt_queue_depth() - 1
+            tier = select_stt_tier(duration_s, queue_depth)
+            # Long audio is split at silences and the chunks transcribed as one batch.
+            ranges = _segment_ranges(audio_array, sampling_rate, duration_s)
+            texts = _transcribe_segments(audio_array, ranges, tier)
+
+            # Unclear small-model segments are retried on the large model; clear
+            # segments keep their small-model text. The HF pipeline exposes no
+            # per-segment confidence, so a word count is the signal, and segments
+            # within the short-clip threshold are never retried: a one-word reply
+            # ("হ্যাঁ", "না") is the expected answer there, not a failure.
+            escalated = []
+            if tier == STT_TIER_SMALL:
+                short_samples = get_llm_config().stt_short_clip_seconds * sampling_rate
+                escalated = [
+                    i for i, text in enumerate(texts)
+                    if ranges[i][1] - ranges[i][0] > short_samples and is_unclear_transcript(text)
+                ]
+            if escalated:
+                print(f"[DEBUG] Small STT tier unclear on {len(escalated)}/{len(ranges)} segments, escalating to large tier")
+                retried = _transcribe_segments(audio_array, [ranges[i] for i in escalated], STT_TIER_LARGE)
+                for i, text in zip(escalated, retried):
+                    if text:
+                        texts[i] = text
+
+        transcript_text = stitch_transcripts(texts)
         if not transcript_text:
-            raise Exception("Local Whisper returned empty or invalid response.")
-            
-        transcript_text = transcript_text.strip()
-        
-        language = detect_language_from_text(transcript_text)
-        unclear = is_unclear_transcript(transcript_text)
-        
-        return {"text": transcript_text, "language": language, "unclear": unclear}
-        
+            raise Exception("Local Whisper returned empty transcript for all segments.")
+
+        final_tier = STT_TIER_LARGE if len(escalated) == len(ranges) else tier
+        result = {
+            "text": transcript_text,
+            "language": detect_language_from_text(transcript_text),
+            "unclear": is_unclear_transcript(transcript_text),
+            "stt_model_tier": final_tier,
+            "stt_model": _model_name(final_tier),
+            "audio_duration_s": round(duration_s, 2),
+            "stt_queue_depth": queue_depth,
+        }
+        if len(ranges) > 1:
+            result["stt_chunks"] = len(ranges)
+        if escalated:
+            result["stt_escalated"] = True
+            result["stt_escalated_segments"] = len(escalated)
+        print(f"[DEBUG] Local STT tier={result['stt_model_tier']} duration={duration_s:.1f}s queue={queue_depth}")
+        return result
+
     except Exception as e:
         raise Exception(f"Local Whisper inference failed: {str(e)}")
 
@@ -309,6 +444,23 @@ def transcribe_audio(audio_path: str) -> dict:
     return result
 
 
+def transcribe_pcm_segment(audio_array, sample_rate: int) -> dict:
+    """
+    Transcribe an in-memory speech segment (float32 mono) through the regular
+    provider chain. Used by the streaming WebSocket endpoint.
+    """
+    fd, wav_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        sf.write(wav_path, audio_array, sample_rate, subtype="PCM_16")
+        return transcribe_audio(wav_path)
+    finally:
+        try:
+            os.remove(wav_path)
+        except OSError:
+            pass
+
+
 def stt_node(state):
     print(f"[DEBUG] STT node: Starting")
     
@@ -326,5 +478,8 @@ def stt_node(state):
         "transcript": stt.get("text", "").strip(),
         "language": stt.get("language", "en"),
         "unclear": stt.get("unclear", False),
-        "stt_source": stt.get("stt_source", "unknown")
+        "stt_source": stt.get("stt_source", "unknown"),
+        "stt_source_reason": stt.get("stt_source_reason"),
+        "stt_model_tier": stt.get("stt_model_tier"),
+        "stt_model": stt.get("stt_model"),
     }
@@ -0,0 +1,85 @@
+"""
+Long-form audio helpers for chunked transcription.
+
+Splits a mono waveform into overlapping chunks whose cut points sit in the
+quietest frame near each chunk boundary, and stitches per-chunk transcripts
+back together by removing the words repeated across an overlap.
+"""
+
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+FRAME_MS = 30
+_PUNCT_RE = re.compile(r"[।,.?!;:\"'()\[\]-]")
+
+
+def frame_energy(audio: np.ndarray, sr: int, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """RMS energy of consecutive non-overlapping frames."""
+    frame_len = max(int(sr * frame_ms / 1000), 1)
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    sr: int,
+    chunk_s: float = 25.0,
+    overlap_s: float = 1.0,
+    search_s: float = 5.0,
+) -> List[Tuple[int, int]]:
+    """
+    Return (start, end) sample ranges covering ``audio``.
+
+    Each boundary is placed at the lowest-energy frame within ``search_s``
+    seconds before the nominal ``chunk_s`` mark, so words are rarely cut in
+    half. Neighbouring chunks share ``overlap_s`` seconds around the cut.
+    """
+    n = len(audio)
+    chunk = int(chunk_s * sr)
+    if n <= chunk:
+        return [(0, n)]
+
+    frame_len = max(int(sr * FRAME_MS / 1000), 1)
+    energy = frame_energy(audio, sr)
+    overlap = int(overlap_s * sr)
+    search = int(search_s * sr)
+
+    ranges = []
+    start = 0
+    while n - start > chunk:
+        window_lo = start + max(chunk - search, overlap + frame_len)
+        window_hi = start + chunk
+        lo_f, hi_f = window_lo // frame_len, window_hi // frame_len
+        if hi_f > lo_f:
+            cut = (lo_f + int(np.argmin(energy[lo_f:hi_f]))) * frame_len + frame_len // 2
+        else:
+            cut = window_hi
+        ranges.append((max(start - overlap, 0), min(cut + overlap, n)))
+        start = cut
+    ranges.append((max(start - overlap, 0), n))
+    return ranges
+
+
+def _norm(word: str) -> str:
+    return _PUNCT_RE.sub("", word).lower()
+
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = 8) -> str:
+    """Join chunk transcripts, dropping words duplicated at each overlap."""
+    words: List[str] = []
+    for text in texts:
+        nxt = (text or "").split()
+        if not nxt:
+            continue
+        limit = min(max_overlap_words, len(words), len(nxt))
+        for k in range(limit, 0, -1):
+            if [_norm(w) for w in words[-k:]] == [_norm(w) for w in nxt[:k]]:
+                nxt = nxt[k:]
+                break
+        words.extend(nxt)
+    return " ".join(words).strip()
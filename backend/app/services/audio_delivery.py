@@ -0,0 +1,150 @@
+"""
+Bandwidth-friendly delivery of generated and uploaded audio.
+
+Clips can be served as low-bitrate Opus (negotiated from the Accept header or
+an explicit ``format`` parameter), transcoded once with ffmpeg and kept next
+to the source. Responses carry strong ETags computed from the bytes served
+(cached per file version) and ask clients to revalidate: TTS clips are named
+after their input text, and a clip evicted and rendered again may differ, so
+neither the name nor the URL is a safe validator. Range requests are handled
+by Starlette's FileResponse.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+from functools import lru_cache
+from typing import Dict, Optional
+from uuid import uuid4
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from app.core.metrics import metrics
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+AUDIO_OPUS_BITRATE = os.getenv("AUDIO_OPUS_BITRATE", "16k")
+
+OPUS_MEDIA_TYPE = "audio/ogg"
+AUDIO_MEDIA_TYPES: Dict[str, str] = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".opus": OPUS_MEDIA_TYPE,
+    ".ogg": OPUS_MEDIA_TYPE,
+    ".webm": "audio/webm",
+    ".m4a": "audio/mp4",
+}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"  # for names derived from the bytes
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def _accept_q(accept: str) -> Dict[str, float]:
+    prefs = {}
+    for item in (accept or "").split(","):
+        parts = [p.strip() for p in item.split(";")]
+        if not parts[0]:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        prefs[parts[0].lower()] = q
+    return prefs
+
+
+def wants_opus(accept: Optional[str], fmt: Optional[str] = None) -> bool:
+    """
+    True if the client asked for Opus, either with ``format=opus`` or by
+    naming audio/ogg or audio/opus in Accept at least as high as audio/mpeg.
+    Wildcards alone (``*/*``) keep the original format.
+    """
+    if fmt:
+        return fmt.lower() in ("opus", "ogg")
+    prefs = _accept_q(accept)
+    opus_q = max(prefs.get("audio/ogg", 0.0), prefs.get("audio/opus", 0.0))
+    original_q = prefs.get("audio/mpeg", prefs.get("audio/*", prefs.get("*/*", 0.0)))
+    return opus_q > 0 and opus_q >= original_q
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(FFMPEG_BINARY) is not None
+
+
+def transcode_to_opus(src: str) -> Optional[str]:
+    """
+    Mono low-bitrate Opus copy of ``src`` stored beside it; reused if present.
+    Returns None when ffmpeg is missing or fails, so callers fall back to ``src``.
+    """
+    root, ext = os.path.splitext(src)
+    if ext.lower() in (".opus", ".ogg"):
+        return src
+    target = f"{root}.opus"
+    # A copy older than its source belongs to an earlier render of the same name
+    if os.path.exists(target) and os.path.getsize(target) > 0 and os.path.getmtime(target) >= os.path.getmtime(src):
+        return target
+    if not ffmpeg_available():
+        return None
+    tmp_path = f"{target}.{uuid4().hex}.tmp"
+    try:
+        with metrics.timer("audio_opus_transcode_seconds"):
+            subprocess.run(
+                [FFMPEG_BINARY, "-y", "-loglevel", "error", "-i", src,
+                 "-ac", "1", "-c:a", "libopus", "-b:a", AUDIO_OPUS_BITRATE,
+                 "-application", "voip", "-f", "ogg", tmp_path],
+                check=True,
+                capture_output=True,
+                timeout=60,
+            )
+        os.replace(tmp_path, target)
+        metrics.inc("audio_opus_transcodes")
+        return target
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"[WARNING] Opus transcode failed for {src}: {e}")
+        metrics.inc("audio_opus_transcode_failures")
+        return None
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@lru_cache(maxsize=1024)
+def _content_digest(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_etag(path: str) -> str:
+    """Strong ETag: the sha256 of the file's bytes, hashed once per file version."""
+    st = os.stat(path)
+    return f'"{_content_digest(path, st.st_mtime_ns, st.st_size)}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+def audio_file_response(request: Request, path: str) -> Response:
+    """FileResponse with strong ETag, cache policy and If-None-Match handling."""
+    filename = os.path.basename(path)
+    etag = file_etag(path)
+    headers = {
+        "etag": etag,
+        "cache-control": REVALIDATE_CACHE_CONTROL,
+        "vary": "Accept",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        metrics.inc("audio_not_modified")
+        return Response(status_code=304, headers=headers)
+    media_type = AUDIO_MEDIA_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
@@ -1,17 +1,62 @@
 """Barcode and QR code scanning utilities."""
 
 import io
+import os
 import base64
+import asyncio
+import logging
 from typing import Optional
 
+from app.core.executors import SCAN_JOB_TIMEOUT_S, run_in_process
+from app.core.metrics import metrics
 
-def decode_barcode_base64(image_base64: str) -> Optional[str]:
-    from PIL import Image
+logger = logging.getLogger("BarcodeService")
+
+# Longest side for the first decode attempt; full resolution is only tried on a miss
+BARCODE_MAX_SIDE = int(os.getenv("BARCODE_MAX_SIDE", 1024))
+
+
+def _decode_gray(image) -> Optional[str]:
     from pyzbar.pyzbar import decode
 
-    image_data = base64.b64decode(image_base64)
-    image = Image.open(io.BytesIO(image_data)).convert("RGB")
     decoded = decode(image)
     if not decoded:
         return None
     return decoded[0].data.decode("utf-8")
+
+
+def decode_barcode_bytes(image_bytes: bytes, max_side: int = BARCODE_MAX_SIDE) -> Optional[str]:
+    """
+    Decode the first barcode/QR code in an image. zbar works on luminance, so
+    the image is decoded straight to grayscale (at reduced scale for JPEG) and
+    downscaled first; only when that misses is the full-resolution image tried.
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_bytes))
+    full_size = image.size
+    if image.format == "JPEG":
+        image.draft("L", (max_side, max_side))
+    small = image.convert("L")
+    small.thumbnail((max_side, max_side))
+    result = _decode_gray(small)
+    if result is None and small.size != full_size:
+        result = _decode_gray(Image.open(io.BytesIO(image_bytes)).convert("L"))
+    return result
+
+
+def decode_barcode_base64(image_base64: str) -> Optional[str]:
+    return decode_barcode_bytes(base64.b64decode(image_base64))
+
+
+async def decode_barcode_async(image_base64: str) -> Optional[str]:
+    """Decode in the scan process pool; None on timeout or failure."""
+    try:
+        with metrics.timer("scan_barcode_seconds"):
+            return await run_in_process(decode_barcode_base64, image_base64, timeout=SCAN_JOB_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        metrics.inc("scan_timeouts")
+        logger.warning("Barcode decoding timed out after %.0fs", SCAN_JOB_TIMEOUT_S)
+    except Exception as exc:
+        logger.warning(f"Barcode decoding failed: {exc}")
+    return None
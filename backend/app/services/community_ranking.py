@@ -0,0 +1,95 @@
+"""
+Time-decayed "hot" ranking for community posts.
+
+    hot = log10(1 + upvotes + HOT_ANSWER_WEIGHT * answers) + age_term
+    age_term = (created_at - epoch) / HOT_DECAY_HOURS
+
+Scoring the creation time instead of the current age gives the same ordering
+as decaying engagement by age (a post HOT_DECAY_HOURS older needs 10x the
+engagement to rank level), but a score only changes when the post's own
+counts change. So it is stored in ``hot_score`` and updated on each upvote
+or answer; the feed reads it through an index with no per-request scoring.
+``recompute_hot_scores`` rescores every row in bulk: it runs periodically to
+repair drift (counts changed outside the service) and picks up a new
+weighting after HOT_* settings change.
+"""
+
+import logging
+import math
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.metrics import metrics
+from app.db import AsyncSessionLocal
+from app.models.community_models import CommunityQuestion
+
+logger = logging.getLogger("CommunityRanking")
+
+HOT_DECAY_HOURS = float(os.getenv("HOT_DECAY_HOURS", 36))
+HOT_ANSWER_WEIGHT = float(os.getenv("HOT_ANSWER_WEIGHT", 2))
+HOT_RECOMPUTE_INTERVAL_MINUTES = int(os.getenv("HOT_RECOMPUTE_INTERVAL_MINUTES", 360))
+HOT_RECOMPUTE_CHUNK_SIZE = int(os.getenv("HOT_RECOMPUTE_CHUNK_SIZE", 1000))
+
+_EPOCH = datetime(2024, 1, 1)
+_table = CommunityQuestion.__table__
+
+
+def hot_score(upvotes: Optional[int], answers: Optional[int], created_at: Optional[datetime]) -> float:
+    engagement = 1 + max(upvotes or 0, 0) + HOT_ANSWER_WEIGHT * max(answers or 0, 0)
+    age_hours = ((created_at or datetime.utcnow()) - _EPOCH).total_seconds() / 3600
+    return round(math.log10(engagement) + age_hours / HOT_DECAY_HOURS, 6)
+
+
+def refresh_hot_score(question: CommunityQuestion) -> None:
+    """Rescore one post after its counts changed (call before committing)."""
+    question.hot_score = hot_score(question.upvotes_count, question.answers_count, question.created_at)
+
+
+async def recompute_hot_scores(
+    chunk_size: int = HOT_RECOMPUTE_CHUNK_SIZE,
+    session_factory=AsyncSessionLocal,
+) -> Dict[str, Any]:
+    """Rescore every post in keyset-ordered chunks; changed rows are written with one executemany UPDATE per chunk."""
+    start = time.perf_counter()
+    scanned = changed = 0
+    last_id = None
+    stmt = (
+        update(_table)
+        .where(_table.c.id == bindparam("b_id"))
+        # A rescore is not an edit: keep updated_at instead of letting onupdate bump it
+        .values(hot_score=bindparam("b_hot"), updated_at=_table.c.updated_at)
+    )
+    async with session_factory() as session:
+        while True:
+            query = (
+                select(
+                    _table.c.id, _table.c.upvotes_count, _table.c.answers_count,
+                    _table.c.created_at, _table.c.hot_score,
+                )
+                .order_by(_table.c.id)
+                .limit(chunk_size)
+            )
+            if last_id is not None:
+                query = query.where(_table.c.id > last_id)
+            rows = (await session.execute(query)).all()
+            if not rows:
+                break
+            updates = []
+            for row_id, upvotes, answers, created_at, current in rows:
+                score = hot_score(upvotes, answers, created_at)
+                if current is None or abs(score - current) > 1e-6:
+                    updates.append({"b_id": row_id, "b_hot": score})
+            if updates:
+                await session.execute(stmt, updates)
+                await session.commit()
+            scanned += len(rows)
+            changed += len(updates)
+            last_id = rows[-1][0]
+    elapsed = time.perf_counter() - start
+    metrics.observe("community_hot_recompute_seconds", elapsed)
+    logger.info(f"Recomputed hot scores: {changed} of {scanned} posts changed in {elapsed:.1f}s")
+    return {"scanned": scanned, "changed": changed, "seconds": round(elapsed, 2)}
@@ -1,9 +1,15 @@
 """Community Q&A and expert escalation service helpers."""
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional, List
+from sqlalchemy import select, tuple_
+from typing import Any, Dict, Optional, List, Set
 from datetime import datetime, timedelta
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
 import uuid
 
 from app.models.community_models import (
@@ -13,9 +19,19 @@ from app.models.community_models import (
     QuestionUpvote,
     EscalationQueue,
 )
-from app.services.embedding_service import encode_text
-from app.utils.vector_utils import query_vector_similarity
+from app.services.community_ranking import hot_score, refresh_hot_score
+from app.services.embedding_service import EMBEDDING_MODEL, encode_text_async
+from app.services.image_processing import IMAGE_THUMB_SIZE, image_url
+from app.utils.vector_utils import exact_vector_similarity, query_vector_similarity, track_embeddings
+from app.utils.text_search import lexical_search, tokenize
+from app.utils.vector_index import index_key
 from app.services.geospatial_service import find_nearest_experts
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# SQLite deployments serve semantic search from an in-process index
+track_embeddings(CommunityQuestion, "embedding", 384, EMBEDDING_MODEL)
 
 # The four crops that get dedicated filter chips. Anything else is bucketed
 # under the "অন্যান্য" (Other) chip on the frontend.
@@ -23,6 +39,19 @@ NAMED_CROPS = ["ধান", "গম", "আলু", "পাট"]
 
 PAGE_SIZE = 20
 
+# Hybrid search: total time allowed for both legs; the semantic leg is dropped
+# (lexical results only) when embedding + vector search would exceed it
+SEARCH_BUDGET_MS = float(os.getenv("SEARCH_BUDGET_MS", 300))
+# Reciprocal-rank fusion constant: higher flattens the advantage of top ranks
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", 60))
+# Queries this short that the keyword leg already fills skip the embedding
+SEARCH_KEYWORD_ONLY_MAX_TOKENS = int(os.getenv("SEARCH_KEYWORD_ONLY_MAX_TOKENS", 1))
+SEARCH_VECTOR_THRESHOLD = 0.6
+
+# Post-time duplicate detection: cosine similarity above which a new question
+# is linked to an answered one (same district and crop) and served its answer
+DUPLICATE_QUESTION_THRESHOLD = float(os.getenv("DUPLICATE_QUESTION_THRESHOLD", 0.92))
+
 
 def _serialize_question(question: CommunityQuestion, upvoted_by_me: bool = False) -> dict:
     return {
@@ -32,7 +61,8 @@ def _serialize_question(question: CommunityQuestion, upvoted_by_me: bool = False
         "crop_type": question.crop_type,
         "growth_stage": question.growth_stage,
         "district": question.district,
-        "photo_url": question.photo_url,
+        "photo_url": image_url(question.photo_url),
+        "photo_thumb_url": image_url(question.photo_url, IMAGE_THUMB_SIZE),
         "lat": question.lat,
         "lon": question.lon,
         "status": question.status,
@@ -43,7 +73,9 @@ def _serialize_question(question: CommunityQuestion, upvoted_by_me: bool = False
         "ai_answer_generated_at": question.ai_answer_generated_at.isoformat() if question.ai_answer_generated_at else None,
         "upvotes_count": question.upvotes_count or 0,
         "answers_count": question.answers_count or 0,
+        "hot_score": question.hot_score or 0.0,
         "upvoted_by_me": upvoted_by_me,
+        "duplicate_of_id": str(question.duplicate_of_id) if question.duplicate_of_id else None,
         "created_at": question.created_at.isoformat() if question.created_at else None,
         "updated_at": question.updated_at.isoformat() if question.updated_at else None,
     }
@@ -64,6 +96,31 @@ def _serialize_answer(answer: CommunityAnswer) -> dict:
     }
 
 
+async def find_answered_duplicate(
+    embedding: List[float],
+    district: Optional[str],
+    crop_type: str,
+    threshold: float = DUPLICATE_QUESTION_THRESHOLD,
+) -> Optional[dict]:
+    """
+    The closest answered, unarchived question from the same district and crop
+    with similarity >= ``threshold``, resolved to the root of its thread.
+    Scored exactly over that district's candidates: the same seasonal question
+    asked in many districts would crowd it out of an approximate global top-k.
+    """
+    if not district:
+        return None
+    hits = await exact_vector_similarity(
+        "community_questions", "embedding", embedding, threshold=threshold, limit=1,
+        filters={"district": district, "crop_type": crop_type, "status": "answered", "is_archived": False},
+        columns=("id", "duplicate_of_id"),
+    )
+    if not hits:
+        return None
+    hit = hits[0]
+    return {"id": hit.get("duplicate_of_id") or hit["id"], "similarity": float(hit["similarity"])}
+
+
 async def create_community_question(
     session: AsyncSession,
     farmer_id_hashed: str,
@@ -74,8 +131,17 @@ async def create_community_question(
     lon: float,
     photo_url: Optional[str] = None,
     district: Optional[str] = None,
+    detect_duplicates: bool = True,
 ) -> CommunityQuestion:
-    embedding = encode_text(question_text)
+    """
+    Store a question. With ``detect_duplicates``, a near-identical answered
+    question from the same district makes this one part of that thread:
+    ``duplicate_of_id`` is set and it is stored as answered (see
+    ``get_thread_answer``), so no new answer is generated for it.
+    """
+    embedding = await encode_text_async(question_text)
+    duplicate = await find_answered_duplicate(embedding, district, crop_type) if detect_duplicates else None
+    created_at = datetime.utcnow()
     question = CommunityQuestion(
         farmer_id_hashed=farmer_id_hashed,
         question_text=question_text,
@@ -87,13 +153,52 @@ async def create_community_question(
         lon=lon,
         location_geom=f"POINT({lon} {lat})",
         embedding=embedding,
+        created_at=created_at,
+        hot_score=hot_score(0, 0, created_at),
     )
+    if duplicate:
+        question.duplicate_of_id = uuid.UUID(str(duplicate["id"]))
+        question.status = "answered"
+        metrics.inc("community_duplicate_questions")
     session.add(question)
     await session.commit()
     await session.refresh(question)
     return question
 
 
+async def get_thread_answer(session: AsyncSession, question_id) -> Optional[dict]:
+    """
+    The answer to show for a thread: a verified or expert answer first, then
+    the AI answer, then the earliest human reply.
+    """
+    result = await session.execute(
+        select(CommunityQuestion.id, CommunityQuestion.question_text, CommunityQuestion.ai_answer)
+        .where(CommunityQuestion.id == question_id)
+    )
+    thread = result.first()
+    if not thread:
+        return None
+    answers = await session.execute(
+        select(CommunityAnswer)
+        .where(CommunityAnswer.question_id == question_id)
+        .order_by(
+            CommunityAnswer.is_verified.desc(),
+            CommunityAnswer.is_expert_answer.desc(),
+            CommunityAnswer.created_at.asc(),
+        )
+        .limit(1)
+    )
+    best = answers.scalars().first()
+    base = {"question_id": str(thread.id), "question_text": thread.question_text}
+    if best and (best.is_verified or best.is_expert_answer):
+        return {**base, "source": "expert", "answer_text": best.answer_text, "answer": _serialize_answer(best)}
+    if thread.ai_answer:
+        return {**base, "source": "ai", "answer_text": thread.ai_answer, "answer": None}
+    if best:
+        return {**base, "source": "community", "answer_text": best.answer_text, "answer": _serialize_answer(best)}
+    return None
+
+
 async def get_recent_questions(session: AsyncSession, limit: int = 20) -> List[dict]:
     from sqlalchemy import select
 
@@ -103,6 +208,47 @@ async def get_recent_questions(session: AsyncSession, limit: int = 20) -> List[d
     return [_serialize_question(row) for row in result.scalars().all()]
 
 
+# Feed orderings, all descending; the trailing id makes every key unique so a
+# cursor (the last row's key) pins an exact position. Each is served by a
+# composite index (see CommunityQuestion.__table_args__).
+FEED_SORT_KEYS = {
+    "new": (CommunityQuestion.created_at, CommunityQuestion.id),
+    "top": (CommunityQuestion.upvotes_count, CommunityQuestion.created_at, CommunityQuestion.id),
+    "hot": (CommunityQuestion.hot_score, CommunityQuestion.created_at, CommunityQuestion.id),
+}
+
+
+def encode_cursor(question: CommunityQuestion, sort: str) -> str:
+    values = []
+    for column in FEED_SORT_KEYS[sort]:
+        value = getattr(question, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        values.append(value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    """Sort-key values from a cursor; ValueError when it is malformed or from another sort."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        columns = FEED_SORT_KEYS[sort]
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError("cursor does not match the sort order")
+        values = []
+        for column, value in zip(columns, raw):
+            if column.key == "id":
+                value = uuid.UUID(value)
+            elif column.key == "created_at":
+                value = datetime.fromisoformat(value)
+            values.append(value)
+        return values
+    except (TypeError, ValueError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Invalid cursor: {exc}") from exc
+
+
 async def list_posts(
     session: AsyncSession,
     district: Optional[str] = None,
@@ -110,11 +256,19 @@ async def list_posts(
     sort: str = "new",
     page: int = 1,
     viewer_id: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> dict:
-    """Discovery feed: filter by district/crop, sort new|top, paginate.
+    """Discovery feed: filter by district/crop, sort new|top|hot, paginate.
 
-    Returns {"posts": [...], "page": int, "has_more": bool}.
+    Pass the previous page's ``next_cursor`` to continue: keyset pagination
+    seeks straight to the position, so deep pages cost the same as the first.
+    ``page`` (OFFSET) is still honoured when no cursor is given. Two queries
+    per page: the posts and the viewer's upvotes on them.
+
+    Returns {"posts": [...], "page": int, "has_more": bool, "next_cursor": str|None}.
     """
+    sort = sort if sort in FEED_SORT_KEYS else "new"
+    sort_key = FEED_SORT_KEYS[sort]
     stmt = select(CommunityQuestion).where(CommunityQuestion.is_archived.is_(False))
 
     if district:
@@ -127,40 +281,40 @@ async def list_posts(
         else:
             stmt = stmt.where(CommunityQuestion.crop_type == crop)
 
-    if sort == "top":
-        # Popular first; break ties with recency so the feed never feels stale.
-        stmt = stmt.order_by(
-            CommunityQuestion.upvotes_count.desc().nullslast(),
-            CommunityQuestion.created_at.desc(),
-        )
-    else:
-        stmt = stmt.order_by(CommunityQuestion.created_at.desc())
+    # "top": popular first, ties broken by recency so the feed never feels stale.
+    # "hot": the stored time-decayed score, so trending needs no per-request scoring.
+    stmt = stmt.order_by(*(column.desc() for column in sort_key))
 
-    offset = max(page - 1, 0) * PAGE_SIZE
-    stmt = stmt.offset(offset).limit(PAGE_SIZE + 1)  # +1 to cheaply detect next page
+    if cursor:
+        stmt = stmt.where(tuple_(*sort_key) < tuple_(*decode_cursor(cursor, sort)))
+    else:
+        stmt = stmt.offset(max(page - 1, 0) * PAGE_SIZE)
+    stmt = stmt.limit(PAGE_SIZE + 1)  # +1 to cheaply detect next page
 
     result = await session.execute(stmt)
     rows = result.scalars().all()
     has_more = len(rows) > PAGE_SIZE
     rows = rows[:PAGE_SIZE]
+    upvoted = await _upvoted_ids(session, [q.id for q in rows], viewer_id)
 
     return {
-        "posts": [_serialize_question(q, await _did_upvote(session, q.id, viewer_id)) for q in rows],
+        "posts": [_serialize_question(q, q.id in upvoted) for q in rows],
         "page": page,
         "has_more": has_more,
+        "next_cursor": encode_cursor(rows[-1], sort) if has_more else None,
     }
 
 
-async def _did_upvote(session: AsyncSession, question_id, viewer_id: Optional[str]) -> bool:
-    """Whether the current viewer has upvoted this post (for toggle UI state)."""
-    if not viewer_id:
-        return False
+async def _upvoted_ids(session: AsyncSession, question_ids: List[Any], viewer_id: Optional[str]) -> Set[Any]:
+    """Which of these posts the current viewer has upvoted, in one query (for toggle UI state)."""
+    if not viewer_id or not question_ids:
+        return set()
     res = await session.execute(
-        select(QuestionUpvote.id)
-        .where(QuestionUpvote.question_id == question_id)
+        select(QuestionUpvote.question_id)
+        .where(QuestionUpvote.question_id.in_(question_ids))
         .where(QuestionUpvote.farmer_id_hashed == viewer_id)
     )
-    return res.scalars().first() is not None
+    return set(res.scalars().all())
 
 
 async def get_post_detail(session: AsyncSession, post_id: str, viewer_id: Optional[str] = None) -> Optional[dict]:
@@ -178,7 +332,7 @@ async def get_post_detail(session: AsyncSession, post_id: str, viewer_id: Option
         .order_by(CommunityAnswer.is_expert_answer.desc(), CommunityAnswer.created_at.asc())
     )
     return {
-        **_serialize_question(question, await _did_upvote(session, question.id, viewer_id)),
+        **_serialize_question(question, question.id in await _upvoted_ids(session, [question.id], viewer_id)),
         "answers": [_serialize_answer(a) for a in answers.scalars().all()],
     }
 
@@ -207,6 +361,7 @@ async def toggle_question_upvote(session: AsyncSession, post_id: str, farmer_id_
         session.add(QuestionUpvote(question_id=post_id, farmer_id_hashed=farmer_id_hashed))
         question.upvotes_count = (question.upvotes_count or 0) + 1
         upvoted = True
+    refresh_hot_score(question)
 
     await session.commit()
     return {"upvoted": upvoted, "upvotes_count": question.upvotes_count or 0}
@@ -237,6 +392,7 @@ async def add_answer(
     question = q_result.scalars().first()
     if question:
         question.answers_count = (question.answers_count or 0) + 1
+        refresh_hot_score(question)
         if question.status == "pending":
             question.status = "answered"
     await session.commit()
@@ -295,18 +451,73 @@ async def get_question_by_id(session: AsyncSession, question_id: str) -> Optiona
     return _serialize_question(question) if question else None
 
 
-async def search_community_questions(session: AsyncSession, query: str, limit: int = 10):
-    query_embedding = encode_text(query)
-    rows = await query_vector_similarity("community_questions", "embedding", query_embedding, threshold=0.6, limit=limit)
+def reciprocal_rank_fusion(*rankings: List[str], k: int = SEARCH_RRF_K) -> Dict[str, float]:
+    """RRF score per id over best-first rankings: sum of 1 / (k + rank)."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+async def _semantic_leg(query: str, limit: int, filters: Dict[str, Any]) -> List[dict]:
+    query_embedding = await encode_text_async(query)
+    return await query_vector_similarity(
+        "community_questions", "embedding", query_embedding,
+        threshold=SEARCH_VECTOR_THRESHOLD, limit=limit, filters=filters,
+    )
+
+
+async def search_community_questions(
+    session: AsyncSession,
+    query: str,
+    limit: int = 10,
+    crop_type: Optional[str] = None,
+    district: Optional[str] = None,
+    budget_ms: float = SEARCH_BUDGET_MS,
+):
+    """
+    Hybrid search: keyword matches (exact chemical, variety and pest names)
+    fused with semantic matches by reciprocal rank. Crop and district filters
+    apply inside both legs, so neither returns rows the other would drop.
+    """
+    start = time.perf_counter()
+    filters = {k: v for k, v in (("crop_type", crop_type), ("district", district)) if v}
+    candidates = limit * 2  # fusion needs some depth from each leg
+
+    lexical = await lexical_search(session, query, limit=candidates, filters=filters)
+    semantic: List[dict] = []
+    if len(tokenize(query)) > SEARCH_KEYWORD_ONLY_MAX_TOKENS or len(lexical) < limit:
+        remaining = budget_ms / 1000 - (time.perf_counter() - start)
+        try:
+            semantic = await asyncio.wait_for(_semantic_leg(query, candidates, filters), timeout=max(remaining, 0.001))
+        except asyncio.TimeoutError:
+            metrics.inc("community_search_semantic_timeouts")
+            logger.warning("Semantic search leg exceeded the %.0fms budget; serving keyword results", budget_ms)
+    else:
+        metrics.inc("community_search_keyword_only")
+
+    rows: Dict[str, dict] = {}
+    for row in lexical + semantic:
+        rows.setdefault(index_key(row["id"]), {}).update(row)
+    fused = reciprocal_rank_fusion(
+        [index_key(row["id"]) for row in lexical],
+        [index_key(row["id"]) for row in semantic],
+    )
+    metrics.observe("community_search_seconds", time.perf_counter() - start)
+
     results = []
-    for row in rows:
+    for key in sorted(fused, key=fused.get, reverse=True)[:limit]:
+        row = rows[key]
         results.append({
             "id": str(row["id"]),
             "question_text": row["question_text"],
             "crop_type": row["crop_type"],
             "growth_stage": row["growth_stage"],
+            "district": row.get("district"),
             "status": row["status"],
-            "similarity": float(row["similarity"]),
+            "similarity": float(row["similarity"]) if row.get("similarity") is not None else None,
+            "score": fused[key],
             "created_at": row["created_at"].isoformat() if row["created_at"] else None,
         })
     return results
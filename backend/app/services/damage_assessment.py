@@ -0,0 +1,156 @@
+"""
+Batch crop-damage assessment for multi-photo emergency reports.
+
+All photos of a report are decoded in parallel on the CPU executor (JPEG
+draft mode, so only a downscaled image is ever materialized) into one
+``(N, S, S, 3)`` array. The same green-loss / texture heuristic as the CV2
+tier of VisionService is then computed for the whole batch at once with
+vectorized NumPy: an OpenCV-compatible HSV green mask and the variance of a
+4-neighbour Laplacian.
+"""
+
+import asyncio
+import base64
+import binascii
+import io
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from app.core.executors import get_cpu_executor
+from app.core.metrics import metrics
+
+DAMAGE_ASSESS_SIZE = int(os.getenv("DAMAGE_ASSESS_SIZE", 256))
+MAX_REPORT_PHOTOS = int(os.getenv("MAX_REPORT_PHOTOS", 20))
+
+# OpenCV 8-bit HSV ranges (H in [0, 180)) for healthy green vegetation
+GREEN_LOWER = (35, 40, 40)
+GREEN_UPPER = (85, 255, 255)
+
+ImagePayload = Union[str, bytes]
+
+
+def payload_bytes(payload: ImagePayload) -> bytes:
+    if isinstance(payload, bytes):
+        return payload
+    if payload.startswith("data:"):
+        payload = payload.split(",", 1)[-1]
+    return base64.b64decode(payload, validate=False)
+
+
+def decode_image(payload: ImagePayload, size: int = DAMAGE_ASSESS_SIZE) -> np.ndarray:
+    """Raw or base64 (optionally data-URI) image -> upright ``(size, size, 3)`` uint8 RGB."""
+    img = Image.open(io.BytesIO(payload_bytes(payload)))
+    if img.format == "JPEG":
+        img.draft("RGB", (size, size))
+    return assessment_array(ImageOps.exif_transpose(img), size)
+
+
+def assessment_array(img: Image.Image, size: int = DAMAGE_ASSESS_SIZE) -> np.ndarray:
+    """Upright PIL image -> ``(size, size, 3)`` uint8 RGB, the input ``score_batch`` expects."""
+    return np.asarray(img.convert("RGB").resize((size, size), Image.BILINEAR), dtype=np.uint8)
+
+
+def green_mask(rgb: np.ndarray) -> np.ndarray:
+    """Vectorized equivalent of ``cv2.inRange(cvtColor(img, BGR2HSV), GREEN_LOWER, GREEN_UPPER)``."""
+    rgb = rgb.astype(np.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    v = rgb.max(axis=-1)
+    diff = v - rgb.min(axis=-1)
+    safe_diff = np.where(diff == 0, 1.0, diff)
+    s = np.where(v == 0, 0.0, diff * 255.0 / np.where(v == 0, 1.0, v))
+    h = np.where(
+        v == r, 60.0 * (g - b) / safe_diff,
+        np.where(v == g, 120.0 + 60.0 * (b - r) / safe_diff, 240.0 + 60.0 * (r - g) / safe_diff),
+    )
+    h = np.where(diff == 0, 0.0, np.where(h < 0, h + 360.0, h))
+    h = np.round(h / 2.0)
+    s, v = np.round(s), np.round(v)
+    return (
+        (h >= GREEN_LOWER[0]) & (h <= GREEN_UPPER[0])
+        & (s >= GREEN_LOWER[1]) & (s <= GREEN_UPPER[1])
+        & (v >= GREEN_LOWER[2]) & (v <= GREEN_UPPER[2])
+    )
+
+
+def laplacian_variance(rgb: np.ndarray) -> np.ndarray:
+    """Per-image variance of the 3x3 Laplacian of the grayscale images in an (N, H, W, 3) batch."""
+    gray = np.round(rgb[..., 0] * 0.299 + rgb[..., 1] * 0.587 + rgb[..., 2] * 0.114).astype(np.float32)
+    p = np.pad(gray, ((0, 0), (1, 1), (1, 1)), mode="reflect")  # cv2.BORDER_REFLECT_101
+    lap = p[:, :-2, 1:-1] + p[:, 2:, 1:-1] + p[:, 1:-1, :-2] + p[:, 1:-1, 2:] - 4.0 * gray
+    return lap.reshape(lap.shape[0], -1).var(axis=1)
+
+
+def score_batch(batch: np.ndarray) -> List[Dict[str, float]]:
+    """Damage estimate per image of an (N, H, W, 3) RGB batch, same weights as the CV2 tier."""
+    green_pct = green_mask(batch).mean(axis=(1, 2)) * 100.0
+    green_loss = 100.0 - green_pct
+    texture = np.clip(100.0 - laplacian_variance(batch) / 5.0, 0.0, 100.0)
+    damage = np.clip(0.6 * green_loss + 0.4 * texture, 5.0, 95.0)
+    return [
+        {"damage_percent": round(float(d), 1), "green_loss_percent": round(float(gl), 1), "texture_score": round(float(t), 1)}
+        for d, gl, t in zip(damage, green_loss, texture)
+    ]
+
+
+def _aggregate(scores: Sequence[float], failed: int) -> Dict[str, Optional[float]]:
+    if not scores:
+        return {"count": 0, "failed": failed, "mean_damage_percent": None, "median_damage_percent": None, "max_damage_percent": None}
+    arr = np.asarray(scores)
+    return {
+        "count": len(scores),
+        "failed": failed,
+        "mean_damage_percent": round(float(arr.mean()), 1),
+        "median_damage_percent": round(float(np.median(arr)), 1),
+        "max_damage_percent": round(float(arr.max()), 1),
+    }
+
+
+def _safe_decode(payload: ImagePayload, size: int) -> Optional[np.ndarray]:
+    try:
+        return decode_image(payload, size)
+    except (OSError, ValueError, binascii.Error, Image.DecompressionBombError):
+        return None
+
+
+def _result(decoded: List[Optional[np.ndarray]]) -> Dict[str, object]:
+    ok = [i for i, arr in enumerate(decoded) if arr is not None]
+    images: List[Dict[str, object]] = [{"index": i, "error": "Could not decode image"} for i in range(len(decoded))]
+    if ok:
+        for i, score in zip(ok, score_batch(np.stack([decoded[i] for i in ok]))):
+            images[i] = {"index": i, **score}
+    return {
+        "images": images,
+        "aggregate": _aggregate([images[i]["damage_percent"] for i in ok], len(decoded) - len(ok)),
+    }
+
+
+def assess_damage_batch(payloads: Sequence[ImagePayload], size: int = DAMAGE_ASSESS_SIZE) -> Dict[str, object]:
+    """Blocking variant: decode in parallel on the CPU executor, then score the batch."""
+    start = time.perf_counter()
+    decoded = list(get_cpu_executor().map(lambda p: _safe_decode(p, size), payloads))
+    result = _result(decoded)
+    metrics.observe("damage_batch_seconds", time.perf_counter() - start)
+    metrics.observe("damage_batch_images", len(payloads))
+    return result
+
+
+async def assess_damage_batch_async(payloads: Sequence[ImagePayload], size: int = DAMAGE_ASSESS_SIZE) -> Dict[str, object]:
+    """Per-image and aggregate damage percentages for a report's photos."""
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    executor = get_cpu_executor()
+    decoded = await asyncio.gather(*(loop.run_in_executor(executor, _safe_decode, p, size) for p in payloads))
+    return await assess_decoded_async(list(decoded), start)
+
+
+async def assess_decoded_async(decoded: List[Optional[np.ndarray]], start: Optional[float] = None) -> Dict[str, object]:
+    """``assess_damage_batch_async`` for photos already decoded with ``assessment_array`` (None = undecodable)."""
+    start = time.perf_counter() if start is None else start
+    result = await asyncio.get_running_loop().run_in_executor(get_cpu_executor(), _result, decoded)
+    metrics.observe("damage_batch_seconds", time.perf_counter() - start)
+    metrics.observe("damage_batch_images", len(decoded))
+    return result
@@ -1,16 +1,150 @@
-"""Embedding service for semantic search."""
+"""Embedding service for semantic search.
 
+Async callers go through a micro-batching worker: concurrent
+``encode_text_async`` calls are collected into one ``model.encode`` call
+(up to EMBEDDING_MAX_BATCH texts, waiting at most EMBEDDING_MAX_WAIT_MS),
+which runs on the batcher's thread so the event loop never blocks on
+inference.
+
+Embeddings are cached by model name and a hash of the normalized text: an
+in-memory LRU of float32 vectors in front of an optional SQLite tier that
+stores float16 vectors (half the size, well within cosine-similarity noise).
+Repeat questions and searches skip the model entirely.
+
+EMBEDDING_BACKEND selects the runtime: ``torch`` (sentence-transformers) or
+``onnx`` (an int8-quantized export on onnxruntime; see
+``app.services.onnx_embedding``), which falls back to torch when no export is
+available. Both produce interchangeable vectors, so they share cache entries.
+"""
+
+import asyncio
+import hashlib
+import logging
 import os
-from typing import List
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.batching import DynamicBatcher
+from app.core.metrics import metrics
+from app.core.sqlite_store import SQLiteStore
+from app.storage import STATE_DIR
+
+logger = logging.getLogger("EmbeddingService")
 
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", 32))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", 5))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 10000))
+# Persistent float16 tier; set to an empty string to keep the cache in memory only
+EMBEDDING_CACHE_DB = os.getenv("EMBEDDING_CACHE_DB", os.path.join(STATE_DIR, "embedding_cache.sqlite3"))
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    key TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, key)
+);
+"""
+_WS_RE = re.compile(r"\s+")
 
 # Load model lazily once.
 _embedding_model = None
+_batcher: Optional[DynamicBatcher] = None
+_batcher_lock = threading.Lock()
+_cache: Optional["EmbeddingCache"] = None
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC, case-folded, whitespace collapsed: trivially different strings share a key."""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFC", text)).strip().casefold()
+
+
+def cache_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, model: str = EMBEDDING_MODEL, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+                 db_path: Optional[str] = EMBEDDING_CACHE_DB) -> None:
+        self.model = model
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._db = SQLiteStore(db_path, _CACHE_SCHEMA) if db_path else None
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        vector.setflags(write=False)  # shared with every caller that hits this entry
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get_memory(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+            return vector
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found = {k: v for k in keys if (v := self.get_memory(k)) is not None}
+        missing = [k for k in keys if k not in found]
+        if missing and self._db is not None:
+            placeholders = ",".join("?" * len(missing))
+            rows = self._db.query(
+                f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                [self.model, *missing],
+            )
+            with self._lock:
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+                    self._remember(key, vector)
+                    found[key] = vector
+        return found
+
+    def put_many(self, items: Sequence[Tuple[str, np.ndarray]]) -> None:
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, np.array(vector, dtype=np.float32))
+        if self._db is not None and items:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, vector) VALUES (?, ?, ?)",
+                [(self.model, key, np.asarray(v, dtype=np.float16).tobytes()) for key, v in items],
+            )
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    with _batcher_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+    return _cache
+
+
+def _record_lookups(hits: int, misses: int) -> None:
+    if hits:
+        metrics.inc("embedding_cache_hits", hits)
+    if misses:
+        metrics.inc("embedding_cache_misses", misses)
+    metrics.set_gauge("embedding_cache_hit_rate", metrics.hit_rate("embedding_cache_hits", "embedding_cache_misses"))
 
 
 def get_embedding_model():
     global _embedding_model
+    if _embedding_model is None and EMBEDDING_BACKEND == "onnx":
+        from app.services.onnx_embedding import EMBEDDING_ONNX_DIR, OnnxEmbeddingModel
+
+        try:
+            _embedding_model = OnnxEmbeddingModel.load()
+        except Exception as exc:
+            logger.warning(f"ONNX embedding backend unavailable ({EMBEDDING_ONNX_DIR}): {exc}. Using torch.")
     if _embedding_model is None:
         from sentence_transformers import SentenceTransformer
 
@@ -18,11 +152,56 @@ def get_embedding_model():
     return _embedding_model
 
 
-def encode_texts(texts: List[str]) -> List[List[float]]:
-    model = get_embedding_model()
-    return model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+def encode_texts(texts: List[str], use_cache: bool = True) -> np.ndarray:
+    """
+    ``(len(texts), dim)`` float32 embeddings for ``texts`` in order; only texts
+    missing from the cache reach the model. Bulk jobs pass ``use_cache=False``
+    so a one-off pass over the corpus neither fills the persistent tier nor
+    evicts hot entries.
+    """
+    if not texts:
+        return np.zeros((0, get_embedding_model().get_sentence_embedding_dimension()), dtype=np.float32)
+    if not use_cache:
+        vectors = get_embedding_model().encode(list(texts), convert_to_numpy=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+    cache = get_embedding_cache()
+    keys = [cache_key(t) for t in texts]
+    found = cache.get_many(list(dict.fromkeys(keys)))
+    missing = {k: t for k, t in zip(keys, texts) if k not in found}
+    miss_count = sum(k in missing for k in keys)
+    _record_lookups(len(keys) - miss_count, miss_count)
+    if missing:
+        model = get_embedding_model()
+        vectors = model.encode(list(missing.values()), convert_to_numpy=True, show_progress_bar=False)
+        computed = list(zip(missing.keys(), vectors))
+        cache.put_many(computed)
+        found.update(computed)
+    return np.stack([found[k] for k in keys]).astype(np.float32)
+
+
+def encode_text(text: str) -> np.ndarray:
+    return encode_texts([text])[0]
+
+
+def get_embedding_batcher() -> DynamicBatcher:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = DynamicBatcher(
+                encode_texts, max_batch_size=EMBEDDING_MAX_BATCH, max_wait_ms=EMBEDDING_MAX_WAIT_MS, name="embedding"
+            )
+    return _batcher
+
+
+async def encode_text_async(text: str) -> np.ndarray:
+    """Embed one text without blocking the loop, batched with concurrent callers."""
+    # Hot entries are answered inline; the persistent tier is checked on the worker
+    vector = get_embedding_cache().get_memory(cache_key(text))
+    if vector is not None:
+        _record_lookups(1, 0)
+        return vector
+    return await get_embedding_batcher().infer(text)
 
 
-def encode_text(text: str) -> List[float]:
-    model = get_embedding_model()
-    return model.encode([text], convert_to_numpy=True, show_progress_bar=False)[0]
+async def encode_texts_async(texts: List[str]) -> List[np.ndarray]:
+    return list(await asyncio.gather(*(encode_text_async(t) for t in texts)))
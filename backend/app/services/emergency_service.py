@@ -1,16 +1,67 @@
 """Emergency reporting, claims, and helpline service helpers."""
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
+import asyncio
+import binascii
+import hashlib
+import io
 import uuid
 
+import numpy as np
+from PIL import Image
+
+from app.core.executors import get_cpu_executor
+
 from app.models.emergency_models import (
     InsuranceProvider,
     DamageReport,
     ReportImage,
     HelplineCallLog,
 )
+from app.services.damage_assessment import ImagePayload, assess_decoded_async, assessment_array, payload_bytes
+from app.services.image_processing import (
+    IMAGE_THUMB_SIZE,
+    INGEST_MAX_SIDE,
+    find_stored_image,
+    image_url,
+    load_oriented,
+    process_image_bytes_async,
+    write_image_variants,
+)
+
+
+async def _store_report_photo(payload: str) -> Optional[str]:
+    """Decode a base64 photo into the file store so it is served as resized variants; None if undecodable."""
+    try:
+        return (await process_image_bytes_async(payload_bytes(payload)))["path"]
+    except Exception:
+        return None
+
+
+def _ingest_report_photo(payload: ImagePayload) -> Tuple[Optional[str], Optional[np.ndarray]]:
+    """Stored path and damage-scoring array of one photo from a single decode; None for what failed."""
+    try:
+        data = payload_bytes(payload)
+        img = load_oriented(io.BytesIO(data), INGEST_MAX_SIDE)
+    except (OSError, ValueError, binascii.Error, Image.DecompressionBombError):
+        return None, None
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        path = (find_stored_image(digest) or write_image_variants(img, digest))["path"]
+    except Exception:
+        path = None
+    return path, assessment_array(img)
+
+
+async def ingest_report_photos(payloads: List[ImagePayload]) -> Tuple[List[Optional[str]], Dict[str, object]]:
+    """Store a report's photos concurrently and assess their damage, decoding each photo once."""
+    loop = asyncio.get_running_loop()
+    executor = get_cpu_executor()
+    ingested = await asyncio.gather(*(loop.run_in_executor(executor, _ingest_report_photo, p) for p in payloads))
+    assessment = await assess_decoded_async([arr for _, arr in ingested])
+    return [path for path, _ in ingested], assessment
 
 
 async def list_insurance_providers(session: AsyncSession) -> List[dict]:
@@ -44,7 +95,9 @@ async def create_damage_report(
     insurance_provider_id: Optional[str] = None,
     voice_statement_transcribed: Optional[str] = None,
     image_data: Optional[List[str]] = None,
+    image_paths: Optional[List[Optional[str]]] = None,
 ) -> DamageReport:
+    """``image_paths`` are the stored copies of ``image_data`` from ``ingest_report_photos``, if already stored."""
     report = DamageReport(
         farmer_id=farmer_id,
         crop_type=crop_type,
@@ -63,10 +116,13 @@ async def create_damage_report(
     await session.refresh(report)
 
     if image_data:
-        for index, payload in enumerate(image_data, start=1):
+        if image_paths is None:
+            image_paths = await asyncio.gather(*(_store_report_photo(p) for p in image_data))
+        for index, (payload, stored) in enumerate(zip(image_data, image_paths), start=1):
             image = ReportImage(
                 report_id=report.id,
-                image_data=payload,
+                image_data=payload,  # the original stays the record of the claim
+                image_url=image_url(stored) if stored else None,
                 image_order=index,
             )
             session.add(image)
@@ -88,6 +144,7 @@ async def get_damage_report(session: AsyncSession, report_id: str) -> Optional[d
         {
             "id": str(image.id),
             "image_url": image.image_url,
+            "thumbnail_url": image_url(image.image_url, IMAGE_THUMB_SIZE),
             "image_order": image.image_order,
         }
         for image in report.images
@@ -0,0 +1,217 @@
+"""
+Perceptual-hash cache for image diagnoses.
+
+Each analyzed image is reduced to a 64-bit difference hash (dHash). A new
+image whose hash is within VISION_CACHE_MAX_DISTANCE bits of a cached one
+reuses that diagnosis instead of calling a model again. Hot entries live in a
+bounded per-namespace LRU; every entry is also written to a SQLite tier so the
+cache survives restarts. The SQLite lookup uses 8 one-byte bands: any hash
+within 7 bits of a stored one shares at least one band with it. The SQLite
+tier drops expired rows and keeps at most VISION_CACHE_DB_MAX_ENTRIES.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.core.metrics import metrics
+from app.core.sqlite_store import SQLiteStore
+from app.services.image_processing import load_oriented
+from app.storage import STATE_DIR
+
+VISION_CACHE_MAX_DISTANCE = int(os.getenv("VISION_CACHE_MAX_DISTANCE", 4))
+VISION_CACHE_MAX_ENTRIES = int(os.getenv("VISION_CACHE_MAX_ENTRIES", 2048))
+VISION_CACHE_TTL_DAYS = float(os.getenv("VISION_CACHE_TTL_DAYS", 30))
+VISION_CACHE_DB = os.getenv("VISION_CACHE_DB", os.path.join(STATE_DIR, "vision_cache.sqlite3"))
+VISION_CACHE_DB_MAX_ENTRIES = int(os.getenv("VISION_CACHE_DB_MAX_ENTRIES", 100000))
+
+# The persistent tier is pruned once every this many writes
+_PRUNE_EVERY = 256
+
+HASH_SIZE = 8
+N_BANDS = 8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_fingerprints (
+    namespace TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    b0 INTEGER, b1 INTEGER, b2 INTEGER, b3 INTEGER,
+    b4 INTEGER, b5 INTEGER, b6 INTEGER, b7 INTEGER,
+    result TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (namespace, hash)
+);
+CREATE INDEX IF NOT EXISTS ix_image_fingerprints_created ON image_fingerprints (created);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS ix_image_fingerprints_b{i} ON image_fingerprints (namespace, b{i});\n"
+    for i in range(N_BANDS)
+)
+
+
+def dhash(image_path: str, hash_size: int = HASH_SIZE) -> int:
+    """64-bit difference hash: sign of horizontal gradients on a 9x8 thumbnail."""
+    img = load_oriented(image_path, max_side=hash_size * 16).convert("L")
+    px = np.asarray(img.resize((hash_size + 1, hash_size), Image.BILINEAR), dtype=np.int16)
+    bits = (px[:, 1:] > px[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _bands(h: int):
+    return [(h >> (8 * i)) & 0xFF for i in range(N_BANDS)]
+
+
+class FingerprintCache:
+    def __init__(
+        self,
+        db_path: Optional[str] = VISION_CACHE_DB,
+        max_entries: int = VISION_CACHE_MAX_ENTRIES,
+        max_distance: int = VISION_CACHE_MAX_DISTANCE,
+        ttl_days: float = VISION_CACHE_TTL_DAYS,
+        db_max_entries: int = VISION_CACHE_DB_MAX_ENTRIES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.db_max_entries = db_max_entries
+        self.max_distance = max_distance
+        self.ttl_s = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._lru: Dict[str, "OrderedDict[int, Tuple[str, float]]"] = {}
+        self._db = SQLiteStore(db_path, _SCHEMA) if db_path else None
+        self._writes = 0
+
+    def _remember(self, namespace: str, h: int, result: str, created: float) -> None:
+        entries = self._lru.setdefault(namespace, OrderedDict())
+        entries[h] = (result, created)
+        entries.move_to_end(h)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def _lookup_memory(self, namespace: str, h: int, now: float) -> Optional[str]:
+        with self._lock:
+            entries = self._lru.get(namespace)
+            if not entries:
+                return None
+            best = None
+            for key, (result, created) in entries.items():
+                if now - created > self.ttl_s:
+                    continue
+                distance = hamming(key, h)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, key, result)
+                    if distance == 0:
+                        break
+            if best is None:
+                return None
+            entries.move_to_end(best[1])
+            return best[2]
+
+    def _lookup_db(self, namespace: str, h: int, now: float) -> Optional[str]:
+        bands = _bands(h)
+        where = " OR ".join(f"b{i} = ?" for i in range(N_BANDS))
+        rows = self._db.query(
+            f"SELECT hash, result, created FROM image_fingerprints WHERE namespace = ? AND created >= ? AND ({where})",
+            [namespace, now - self.ttl_s, *bands],
+        )
+        best = None
+        for hash_hex, result, created in rows:
+            distance = hamming(int(hash_hex, 16), h)
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, int(hash_hex, 16), result, created)
+        if best is None:
+            return None
+        with self._lock:
+            self._remember(namespace, best[1], best[2], best[3])
+        return best[2]
+
+    def get(self, namespace: str, h: int) -> Optional[str]:
+        now = time.time()
+        result = self._lookup_memory(namespace, h, now)
+        if result is None and self._db is not None:
+            result = self._lookup_db(namespace, h, now)
+        if result is None:
+            metrics.inc("vision_cache_misses")
+        else:
+            metrics.inc("vision_cache_hits")
+            metrics.inc("vision_cache_saved_inferences")
+        metrics.set_gauge("vision_cache_hit_rate", metrics.hit_rate("vision_cache_hits", "vision_cache_misses"))
+        return result
+
+    def put(self, namespace: str, h: int, result: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(namespace, h, result, now)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO image_fingerprints "
+                "(namespace, hash, b0, b1, b2, b3, b4, b5, b6, b7, result, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [namespace, f"{h:016x}", *_bands(h), result, now],
+            )
+            with self._lock:
+                self._writes += 1
+                due = self._writes % _PRUNE_EVERY == 1
+            if due:
+                self.prune(now)
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Drop expired rows and all but the newest ``db_max_entries`` from the SQLite tier."""
+        if self._db is None:
+            return
+        now = time.time() if now is None else now
+        self._db.execute(
+            "DELETE FROM image_fingerprints WHERE created < ? OR rowid IN "
+            "(SELECT rowid FROM image_fingerprints ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            [now - self.ttl_s, self.db_max_entries],
+        )
+
+
+_cache: Optional[FingerprintCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_fingerprint_cache() -> FingerprintCache:
+    """Get or create the process-wide diagnosis cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FingerprintCache()
+    return _cache
+
+
+def fingerprint_or_none(image_path: str) -> Optional[int]:
+    """dHash of the image, or None when it cannot be decoded (never cached)."""
+    try:
+        return dhash(image_path)
+    except Exception:
+        return None
+
+
+async def cached_diagnosis(
+    namespace: str,
+    image_path: str,
+    analyze: Callable[[], Awaitable[Tuple[bool, str]]],
+) -> str:
+    """
+    Return the cached diagnosis for a near-duplicate of ``image_path``, or run
+    ``analyze`` (which returns ``(cacheable, result)``) and remember its result.
+    Fallback answers should be returned as not cacheable.
+    """
+    fingerprint = await asyncio.to_thread(fingerprint_or_none, image_path)
+    cache = get_fingerprint_cache()
+    if fingerprint is not None:
+        cached = await asyncio.to_thread(cache.get, namespace, fingerprint)
+        if cached is not None:
+            return cached
+    cacheable, result = await analyze()
+    if cacheable and fingerprint is not None:
+        await asyncio.to_thread(cache.put, namespace, fingerprint, result)
+    return result
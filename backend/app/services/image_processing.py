@@ -0,0 +1,174 @@
+"""
+Image ingestion: decode once at reduced scale, fix orientation, and write a
+normalized main image plus WebP size variants into the file store.
+
+JPEG draft mode lets libjpeg decode directly at 1/2, 1/4 or 1/8 scale, so a
+12 MP phone photo is never materialized at full resolution. All work here is
+blocking and runs on the shared CPU executor.
+
+Stored images are served by ``GET /api/images/{name}``; ``image_url`` builds
+those URLs so API responses point list views at a small WebP variant rather
+than the main image.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import time
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+from app.core.executors import get_cpu_executor
+from app.core.metrics import metrics
+from app.storage import KIND_IMAGE, content_hash, get_file_store
+
+MAIN_MAX_SIDE = 1024
+VARIANT_SIZES = tuple(
+    sorted((int(s) for s in os.getenv("IMAGE_VARIANT_SIZES", "256,512,1024").split(",") if s.strip()), reverse=True)
+)
+# Decode scale that covers the main image and every variant
+INGEST_MAX_SIDE = max(MAIN_MAX_SIDE, *VARIANT_SIZES) if VARIANT_SIZES else MAIN_MAX_SIDE
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", 80))
+# Variant size requested for thumbnails in feeds and lists
+IMAGE_THUMB_SIZE = int(os.getenv("IMAGE_THUMB_SIZE", 512))
+JPEG_QUALITY = 85
+
+IMAGE_URL_PREFIX = "/api/images/"
+
+_MAIN_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG", ".webp": "WEBP"}
+
+
+def load_oriented(path: str, max_side: int = MAIN_MAX_SIDE) -> Image.Image:
+    """
+    Decode ``path`` at the smallest scale that still covers ``max_side`` and
+    apply its EXIF orientation, so callers always see an upright image.
+    """
+    img = Image.open(path)
+    if img.format == "JPEG":
+        img.draft("RGB", (max_side, max_side))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+    img.thumbnail((max_side, max_side))
+    return img
+
+
+def variant_name(digest: str, size: int) -> str:
+    return f"{digest}_{size}.webp"
+
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "JPEG":
+        img.convert("RGB").save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    elif fmt == "WEBP":
+        img.save(buf, format="WEBP", quality=WEBP_QUALITY, method=4)
+    else:
+        img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def process_image_file(src_path: str, digest: str, suffix: str = ".jpg") -> Dict[str, object]:
+    """
+    Write the main image (longest side MAIN_MAX_SIDE, original format) named
+    ``<digest><suffix>`` and one WebP per VARIANT_SIZES entry. Re-uploads of
+    the same bytes hit the existing files and skip decoding entirely.
+    """
+    stored = find_stored_image(digest, suffix)
+    if stored:
+        return stored
+
+    start = time.perf_counter()
+    img = load_oriented(src_path, INGEST_MAX_SIDE)
+    metrics.observe("image_decode_seconds", time.perf_counter() - start)
+    result = write_image_variants(img, digest, suffix)
+    metrics.observe("image_ingest_seconds", time.perf_counter() - start)
+    return result
+
+
+def find_stored_image(digest: str, suffix: str = ".jpg") -> Optional[Dict[str, object]]:
+    """The ingest result of an already stored image with all its variants, else None."""
+    store = get_file_store()
+    existing = store.find(KIND_IMAGE, f"{digest}{suffix}")
+    if existing and all(store.find(KIND_IMAGE, variant_name(digest, s)) for s in VARIANT_SIZES):
+        metrics.inc("image_ingest_dedup_hits")
+        return {"path": existing, "hash": digest, "variants": {s: store.find(KIND_IMAGE, variant_name(digest, s)) for s in VARIANT_SIZES}}
+    return None
+
+
+def write_image_variants(img: Image.Image, digest: str, suffix: str = ".jpg") -> Dict[str, object]:
+    """Store an image decoded with ``load_oriented(..., INGEST_MAX_SIDE)`` as the main image plus WebP variants."""
+    store = get_file_store()
+    main_name = f"{digest}{suffix}"
+    main = img.copy()
+    main.thumbnail((MAIN_MAX_SIDE, MAIN_MAX_SIDE))
+    path = store.write_bytes(KIND_IMAGE, main_name, _encode(main, _MAIN_FORMATS.get(suffix, "JPEG")))
+
+    variants = {}
+    current = img
+    for size in VARIANT_SIZES:  # largest first, each derived from the previous one
+        current = current.copy()
+        current.thumbnail((size, size))
+        variants[size] = store.write_bytes(KIND_IMAGE, variant_name(digest, size), _encode(current, "WEBP"))
+    return {"path": path, "hash": digest, "variants": variants}
+
+
+async def process_image_file_async(src_path: str, digest: str, suffix: str = ".jpg") -> Dict[str, object]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), process_image_file, src_path, digest, suffix)
+
+
+def process_image_bytes(data: bytes, suffix: str = ".jpg") -> Dict[str, object]:
+    """``process_image_file`` for an in-memory image (e.g. a base64 payload)."""
+    tmp_path = get_file_store().temp_path(KIND_IMAGE)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        return process_image_file(tmp_path, hashlib.sha256(data).hexdigest(), suffix)
+    finally:
+        os.remove(tmp_path)
+
+
+async def process_image_bytes_async(data: bytes, suffix: str = ".jpg") -> Dict[str, object]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), process_image_bytes, data, suffix)
+
+
+def image_url(value: Optional[str], size: Optional[int] = None) -> Optional[str]:
+    """
+    Public URL of a stored image given its path or URL: the main image, or the
+    variant covering ``size``. Anything else (external URLs) is returned as is.
+    """
+    if not value:
+        return value
+    if value.startswith(IMAGE_URL_PREFIX):
+        name = value[len(IMAGE_URL_PREFIX):].split("?", 1)[0]
+    elif get_file_store().is_managed(value):
+        name = os.path.basename(value)
+    else:
+        return value
+    if not content_hash(name):
+        return value
+    return f"{IMAGE_URL_PREFIX}{name}" + (f"?size={int(size)}" if size else "")
+
+
+def find_variant(image_path_or_name: str, size: Optional[int] = None) -> Optional[str]:
+    """
+    Path of the stored image ``image_path_or_name`` at the smallest variant
+    size that is at least ``size`` (the main image when no size is given).
+    """
+    store = get_file_store()
+    name = os.path.basename(image_path_or_name)
+    if size is None:
+        return store.find(KIND_IMAGE, name)
+    digest = content_hash(name)
+    if not digest:
+        return None
+    candidates = sorted(s for s in VARIANT_SIZES if s >= size) or sorted(VARIANT_SIZES, reverse=True)
+    for s in candidates:
+        path = store.find(KIND_IMAGE, variant_name(digest, s))
+        if path:
+            return path
+    return None
@@ -0,0 +1,151 @@
+"""
+Local CPU crop-disease classifier.
+
+An ONNX image classifier (e.g. a MobileNet/EfficientNet-Lite fine-tuned on
+PlantVillage) is loaded once and served through a DynamicBatcher, so
+concurrent diagnoses share forward passes. Preprocessing runs on the caller's
+thread; only the batched ``session.run`` happens on the worker.
+
+The model lives at LOCAL_VISION_MODEL_PATH with its class names in a JSON list
+next to it (``<model>.labels.json``). onnxruntime is optional: without it, or
+without a model file, ``get_local_classifier()`` returns None and the vision
+service keeps its previous fallbacks.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.batching import DynamicBatcher
+from app.services.image_processing import load_oriented
+
+logger = logging.getLogger("LocalClassifier")
+
+LOCAL_VISION_MODEL_PATH = os.getenv(
+    "LOCAL_VISION_MODEL_PATH",
+    str(Path(__file__).resolve().parent.parent.parent / "models" / "crop_disease.onnx"),
+)
+LOCAL_VISION_INPUT_SIZE = int(os.getenv("LOCAL_VISION_INPUT_SIZE", 224))
+LOCAL_VISION_MAX_BATCH = int(os.getenv("LOCAL_VISION_MAX_BATCH", 16))
+LOCAL_VISION_MAX_WAIT_MS = float(os.getenv("LOCAL_VISION_MAX_WAIT_MS", 10))
+LOCAL_VISION_THREADS = int(os.getenv("LOCAL_VISION_THREADS", 0))  # 0 lets onnxruntime decide
+
+_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+Prediction = List[Tuple[str, float]]
+
+
+def preprocess(image_path: str, size: int = LOCAL_VISION_INPUT_SIZE) -> np.ndarray:
+    """Decode, resize the short side to ``size * 8/7``, center-crop and normalize to CHW."""
+    img = load_oriented(image_path, max_side=size * 2).convert("RGB")
+    short = int(round(size * 8 / 7))
+    w, h = img.size
+    scale = short / min(w, h)
+    img = img.resize((max(size, round(w * scale)), max(size, round(h * scale))))
+    w, h = img.size
+    left, top = (w - size) // 2, (h - size) // 2
+    img = img.crop((left, top, left + size, top + size))
+    arr = (np.asarray(img, dtype=np.float32) / 255.0 - _MEAN) / _STD
+    return arr.transpose(2, 0, 1)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class LocalClassifier:
+    def __init__(
+        self,
+        session,
+        labels: Sequence[str],
+        input_size: int = LOCAL_VISION_INPUT_SIZE,
+        max_batch_size: int = LOCAL_VISION_MAX_BATCH,
+        max_wait_ms: float = LOCAL_VISION_MAX_WAIT_MS,
+        top_k: int = 3,
+    ) -> None:
+        self.session = session
+        self.labels = list(labels)
+        self.input_size = input_size
+        self.top_k = top_k
+        model_input = session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch_dim = model_input.shape[0] if model_input.shape else None
+        if isinstance(batch_dim, int) and batch_dim > 0:
+            max_batch_size = min(max_batch_size, batch_dim)  # exported with a fixed batch size
+        self.batcher: DynamicBatcher[np.ndarray, Prediction] = DynamicBatcher(
+            self._run_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, name="local_classifier"
+        )
+
+    @classmethod
+    def load(cls, model_path: str = LOCAL_VISION_MODEL_PATH) -> "LocalClassifier":
+        import onnxruntime as ort
+
+        labels_path = Path(model_path).with_suffix(".labels.json")
+        with open(labels_path, "r", encoding="utf-8") as f:
+            labels = json.load(f)
+        options = ort.SessionOptions()
+        if LOCAL_VISION_THREADS:
+            options.intra_op_num_threads = LOCAL_VISION_THREADS
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        logger.info(f"Loaded local classifier {model_path} ({len(labels)} classes)")
+        return cls(session, labels)
+
+    def _run_batch(self, tensors: List[np.ndarray]) -> List[Prediction]:
+        logits = self.session.run(None, {self.input_name: np.stack(tensors).astype(np.float32)})[0]
+        probs = _softmax(np.asarray(logits, dtype=np.float32))
+        top = np.argsort(-probs, axis=1)[:, : self.top_k]
+        return [
+            [(self.labels[i] if i < len(self.labels) else str(i), float(row[i])) for i in idx]
+            for row, idx in zip(probs, top)
+        ]
+
+    def classify(self, image_path: str) -> Prediction:
+        """Top-k (label, probability) for one image; blocks until its batch has run."""
+        return self.batcher.infer_sync(preprocess(image_path, self.input_size))
+
+    async def classify_async(self, image_path: str) -> Prediction:
+        tensor = await asyncio.to_thread(preprocess, image_path, self.input_size)
+        return await self.batcher.infer(tensor)
+
+    def close(self) -> None:
+        self.batcher.close()
+
+
+_classifier: Optional[LocalClassifier] = None
+_load_attempted = False
+_load_lock = threading.Lock()
+
+
+def get_local_classifier() -> Optional[LocalClassifier]:
+    """The process-wide classifier, or None when no model/runtime is available (checked once)."""
+    global _classifier, _load_attempted
+    with _load_lock:
+        if not _load_attempted:
+            _load_attempted = True
+            if not os.path.exists(LOCAL_VISION_MODEL_PATH):
+                logger.info(f"No local vision model at {LOCAL_VISION_MODEL_PATH}. Local tier disabled.")
+            else:
+                try:
+                    _classifier = LocalClassifier.load(LOCAL_VISION_MODEL_PATH)
+                except ImportError:
+                    logger.warning("onnxruntime is not installed. Local tier disabled.")
+                except Exception as exc:
+                    logger.warning(f"Failed to load local vision model: {exc}")
+    return _classifier
+
+
+async def get_local_classifier_async() -> Optional[LocalClassifier]:
+    """``get_local_classifier`` for coroutines: the first call loads the model on a worker thread."""
+    if _load_attempted:
+        return _classifier
+    return await asyncio.to_thread(get_local_classifier)
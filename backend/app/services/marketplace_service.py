@@ -14,7 +14,10 @@ from app.models.marketplace_models import (
     ListingContactLog,
 )
 from app.db import DATABASE_URL
-from app.services.ocr_service import extract_text_from_base64, parse_label_text
+from app.services.barcode_service import decode_barcode_async
+from app.services.image_processing import IMAGE_THUMB_SIZE, image_url
+from app.services.ocr_service import extract_text_async, parse_label_text
+from app.services.product_index import get_product_index
 
 
 def _serialize_dealer(dealer: Dealer) -> dict:
@@ -141,24 +144,15 @@ async def scan_product(
     lon: Optional[float] = None,
 ) -> dict:
     if not barcode and not qr_text and image_base64:
-        from app.services.barcode_service import decode_barcode_base64
-
-        decoded = decode_barcode_base64(image_base64)
+        decoded = await decode_barcode_async(image_base64)
         if decoded:
             if decoded.isdigit() or len(decoded) <= 20:
                 barcode = decoded
             else:
                 qr_text = decoded
 
-    from sqlalchemy import select
-
-    product = None
-    if barcode:
-        result = await session.execute(select(VerifiedProduct).where(VerifiedProduct.barcode == barcode))
-        product = result.scalars().first()
-    elif qr_text:
-        result = await session.execute(select(VerifiedProduct).where(VerifiedProduct.qr_code == qr_text))
-        product = result.scalars().first()
+    # Matched against the in-memory registry index, not a per-scan query
+    product = await get_product_index().lookup(session, barcode=barcode, qr_text=qr_text)
 
     verification_result = "UNREGISTERED"
     confidence_score = 0.0
@@ -173,7 +167,8 @@ async def scan_product(
             confidence_score = 0.96
             verified_product_id = product.id
     elif image_base64:
-        text = extract_text_from_base64(image_base64)
+        # OCR only when no registered code was found
+        text = await extract_text_async(image_base64)
         parsed = parse_label_text(text)
         if parsed.get("product_name"):
             verification_result = "MATCH_FOUND"
@@ -263,7 +258,8 @@ def _serialize_listing(listing: MarketplaceListing, mask: bool = True) -> dict:
         "seller_name": listing.seller_name,
         "phone_number": phone,
         "posted_date": listing.posted_date.isoformat() if listing.posted_date else None,
-        "photo_url": listing.photo_url,
+        "photo_url": image_url(listing.photo_url),
+        "photo_thumb_url": image_url(listing.photo_url, IMAGE_THUMB_SIZE),
         "is_active": listing.is_active,
         "listing_type": listing.listing_type,
         "description": listing.description,
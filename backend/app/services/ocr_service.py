@@ -3,10 +3,19 @@
 import os
 import io
 import base64
+import asyncio
+import logging
 from typing import Dict
 
+from app.core.executors import SCAN_JOB_TIMEOUT_S, run_in_process
+from app.core.metrics import metrics
+
+logger = logging.getLogger("OCRService")
+
 TESSERACT_CMD = os.getenv("TESSERACT_CMD", "/usr/bin/tesseract")
 TESSERACT_LANGUAGES = os.getenv("TESSERACT_LANGUAGES", "eng+ben")
+# Seconds before a tesseract run is killed, so a stuck job frees its worker
+TESSERACT_TIMEOUT_S = float(os.getenv("TESSERACT_TIMEOUT_S", SCAN_JOB_TIMEOUT_S))
 
 
 def _load_tesseract():
@@ -27,15 +36,32 @@ def preprocess_image(image):
     return image
 
 
-def extract_text_from_base64(image_base64: str) -> str:
+def extract_text_from_bytes(image_bytes: bytes) -> str:
     pytesseract, Image, _, _ = _load_tesseract()
-    image_bytes = base64.b64decode(image_base64)
     image = Image.open(io.BytesIO(image_bytes))
     image = preprocess_image(image)
-    text = pytesseract.image_to_string(image, lang=TESSERACT_LANGUAGES)
+    text = pytesseract.image_to_string(image, lang=TESSERACT_LANGUAGES, timeout=TESSERACT_TIMEOUT_S)
     return text
 
 
+def extract_text_from_base64(image_base64: str) -> str:
+    return extract_text_from_bytes(base64.b64decode(image_base64))
+
+
+async def extract_text_async(image_base64: str) -> str:
+    """OCR in the scan process pool; an empty string on timeout or failure."""
+    metrics.inc("scan_ocr_runs")
+    try:
+        with metrics.timer("scan_ocr_seconds"):
+            return await run_in_process(extract_text_from_base64, image_base64, timeout=SCAN_JOB_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        metrics.inc("scan_timeouts")
+        logger.warning("OCR timed out after %.0fs", SCAN_JOB_TIMEOUT_S)
+    except Exception as exc:
+        logger.warning(f"OCR failed: {exc}")
+    return ""
+
+
 def parse_label_text(text: str) -> Dict[str, str]:
     # Basic label parsing with keyword extraction
     lines = [line.strip() for line in text.splitlines() if line.strip()]
@@ -0,0 +1,105 @@
+"""
+int8-quantized ONNX backend for sentence embeddings on CPU.
+
+Runs an ONNX export of the sentence-transformers model (see
+``scripts/export_embedding_onnx.py``) with onnxruntime and the Rust
+``tokenizers`` library, so serving needs neither torch nor
+sentence-transformers. Pooling reproduces the sentence-transformers pipeline
+for EMBEDDING_MODEL: attention-masked mean over the last hidden state, with
+no normalization. The export is validated against the torch model
+(EMBEDDING_ONNX_MIN_COSINE), so vectors from either backend are
+interchangeable with those already stored and cached.
+
+The export directory holds ``model.int8.onnx`` and ``tokenizer.json``.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("OnnxEmbedding")
+
+EMBEDDING_ONNX_DIR = os.getenv(
+    "EMBEDDING_ONNX_DIR",
+    str(Path(__file__).resolve().parent.parent.parent / "models" / "embedding_onnx"),
+)
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "model.int8.onnx")
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", 0))  # 0 lets onnxruntime decide
+EMBEDDING_ONNX_MAX_LENGTH = int(os.getenv("EMBEDDING_ONNX_MAX_LENGTH", 128))  # the model's max_seq_length
+EMBEDDING_ONNX_MIN_COSINE = float(os.getenv("EMBEDDING_ONNX_MIN_COSINE", 0.99))
+
+
+def mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Mean of token vectors over real (unpadded) tokens: (B, T, H), (B, T) -> (B, H)."""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (hidden.astype(np.float32) * mask).sum(axis=1)
+    return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity between two embedding matrices."""
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    dots = (reference * candidate).sum(axis=1)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    return dots / np.clip(norms, 1e-12, None)
+
+
+class OnnxEmbeddingModel:
+    """Drop-in for the ``SentenceTransformer.encode`` calls made by the embedding service."""
+
+    def __init__(self, session, tokenizer, max_length: int = EMBEDDING_ONNX_MAX_LENGTH, batch_size: int = 64) -> None:
+        self.session = session
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.input_names = {i.name for i in session.get_inputs()}
+        pad_token = next((t for t in ("<pad>", "[PAD]") if tokenizer.token_to_id(t) is not None), None)
+        pad_id = tokenizer.token_to_id(pad_token) if pad_token else 0
+        tokenizer.enable_truncation(max_length=max_length)
+        tokenizer.enable_padding(pad_id=pad_id, pad_token=pad_token or "[PAD]")
+
+    @classmethod
+    def load(cls, model_dir: str = EMBEDDING_ONNX_DIR, model_file: str = EMBEDDING_ONNX_FILE) -> "OnnxEmbeddingModel":
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        options = ort.SessionOptions()
+        if EMBEDDING_ONNX_THREADS:
+            options.intra_op_num_threads = EMBEDDING_ONNX_THREADS
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        model_path = os.path.join(model_dir, model_file)
+        session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        logger.info(f"Loaded ONNX embedding model {model_path}")
+        return cls(session, tokenizer)
+
+    def _run(self, texts: Sequence[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        return mean_pool(hidden, attention_mask)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        dim = self.session.get_outputs()[0].shape[-1]
+        return dim if isinstance(dim, int) else self._run([""]).shape[1]
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True, show_progress_bar: bool = False,
+               batch_size: int = None) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        batch_size = batch_size or self.batch_size
+        # Batch texts of similar length together so little compute goes to padding
+        order = np.argsort([len(t) for t in texts])
+        out = [None] * len(texts)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            for i, vector in zip(idx, self._run([texts[i] for i in idx])):
+                out[i] = vector
+        return np.stack(out)
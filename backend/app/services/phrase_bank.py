@@ -0,0 +1,128 @@
+"""
+Pre-rendered audio for frequent Bengali phrases.
+
+``scripts/build_phrase_bank.py`` renders crop names, numbers, units and
+standard advisory sentences once into PHRASE_BANK_DIR together with a
+``manifest.json``. A reply made up entirely of bank phrases is assembled by
+concatenating those clips, so it needs no synthesis and no network.
+"""
+
+import json
+import os
+import re
+import threading
+import wave
+from typing import Dict, List, Optional, Tuple
+
+PHRASE_BANK_DIR = os.getenv(
+    "PHRASE_BANK_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "models", "phrase_bank"),
+)
+MANIFEST_NAME = "manifest.json"
+
+_TOKEN_STRIP_RE = re.compile(r"[।,.?!;:\"'()\[\]]")
+
+_bank_lock = threading.Lock()
+_bank: Optional["PhraseBank"] = None
+_bank_loaded = False
+
+
+def normalize_phrase(text: str) -> Tuple[str, ...]:
+    """Tokens of ``text`` with punctuation and case removed."""
+    tokens = (_TOKEN_STRIP_RE.sub("", word).lower() for word in (text or "").split())
+    return tuple(token for token in tokens if token)
+
+
+def concat_audio(paths: List[str], out_path: str, fmt: str) -> None:
+    """
+    Join clips of the same format. MP3 streams are frame sequences and can be
+    appended byte-wise; WAV clips are re-framed with the first clip's params.
+    """
+    if fmt == "wav":
+        with wave.open(out_path, "wb") as out:
+            for i, path in enumerate(paths):
+                with wave.open(path, "rb") as clip:
+                    if i == 0:
+                        out.setparams(clip.getparams())
+                    out.writeframes(clip.readframes(clip.getnframes()))
+        return
+    with open(out_path, "wb") as out:
+        for path in paths:
+            with open(path, "rb") as clip:
+                out.write(clip.read())
+
+
+class PhraseBank:
+    """Maps normalized phrases to pre-rendered clips for one language."""
+
+    def __init__(self, directory: str, lang: str, fmt: str, phrases: Dict[str, str], voice: str = "") -> None:
+        self.directory = directory
+        self.lang = lang
+        self.format = fmt
+        self.voice = voice  # TTS backend voice the clips were rendered with
+        self.clips: Dict[Tuple[str, ...], str] = {}
+        for phrase, filename in phrases.items():
+            tokens = normalize_phrase(phrase)
+            if tokens:
+                self.clips[tokens] = os.path.join(directory, filename)
+        self.max_tokens = max((len(t) for t in self.clips), default=0)
+
+    @classmethod
+    def load(cls, directory: str = PHRASE_BANK_DIR) -> Optional["PhraseBank"]:
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        return cls(
+            directory,
+            manifest.get("lang", "bn"),
+            manifest.get("format", "mp3"),
+            manifest.get("phrases", {}),
+            manifest.get("voice", ""),
+        )
+
+    def match(self, text: str, lang: str) -> Optional[List[str]]:
+        """
+        Clip paths covering ``text`` by greedy longest match, or None if any
+        word is not in the bank (the caller then synthesizes normally).
+        """
+        if lang != self.lang or not self.clips:
+            return None
+        tokens = normalize_phrase(text)
+        if not tokens:
+            return None
+        paths = []
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self.max_tokens, len(tokens) - i), 0, -1):
+                path = self.clips.get(tokens[i:i + n])
+                if path:
+                    paths.append(path)
+                    i += n
+                    break
+            else:
+                return None
+        return paths
+
+
+def get_phrase_bank() -> Optional[PhraseBank]:
+    """The phrase bank in PHRASE_BANK_DIR, loaded once; None if not built."""
+    global _bank, _bank_loaded
+    if not _bank_loaded:
+        with _bank_lock:
+            if not _bank_loaded:
+                try:
+                    _bank = PhraseBank.load()
+                except (OSError, ValueError) as e:
+                    print(f"[WARNING] Could not load TTS phrase bank: {e}")
+                    _bank = None
+                _bank_loaded = True
+    return _bank
+
+
+def reload_phrase_bank() -> Optional[PhraseBank]:
+    global _bank_loaded
+    with _bank_lock:
+        _bank_loaded = False
+    return get_phrase_bank()
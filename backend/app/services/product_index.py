@@ -0,0 +1,109 @@
+"""
+In-memory lookup index for verified products.
+
+Barcode and QR scans are matched against dict indexes of the (small)
+VerifiedProduct registry instead of querying the database per scan. The index
+is loaded lazily on first use and reloaded when stale: after a transaction
+that inserted, updated or deleted a VerifiedProduct in this process commits
+(mapper events mark the session, its after_commit hook invalidates), and after
+PRODUCT_INDEX_TTL_S to pick up changes made elsewhere.
+"""
+
+import asyncio
+import os
+import time
+from datetime import date
+from typing import Any, Dict, NamedTuple, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.metrics import metrics
+from app.models.marketplace_models import VerifiedProduct
+
+PRODUCT_INDEX_TTL_S = float(os.getenv("PRODUCT_INDEX_TTL_S", 300))
+
+
+class ProductEntry(NamedTuple):
+    id: Any
+    expiry_date: Optional[date]
+
+
+class ProductIndex:
+    def __init__(self, ttl_s: float = PRODUCT_INDEX_TTL_S) -> None:
+        self.ttl_s = ttl_s
+        self._by_barcode: Dict[str, ProductEntry] = {}
+        self._by_qr: Dict[str, ProductEntry] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None  # created in the running loop on first refresh
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    @property
+    def stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_s
+
+    async def refresh(self, session: AsyncSession) -> None:
+        start = time.perf_counter()
+        result = await session.execute(select(VerifiedProduct))
+        by_barcode, by_qr = {}, {}
+        for product in result.scalars().all() or []:
+            entry = ProductEntry(product.id, product.expiry_date)
+            if getattr(product, "barcode", None):
+                by_barcode[product.barcode] = entry
+            if getattr(product, "qr_code", None):
+                by_qr[product.qr_code] = entry
+        # Swap whole dicts so concurrent readers never see a half-built index
+        self._by_barcode, self._by_qr = by_barcode, by_qr
+        self._loaded_at = time.monotonic()
+        metrics.set_gauge("product_index_size", len(by_barcode))
+        metrics.observe("product_index_refresh_seconds", time.perf_counter() - start)
+
+    async def _ensure_fresh(self, session: AsyncSession) -> None:
+        if not self.stale:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.stale:
+                await self.refresh(session)
+
+    async def lookup(
+        self, session: AsyncSession, barcode: Optional[str] = None, qr_text: Optional[str] = None
+    ) -> Optional[ProductEntry]:
+        await self._ensure_fresh(session)
+        entry = self._by_barcode.get(barcode) if barcode else self._by_qr.get(qr_text) if qr_text else None
+        metrics.inc("product_index_hits" if entry else "product_index_misses")
+        return entry
+
+
+_index = ProductIndex()
+
+
+def get_product_index() -> ProductIndex:
+    return _index
+
+
+_CHANGED_KEY = "verified_products_changed"
+
+
+@event.listens_for(VerifiedProduct, "after_insert")
+@event.listens_for(VerifiedProduct, "after_update")
+@event.listens_for(VerifiedProduct, "after_delete")
+def _mark_changed(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        _index.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
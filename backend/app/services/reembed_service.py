@@ -0,0 +1,142 @@
+"""
+Bulk re-embedding of community questions.
+
+Needed when EMBEDDING_MODEL changes (every stored vector is stale) or when
+questions were stored without an embedding. Rows are streamed in id order
+with keyset pagination (``WHERE id > :last``, never OFFSET), encoded in large
+batches on a worker thread and written back with one executemany UPDATE per
+chunk. After each committed chunk the last id is checkpointed to a JSON
+file, so an interrupted run resumes where it stopped; a pause between chunks
+leaves room for online traffic on the database and the model.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.metrics import metrics
+from app.db import AsyncSessionLocal
+from app.models.community_models import CommunityQuestion
+from app.services.embedding_service import EMBEDDING_MODEL, encode_texts
+from app.storage import STATE_DIR
+from app.utils.vector_index import index_key
+from app.utils.vector_utils import id_param, index_vectors
+
+logger = logging.getLogger("ReembedService")
+
+REEMBED_CHUNK_SIZE = int(os.getenv("REEMBED_CHUNK_SIZE", 256))
+REEMBED_PAUSE_S = float(os.getenv("REEMBED_PAUSE_S", 0.5))
+REEMBED_CHECKPOINT = os.getenv("REEMBED_CHECKPOINT", os.path.join(STATE_DIR, "reembed_checkpoint.json"))
+
+MODES = ("missing", "all")
+
+_table = CommunityQuestion.__table__
+
+
+def load_checkpoint(path: str, mode: str) -> Optional[Dict[str, Any]]:
+    """The saved progress of an unfinished run of ``mode`` with the current model."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get("model") != EMBEDDING_MODEL or checkpoint.get("mode") != mode or checkpoint.get("done"):
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+async def _fetch_chunk(session, last_id: Optional[Any], mode: str, chunk_size: int):
+    stmt = select(_table.c.id, _table.c.question_text).order_by(_table.c.id).limit(chunk_size)
+    if last_id is not None:
+        stmt = stmt.where(_table.c.id > last_id)
+    if mode == "missing":
+        stmt = stmt.where(_table.c.embedding.is_(None))
+    return (await session.execute(stmt)).all()
+
+
+async def _write_chunk(session, ids, vectors) -> None:
+    stmt = (
+        update(_table)
+        .where(_table.c.id == bindparam("b_id"))
+        # Re-embedding is not an edit: keep updated_at instead of letting onupdate bump it
+        .values(embedding=bindparam("b_embedding"), updated_at=_table.c.updated_at)
+    )
+    await session.execute(stmt, [{"b_id": i, "b_embedding": v.tolist()} for i, v in zip(ids, vectors)])
+    await session.commit()
+
+
+async def reembed_questions(
+    mode: str = "missing",
+    chunk_size: int = REEMBED_CHUNK_SIZE,
+    pause_s: float = REEMBED_PAUSE_S,
+    checkpoint_path: str = REEMBED_CHECKPOINT,
+    restart: bool = False,
+    max_rows: Optional[int] = None,
+    session_factory=AsyncSessionLocal,
+) -> Dict[str, Any]:
+    """
+    Recompute embeddings for questions without one (``missing``) or for every
+    question (``all``). Returns a summary with rows processed and rows/sec.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown re-embed mode '{mode}', expected one of {MODES}")
+    checkpoint = None if restart else load_checkpoint(checkpoint_path, mode)
+    if checkpoint is None:
+        checkpoint = {"model": EMBEDDING_MODEL, "mode": mode, "last_id": None, "processed": 0,
+                      "started_at": datetime.utcnow().isoformat(), "done": False}
+    else:
+        logger.info(f"Resuming re-embed ({mode}) after {checkpoint['processed']} rows")
+
+    last_id = id_param(_table, checkpoint["last_id"]) if checkpoint["last_id"] else None
+    processed = 0
+    start = time.perf_counter()
+    async with session_factory() as session:
+        while max_rows is None or processed < max_rows:
+            size = chunk_size if max_rows is None else min(chunk_size, max_rows - processed)
+            rows = await _fetch_chunk(session, last_id, mode, size)
+            if not rows:
+                checkpoint["done"] = True
+                break
+            ids = [row[0] for row in rows]
+            # Uncached: every row of a backfill misses, and caching them would
+            # copy the corpus into the embedding cache and flush its hot entries
+            vectors = await asyncio.to_thread(encode_texts, [row[1] or "" for row in rows], use_cache=False)
+            await _write_chunk(session, ids, vectors)
+            index_vectors(_table.name, "embedding", ids, vectors)
+
+            last_id = ids[-1]
+            processed += len(rows)
+            rate = processed / max(time.perf_counter() - start, 1e-9)
+            checkpoint.update(last_id=index_key(last_id), processed=checkpoint["processed"] + len(rows))
+            save_checkpoint(checkpoint_path, checkpoint)
+            metrics.inc("reembed_rows", len(rows))
+            metrics.set_gauge("reembed_rows_per_second", rate)
+            logger.info(f"Re-embedded {checkpoint['processed']} rows ({rate:.1f} rows/s)")
+            if pause_s > 0:
+                await asyncio.sleep(pause_s)
+    save_checkpoint(checkpoint_path, checkpoint)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "model": EMBEDDING_MODEL,
+        "processed": processed,
+        "total_processed": checkpoint["processed"],
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+        "done": checkpoint["done"],
+    }
@@ -3,6 +3,8 @@ import logging
 import json
 from typing import Dict, Any, Optional, List
 import base64
+from app.core.http_clients import get_async_groq
+from app.services.image_fingerprint import cached_diagnosis
 
 logger = logging.getLogger("SoilService")
 
@@ -22,19 +24,23 @@ class SoilService:
         if not image_path or not os.path.exists(image_path):
             return "No valid soil image provided for analysis."
 
-        # 1. Primary: HuggingFace ViT (prof-freakenstein/plantnet-disease-detection or similar)
-        # In a real production environment, we call the Inference API
-        result = await self._call_hf_vit_model(image_path)
-        if result:
-            return f"Primary Model Analysis:\n{result}"
+        async def analyze():
+            # 1. Primary: HuggingFace ViT (prof-freakenstein/plantnet-disease-detection or similar)
+            # In a real production environment, we call the Inference API
+            result = await self._call_hf_vit_model(image_path)
+            if result:
+                return True, f"Primary Model Analysis:\n{result}"
 
-        # 2. Secondary: Groq Llama Vision
-        result = await self._call_groq_vision(image_path)
-        if result:
-            return f"Secondary Model (Groq) Analysis:\n{result}"
+            # 2. Secondary: Groq Llama Vision
+            result = await self._call_groq_vision(image_path)
+            if result:
+                return True, f"Secondary Model (Groq) Analysis:\n{result}"
 
-        # 3. Tertiary: Rule-based Fallback
-        return "Fallback Analysis: The soil appears to be Loamy with a dark brown color, indicating good organic matter content."
+            # 3. Tertiary: Rule-based Fallback
+            return False, "Fallback Analysis: The soil appears to be Loamy with a dark brown color, indicating good organic matter content."
+
+        # Near-duplicate photos reuse the earlier analysis
+        return await cached_diagnosis("soil_service", image_path, analyze)
 
     async def _call_hf_vit_model(self, image_path: str) -> Optional[str]:
         """Simulates/implements a call to a fine-tuned ViT model on HuggingFace."""
@@ -55,12 +61,11 @@ class SoilService:
             return None
 
         try:
-            from groq import Groq
             with open(image_path, "rb") as img_file:
                 base64_image = base64.b64encode(img_file.read()).decode("utf-8")
 
-            client = Groq(api_key=self.groq_api_key)
-            completion = client.chat.completions.create(
+            client = get_async_groq(self.groq_api_key)
+            completion = await client.chat.completions.create(
                 model="llama-3.2-11b-vision-preview",
                 messages=[
                     {
@@ -0,0 +1,97 @@
+"""
+Incremental speech segmentation for streaming voice input.
+
+Clients send 16-bit little-endian mono PCM while the farmer is speaking. An
+energy VAD groups frames into speech segments; each closed segment can be
+transcribed right away so partial transcripts flow back before the farmer has
+finished. A long enough pause after speech marks end-of-speech, at which point
+the reasoning pipeline can start.
+"""
+
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.audio_chunking import FRAME_MS
+
+VAD_THRESHOLD = float(os.getenv("STT_VAD_THRESHOLD", 0.01))
+SEGMENT_SILENCE_MS = int(os.getenv("STT_SEGMENT_SILENCE_MS", 400))
+END_OF_SPEECH_MS = int(os.getenv("STT_END_OF_SPEECH_MS", 1200))
+MAX_SEGMENT_SECONDS = float(os.getenv("STT_MAX_SEGMENT_SECONDS", 20))
+# Per connection: segments being transcribed at once; further segments are
+# merged into one backlog segment, and dropped once it holds this much audio.
+MAX_PENDING_SEGMENTS = int(os.getenv("STT_STREAM_MAX_PENDING", 2))
+MAX_BACKLOG_SECONDS = float(os.getenv("STT_STREAM_MAX_BACKLOG_SECONDS", 60))
+# PCM rates a client may announce in its start message
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 48000)
+
+
+class StreamingTranscriber:
+    """Energy-VAD segmenter fed with raw PCM16 frames."""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        threshold: float = VAD_THRESHOLD,
+        segment_silence_ms: int = SEGMENT_SILENCE_MS,
+        end_of_speech_ms: int = END_OF_SPEECH_MS,
+        max_segment_s: float = MAX_SEGMENT_SECONDS,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.frame_len = max(int(sample_rate * FRAME_MS / 1000), 1)
+        self.segment_silence_frames = max(segment_silence_ms // FRAME_MS, 1)
+        self.end_of_speech_frames = max(end_of_speech_ms // FRAME_MS, 1)
+        self.max_segment_frames = max(int(max_segment_s * 1000 / FRAME_MS), 1)
+        self.reset()
+
+    def reset(self) -> None:
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._segment: List[np.ndarray] = []
+        self._segment_silence = 0
+        self._trailing_silence = 0
+        self.heard_speech = False
+
+    @property
+    def end_of_speech(self) -> bool:
+        return self.heard_speech and self._trailing_silence >= self.end_of_speech_frames
+
+    def feed(self, pcm: bytes) -> List[np.ndarray]:
+        """Consume PCM16 bytes; return any speech segments that just closed."""
+        samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % 2], dtype="<i2").astype(np.float32) / 32768.0
+        audio = np.concatenate([self._pending, samples])
+        n_frames = len(audio) // self.frame_len
+        self._pending = audio[n_frames * self.frame_len:]
+
+        closed = []
+        for i in range(n_frames):
+            frame = audio[i * self.frame_len:(i + 1) * self.frame_len]
+            is_speech = float(np.sqrt(np.mean(frame ** 2))) >= self.threshold
+            if is_speech:
+                self.heard_speech = True
+                self._segment.append(frame)
+                self._segment_silence = 0
+                self._trailing_silence = 0
+            else:
+                self._trailing_silence += 1
+                if self._segment:
+                    self._segment.append(frame)
+                    self._segment_silence += 1
+                    if self._segment_silence >= self.segment_silence_frames:
+                        closed.append(self._close_segment())
+            if len(self._segment) >= self.max_segment_frames:
+                closed.append(self._close_segment())
+        return closed
+
+    def flush(self) -> Optional[np.ndarray]:
+        """Return the open segment (if any) at end of stream."""
+        if not self._segment:
+            return None
+        return self._close_segment()
+
+    def _close_segment(self) -> np.ndarray:
+        segment = np.concatenate(self._segment)
+        self._segment = []
+        self._segment_silence = 0
+        return segment
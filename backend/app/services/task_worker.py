@@ -27,6 +27,11 @@ async def process_task(task: AsyncTask, db: AsyncSession):
         elif task.task_type == "satellite_scan":
             # Mock or actual satellite scan logic
             result = {"status": "completed", "ndvi": 0.65, "health": "Good"}
+        elif task.task_type in ("reembed_questions", "reembed_questions_all"):
+            # Resumable: a task re-queued after a crash continues from the checkpoint
+            from app.services.reembed_service import reembed_questions
+            mode = "all" if task.task_type == "reembed_questions_all" else "missing"
+            result = await reembed_questions(mode=mode)
         else:
             logger.warning(f"Unknown task type: {task.task_type}")
             result = {"error": f"Unsupported task type: {task.task_type}"}
@@ -1,4 +1,6 @@
+import asyncio
 import hashlib
+import io
 import uuid
 import os
 import base64
@@ -7,6 +9,7 @@ from typing import Dict, Any, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 from app.models.production_models import HarvestBatch
+from app.storage import KIND_QR, get_file_store
 
 # For QR generation, we use a mock implementation if the library isn't available
 # to ensure the agent doesn't crash during deployment.
@@ -62,12 +65,11 @@ async def register_harvest_batch(
         qr_val = f"kb-trace://batch/{uuid.uuid4()}" # Simplified trace link
         img = qrcode.make(qr_val)
         # In production, this would be uploaded to S3/Cloudinary
-        # For now, we save to local storage
-        qr_filename = f"qr_{current_hash[:12]}.png"
-        qr_path = f"backend/app/static/qrs/{qr_filename}"
-        os.makedirs(os.path.dirname(qr_path), exist_ok=True)
-        img.save(qr_path)
-        qr_url = f"/static/qrs/{qr_filename}"
+        # For now, we keep it in the local file store
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        qr_path = await asyncio.to_thread(get_file_store().put_bytes, KIND_QR, buf.getvalue(), ".png", "qr_")
+        qr_url = f"/api/files/qr/{os.path.basename(qr_path)}"
     else:
         qr_url = "http://mock-qr-service.com/placeholder.png"
 
@@ -1,14 +1,33 @@
 
+import asyncio
+import hashlib
 import os
 import re
-from gtts import gTTS
+import threading
+from typing import AsyncIterator, Callable, List, Optional
 from uuid import uuid4
-from app.api.utils import UPLOAD_DIR
-import time
+from app.core.metrics import metrics
+from app.storage import KIND_TTS, get_file_store
+from app.services.phrase_bank import concat_audio, get_phrase_bank
+from app.services.tts_backends import TTSBackend, get_backend_chain
 
 # Maximum characters sent to TTS to avoid excessively long audio files
 TTS_MAX_CHARS = 600
 
+# Content-addressed cache of synthesized clips, kept in the "tts" kind of the file store
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", 500)) * 1024 * 1024)
+TTS_CACHE_EVICT_RATIO = 0.9
+_CACHE_EXTS = ("mp3", "wav")
+
+# Parallel syntheses per streamed answer
+TTS_STREAM_CONCURRENCY = int(os.getenv("TTS_STREAM_CONCURRENCY", 3))
+# Bengali dari (।) and Latin sentence terminators, followed by whitespace
+_SENTENCE_END_RE = re.compile(r"(?<=[।.?!])\s+")
+
+_cache_lock = threading.RLock()
+_cache_bytes: Optional[int] = None  # running size of the TTS cache, computed lazily
+_rejected_bank_voices: set = set()  # phrase bank voices already warned about
+
 def clean_text_for_tts(text: str) -> str:
     """
     Clean text for TTS by removing markdown, special symbols, and formatting.
@@ -45,75 +64,162 @@ def clean_text_for_tts(text: str) -> str:
     
     return text
 
+def tts_cache_key(text: str, lang: str, voice: str) -> str:
+    """Content address for a synthesized clip: sha256 of (text, language, voice)."""
+    return hashlib.sha256(f"{text}\x00{lang}\x00{voice}".encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str, ext: str) -> str:
+    return get_file_store().path_for(KIND_TTS, f"tts_{key}.{ext}")
+
+
+def _cache_lookup(key: str) -> Optional[str]:
+    """Return the cached clip for ``key``, bumping its mtime for LRU ordering."""
+    store = get_file_store()
+    for ext in _CACHE_EXTS:
+        path = store.find(KIND_TTS, f"tts_{key}.{ext}")
+        try:
+            if path and os.path.getsize(path) > 0:
+                os.utime(path, None)
+                return path
+        except OSError:
+            continue
+    return None
+
+
+def _cache_size_bytes() -> int:
+    global _cache_bytes
+    if _cache_bytes is None:
+        _cache_bytes = get_file_store().usage(KIND_TTS)["bytes"]
+    return _cache_bytes
+
+
+def evict_tts_cache(max_bytes: Optional[int] = None) -> int:
+    """
+    Delete least recently used clips until the cache is back under
+    TTS_CACHE_EVICT_RATIO of its size bound. Returns the number of files removed.
+    """
+    global _cache_bytes
+    max_bytes = TTS_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _cache_lock:
+        if _cache_size_bytes() <= max_bytes:
+            return 0
+        store = get_file_store()
+        removed = store.enforce_quota(KIND_TTS, max_bytes, TTS_CACHE_EVICT_RATIO)
+        _cache_bytes = store.usage(KIND_TTS)["bytes"]
+    metrics.inc("tts_cache_evictions", removed)
+    return removed
+
+
+def _atomic_render(path: str, render: Callable[[str], None]) -> None:
+    """Render into a temp file, then atomically move it to ``path``."""
+    tmp_path = f"{path}.{uuid4().hex}.tmp"
+    try:
+        render(tmp_path)
+        if os.path.getsize(tmp_path) == 0:
+            raise Exception(f"TTS produced an empty file for {path}")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _synthesize_with_backends(backends: List[TTSBackend], cleaned_text: str, text: str, lang: str) -> str:
+    """
+    Try each backend on the cleaned text, then on the raw text; first success
+    wins. Every render is cached under the text and voice that produced it,
+    so an offline fallback clip is never served for the primary voice.
+    """
+    import traceback
+    candidates = [cleaned_text]
+    if text[:TTS_MAX_CHARS] != cleaned_text:
+        candidates.append(text[:TTS_MAX_CHARS])  # Limit length
+    last_error: Optional[Exception] = None
+    for backend in backends:
+        for candidate in candidates:
+            key = tts_cache_key(candidate, lang, backend.voice)
+            cached = _cache_lookup(key)
+            if cached:  # e.g. the fallback's clip from an earlier outage
+                return cached
+            path = _cache_path(key, backend.ext)
+            try:
+                with metrics.timer(f"tts_synthesis_seconds_{backend.name}"):
+                    _atomic_render(path, lambda tmp: backend.synthesize(candidate, lang, tmp))
+                print(f"[DEBUG] TTS generated with {backend.name}: {len(candidate)} characters")
+                return path
+            except Exception as e:
+                print(f"[ERROR] TTS generation with {backend.name} failed: {e}")
+                traceback.print_exc()
+                last_error = e
+    raise last_error or Exception("No TTS backend available")
+
+
+def _phrase_bank_for(backends: List[TTSBackend]):
+    """The phrase bank, if its clips were rendered with a configured voice."""
+    bank = get_phrase_bank()
+    if bank is None or bank.voice in {backend.voice for backend in backends}:
+        return bank
+    if bank.voice not in _rejected_bank_voices:
+        _rejected_bank_voices.add(bank.voice)
+        print(f"[WARNING] Ignoring TTS phrase bank rendered with voice '{bank.voice}': not a configured TTS voice")
+    return None
+
+
 def synthesize_tts(text: str, lang: str="bn") -> str:
     """
-    Save TTS mp3 using gTTS and return the filepath.
+    Return the path of an audio clip for ``text``.
     Cleans text before TTS to remove markdown and special symbols.
-    Uses UPLOAD_DIR for persistent storage instead of /tmp.
+
+    Clips are content-addressed by (cleaned text, language, voice) under
+    the file store, so repeated replies reuse the same file and URL without
+    synthesis. On a miss, text fully covered by the phrase bank is assembled
+    from pre-rendered clips (keyed by the bank's voice, and only if that is a
+    configured voice); anything else goes to the TTS_PROVIDER backend, with
+    espeak-ng as the offline fallback. Fallback clips are keyed by the espeak
+    voice, so the primary voice is tried again on the next request. The
+    directory is kept under TTS_CACHE_MAX_BYTES by LRU eviction.
     """
-    
+    global _cache_bytes
+
     # Clean text before TTS
     cleaned_text = clean_text_for_tts(text)
-    
+
     if not cleaned_text or len(cleaned_text.strip()) < 1:
         print("[WARNING] Text is empty after cleaning, using original")
         cleaned_text = text.strip()
-    
-    # Use UPLOAD_DIR instead of /tmp for persistent storage
-    tts_filename = f"{uuid4().hex}.mp3"
-    tts_path = os.path.join(UPLOAD_DIR, tts_filename)
-    
-    # Ensure UPLOAD_DIR exists
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    
-    try:
-        tts = gTTS(cleaned_text, lang=lang if lang else "en")
-        tts.save(tts_path)
-        
-        # Verify file was actually created with retry logic (race condition fix)
-        max_retries = 5
-        retry_count = 0
-        while retry_count < max_retries:
-            if os.path.exists(tts_path):
-                file_size = os.path.getsize(tts_path)
-                if file_size > 0:  # File has content
-                    print(f"[DEBUG] TTS generated: {len(cleaned_text)} characters (cleaned from {len(text)} original)")
-                    print(f"[DEBUG] TTS saved to: {tts_path} (file size: {file_size} bytes)")
-                    return tts_path
-            retry_count += 1
-            if retry_count < max_retries:
-                time.sleep(0.1)  # 100ms delay between retries
-        
-        # If we get here, file wasn't created properly
-        raise Exception(f"TTS file was not created at {tts_path} after {max_retries} retries")
-    except Exception as e:
-        print(f"[ERROR] TTS generation failed: {e}")
-        import traceback
-        traceback.print_exc()
-        # Try with original text as fallback
-        try:
-            tts = gTTS(text[:TTS_MAX_CHARS], lang=lang if lang else "en")  # Limit length
-            tts.save(tts_path)
-            
-            # Verify fallback file was created with retry logic
-            max_retries = 5
-            retry_count = 0
-            while retry_count < max_retries:
-                if os.path.exists(tts_path):
-                    file_size = os.path.getsize(tts_path)
-                    if file_size > 0:  # File has content
-                        print(f"[DEBUG] TTS fallback saved to: {tts_path} (file size: {file_size} bytes)")
-                        return tts_path
-                retry_count += 1
-                if retry_count < max_retries:
-                    time.sleep(0.1)
-            
-            raise Exception(f"TTS fallback file was not created at {tts_path} after {max_retries} retries")
-        except Exception as e2:
-            print(f"[ERROR] TTS fallback also failed: {e2}")
-            import traceback
-            traceback.print_exc()
-            raise
+
+    lang = lang if lang else "en"
+    backends = get_backend_chain()
+    key = tts_cache_key(cleaned_text, lang, backends[0].voice)
+
+    tts_path = _cache_lookup(key)
+    if tts_path:
+        metrics.inc("tts_cache_hits")
+        metrics.set_gauge("tts_cache_hit_rate", metrics.hit_rate("tts_cache_hits", "tts_cache_misses"))
+        return tts_path
+
+    metrics.inc("tts_cache_misses")
+    metrics.set_gauge("tts_cache_hit_rate", metrics.hit_rate("tts_cache_hits", "tts_cache_misses"))
+    with _cache_lock:
+        _cache_size_bytes()  # prime the running total before adding this clip
+
+    bank = _phrase_bank_for(backends)
+    clips = bank.match(cleaned_text, lang) if bank else None
+    if clips:
+        # Keyed by the voice the bank was rendered with, like any backend render
+        bank_key = tts_cache_key(cleaned_text, lang, bank.voice)
+        tts_path = _cache_lookup(bank_key)
+        if not tts_path:
+            tts_path = _cache_path(bank_key, bank.format)
+            _atomic_render(tts_path, lambda tmp: concat_audio(clips, tmp, bank.format))
+        metrics.inc("tts_phrase_bank_hits")
+    else:
+        tts_path = _synthesize_with_backends(backends, cleaned_text, text, lang)
+
+    with _cache_lock:
+        _cache_bytes = _cache_size_bytes() + os.path.getsize(tts_path)
+    evict_tts_cache()
+    return tts_path
 
 
 def generate_tts(text: str, language: str = "bn") -> str:
@@ -129,7 +235,7 @@ def generate_tts(text: str, language: str = "bn") -> str:
         language: BCP-47 or ISO 639-1 language code. Defaults to 'bn' (Bengali).
 
     Returns:
-        Absolute file path of the generated .mp3 audio file.
+        Absolute file path of the generated .mp3 (or offline .wav) audio file.
     """
     # Normalise language code: 'bn-BD' → 'bn', 'en-US' → 'en', etc.
     lang_code = language.split("-")[0].lower() if language else "bn"
@@ -138,3 +244,81 @@ def generate_tts(text: str, language: str = "bn") -> str:
     truncated = text[:TTS_MAX_CHARS]
 
     return synthesize_tts(truncated, lang=lang_code)
+
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text on "।", ".", "?" and "!" boundaries, dropping empty pieces."""
+    return [part.strip() for part in _SENTENCE_END_RE.split(text or "") if part.strip()]
+
+
+class SentenceSegmenter:
+    """Accumulates streamed text and releases sentences as they complete."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        parts = _SENTENCE_END_RE.split(self._buffer)
+        self._buffer = parts.pop()
+        return [part.strip() for part in parts if part.strip()]
+
+    def flush(self) -> List[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class SentenceTTSStream:
+    """
+    Synthesizes sentences concurrently (at most ``concurrency`` at a time)
+    and hands finished clips back strictly in sentence order.
+
+    Each segment is ``{"index", "text", "path"}``. A sentence whose synthesis
+    fails is skipped; its index is consumed so later segments keep their place.
+    """
+
+    def __init__(self, language: str = "bn", concurrency: int = TTS_STREAM_CONCURRENCY) -> None:
+        self.language = language
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self._sentences: List[str] = []
+        self._tasks: List[asyncio.Task] = []
+        self._next = 0
+
+    def add(self, sentence: str) -> None:
+        self._sentences.append(sentence)
+        self._tasks.append(asyncio.create_task(self._synthesize(sentence)))
+
+    async def _synthesize(self, sentence: str) -> Optional[str]:
+        async with self._semaphore:
+            try:
+                return await asyncio.to_thread(generate_tts, sentence, language=self.language)
+            except Exception as e:
+                print(f"[WARNING] Sentence TTS failed: {e}")
+                return None
+
+    def _take(self, index: int, path: Optional[str]) -> Optional[dict]:
+        self._next = index + 1
+        if not path:
+            return None
+        return {"index": index, "text": self._sentences[index], "path": path}
+
+    def ready(self) -> List[dict]:
+        """Segments finished so far, without waiting on slower earlier ones."""
+        segments = []
+        while self._next < len(self._tasks) and self._tasks[self._next].done():
+            segment = self._take(self._next, self._tasks[self._next].result())
+            if segment:
+                segments.append(segment)
+        return segments
+
+    async def drain(self) -> AsyncIterator[dict]:
+        """Wait for the remaining segments and yield them in order."""
+        while self._next < len(self._tasks):
+            segment = self._take(self._next, await self._tasks[self._next])
+            if segment:
+                yield segment
+
+    def cancel(self) -> None:
+        for task in self._tasks[self._next:]:
+            task.cancel()
@@ -0,0 +1,102 @@
+"""
+Pluggable text-to-speech engines.
+
+``TTS_PROVIDER`` selects the primary engine: ``gtts`` (Google, needs internet,
+MP3 output) or ``espeak`` (espeak-ng, offline on CPU, WAV output). When the
+primary engine fails and espeak-ng is installed, it is used as the offline
+fallback so audio replies keep working without connectivity.
+"""
+
+import os
+import shutil
+import subprocess
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Type
+
+from gtts import gTTS
+
+from app.llm.provider import get_llm_config
+
+# gTTS "voice" is the Google domain used (accent), e.g. com, co.in
+TTS_VOICE = os.getenv("TTS_VOICE", "com")
+ESPEAK_BINARY = os.getenv("ESPEAK_BINARY", "espeak-ng")
+# espeak-ng voice; empty means use the request language ("bn", "en", ...)
+ESPEAK_VOICE = os.getenv("ESPEAK_VOICE", "")
+ESPEAK_SPEED_WPM = int(os.getenv("ESPEAK_SPEED_WPM", 150))
+TTS_OFFLINE_FALLBACK = os.getenv("TTS_OFFLINE_FALLBACK", "true").lower() == "true"
+
+
+class TTSBackend(ABC):
+    """Renders text to an audio file at a given path."""
+
+    name = ""
+    ext = "mp3"
+
+    @property
+    def voice(self) -> str:
+        """Identifier of the voice; part of the TTS cache key."""
+        return self.name
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def synthesize(self, text: str, lang: str, path: str) -> None:
+        ...
+
+
+class GTTSBackend(TTSBackend):
+    name = "gtts"
+    ext = "mp3"
+
+    @property
+    def voice(self) -> str:
+        return f"gtts:{TTS_VOICE}"
+
+    def synthesize(self, text: str, lang: str, path: str) -> None:
+        gTTS(text, lang=lang, tld=TTS_VOICE).save(path)
+
+
+class EspeakBackend(TTSBackend):
+    name = "espeak"
+    ext = "wav"
+
+    @property
+    def voice(self) -> str:
+        return f"espeak:{ESPEAK_VOICE or 'lang'}:{ESPEAK_SPEED_WPM}"
+
+    def available(self) -> bool:
+        return shutil.which(ESPEAK_BINARY) is not None
+
+    def synthesize(self, text: str, lang: str, path: str) -> None:
+        subprocess.run(
+            [ESPEAK_BINARY, "-v", ESPEAK_VOICE or lang, "-s", str(ESPEAK_SPEED_WPM), "-w", path, text],
+            check=True,
+            capture_output=True,
+            timeout=30,
+        )
+
+
+TTS_BACKENDS: Dict[str, Type[TTSBackend]] = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+}
+
+
+def get_tts_backend(name: Optional[str] = None) -> TTSBackend:
+    """Backend named by ``name`` or the configured TTS_PROVIDER (default gtts)."""
+    name = (name or get_llm_config().tts_provider or GTTSBackend.name).lower()
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS_PROVIDER '{name}'. Choose from: {', '.join(TTS_BACKENDS)}")
+    return TTS_BACKENDS[name]()
+
+
+def get_backend_chain() -> List[TTSBackend]:
+    """The primary backend followed by the offline fallback, if usable."""
+    primary = get_tts_backend()
+    chain = [primary]
+    if TTS_OFFLINE_FALLBACK and primary.name != EspeakBackend.name:
+        offline = EspeakBackend()
+        if offline.available():
+            chain.append(offline)
+    return chain
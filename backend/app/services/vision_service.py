@@ -2,9 +2,14 @@
 Vision Service — Unified abstraction for image analysis tasks.
 
 Implements a 3-tier fallback chain:
+  Tier 0: Local ONNX crop-disease classifier on CPU (disease only, if installed)
   Tier 1: HuggingFace Inference API (ViT / fine-tuned models)
   Tier 2: Groq LLM Vision (llama-3.2-11b-vision-preview)
-  Tier 3: Rule-based engine (offline hardcoded responses)
+  Tier 3: Rule-based engine (CV2 heuristic for damage, offline responses otherwise)
+
+Remote tiers share pooled async clients and are hedged within a latency
+budget, so a diagnosis always returns in bounded time. Near-duplicate images
+reuse earlier diagnoses through the perceptual-hash cache.
 
 Supported tasks: "disease", "soil", "damage"
 """
@@ -12,13 +17,25 @@ Supported tasks: "disease", "soil", "damage"
 import os
 import re
 import base64
+import asyncio
 import logging
-from typing import Optional, Dict
+from typing import Awaitable, Optional, Dict, Tuple
 
-import httpx
+from app.core.executors import get_cpu_executor, run_coroutine_sync
+from app.core.http_clients import get_async_groq, get_http_client
+from app.core.metrics import metrics
+from app.services.image_fingerprint import cached_diagnosis
+from app.services.local_classifier import get_local_classifier_async
 
 logger = logging.getLogger("VisionService")
 
+# Upper bound on a diagnosis; the local baseline is returned when remote tiers miss it
+VISION_LATENCY_BUDGET_S = float(os.getenv("VISION_LATENCY_BUDGET_S", 8.0))
+# Start the next remote tier if the previous one has not answered by then
+VISION_HEDGE_DELAY_S = float(os.getenv("VISION_HEDGE_DELAY_S", 2.5))
+# Local classifier answers at or above this confidence skip the remote tiers
+LOCAL_VISION_MIN_CONFIDENCE = float(os.getenv("LOCAL_VISION_MIN_CONFIDENCE", 0.85))
+
 HF_MODELS: Dict[str, str] = {
     "disease": os.getenv("VISION_MODEL_ID", "prof-freakenstein/plantnet-disease-detection"),
     "soil": os.getenv("SOIL_VISION_MODEL_ID", "google/vit-base-patch16-224"),
@@ -38,50 +55,164 @@ OFFLINE_RESPONSES: Dict[str, str] = {
 }
 
 
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
 class VisionService:
-    """Unified vision analysis with 3-tier fallback."""
+    """
+    Unified vision analysis with 3-tier fallback.
+
+    For disease, the local classifier (when a model is installed) starts
+    together with the remote tiers: a confident local answer that arrives
+    first cancels the remote calls, otherwise it becomes the baseline. Remote
+    tiers are async and hedged: Tier 1 starts immediately, Tier 2 is launched
+    after VISION_HEDGE_DELAY_S (or as soon as Tier 1 fails), and the first
+    successful answer wins. The local baseline
+    (CV2 for damage, local classifier or offline response otherwise) runs
+    alongside from the start and is returned when no remote tier answers
+    within VISION_LATENCY_BUDGET_S.
+    """
 
     def __init__(self) -> None:
         self.hf_api_key: str = os.getenv("HUGGINGFACE_API_KEY", "").strip()
         self.groq_api_key: str = os.getenv("GROQ_API_KEY", "").strip()
 
+    # --- Sync entry points (crew tools run in worker threads) ---
     def analyze_image(self, image_path: str, task: str = "disease") -> str:
+        return run_coroutine_sync(self.analyze_image_async(image_path, task))
+
+    def assess_damage(self, image_path: str, crop_type: str = "general") -> str:
+        return run_coroutine_sync(self.assess_damage_async(image_path, crop_type))
+
+    # --- Async entry points ---
+    async def analyze_image_async(self, image_path: str, task: str = "disease") -> str:
         if not image_path or not os.path.exists(image_path):
             return "No valid image provided to analyze."
-        result = self._tier1_huggingface(image_path, task)
-        if result:
-            return result
-        result = self._tier2_groq_vision(image_path, task)
-        if result:
-            return result
-        logger.warning(f"[VisionService] All tiers failed for task='{task}'. Offline fallback.")
-        return OFFLINE_RESPONSES.get(task, OFFLINE_RESPONSES["disease"])
 
-    def assess_damage(self, image_path: str, crop_type: str = "general") -> str:
+        async def analyze() -> Tuple[bool, str]:
+            local_task = asyncio.ensure_future(self._tier0_local_async(image_path)) if task == "disease" else None
+
+            async def offline() -> str:
+                # A low-confidence local answer still beats the canned offline text
+                local = await local_task if local_task else None
+                return local[0] if local else OFFLINE_RESPONSES.get(task, OFFLINE_RESPONSES["disease"])
+
+            # The local classifier and the hedged remote tiers race; whichever
+            # settles first with a usable answer cancels the other
+            remote = asyncio.ensure_future(self._hedged(image_path, task, offline()))
+            try:
+                if local_task:
+                    await asyncio.wait({local_task, remote}, return_when=asyncio.FIRST_COMPLETED)
+                    if not remote.done():
+                        local = local_task.result()
+                        if local and local[1] >= LOCAL_VISION_MIN_CONFIDENCE:
+                            metrics.inc("vision_tier_wins_local")
+                            return True, local[0]
+                tier, result = await remote
+            finally:
+                remote.cancel()
+                if local_task:
+                    local_task.cancel()
+            if tier == "baseline":
+                logger.warning(f"[VisionService] No remote tier answered for task='{task}'. Offline fallback.")
+            return tier != "baseline", result
+
+        return await cached_diagnosis(f"vision:{task}", image_path, analyze)
+
+    async def assess_damage_async(self, image_path: str, crop_type: str = "general") -> str:
         if not image_path or not os.path.exists(image_path):
             return f"Mock Damage Assessment: Estimated 65% damage for {crop_type} due to flooding."
-        result = self._tier1_huggingface(image_path, "damage")
-        if result:
-            pct = self._extract_damage_from_labels(result)
-            return f"Model Damage Assessment: {pct:.1f}% estimated damage for {crop_type}.\n{result}"
-        result = self._tier2_groq_vision(image_path, "damage")
-        if result:
-            pct = self._extract_damage_from_text(result)
-            return f"Groq Damage Assessment: {pct:.1f}% estimated damage for {crop_type}.\n{result}"
-        return self._tier3_cv2_damage(image_path, crop_type)
+
+        async def analyze() -> Tuple[bool, str]:
+            loop = asyncio.get_running_loop()
+            baseline = loop.run_in_executor(get_cpu_executor(), self._tier3_cv2_damage, image_path, crop_type)
+            tier, result = await self._hedged(image_path, "damage", baseline)
+            if tier == "hf":
+                pct = self._extract_damage_from_labels(result)
+                return True, f"Model Damage Assessment: {pct:.1f}% estimated damage for {crop_type}.\n{result}"
+            if tier == "groq":
+                pct = self._extract_damage_from_text(result)
+                return True, f"Groq Damage Assessment: {pct:.1f}% estimated damage for {crop_type}.\n{result}"
+            return False, result
+
+        return await cached_diagnosis(f"damage:{crop_type}", image_path, analyze)
+
+    async def _hedged(self, image_path: str, task: str, baseline: Awaitable[str]) -> Tuple[str, str]:
+        """First successful remote tier within the latency budget, else the baseline."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + VISION_LATENCY_BUDGET_S
+        baseline_task = asyncio.ensure_future(baseline)
+        tiers = [("hf", self._tier1_huggingface_async), ("groq", self._tier2_groq_vision_async)]
+        running: Dict[asyncio.Task, str] = {}
+        launched = 0
+
+        def launch() -> None:
+            nonlocal launched
+            name, tier_fn = tiers[launched]
+            running[asyncio.create_task(tier_fn(image_path, task))] = name
+            launched += 1
+
+        try:
+            launch()
+            while running or launched < len(tiers):
+                if not running:
+                    launch()  # every tier so far failed, do not wait for the hedge delay
+                now = loop.time()
+                if now >= deadline:
+                    break
+                timeout = deadline - now
+                if launched < len(tiers):
+                    timeout = min(timeout, max(start + launched * VISION_HEDGE_DELAY_S - now, 0.0))
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task_done in done:
+                    name = running.pop(task_done)
+                    if not task_done.cancelled() and task_done.exception() is None and task_done.result():
+                        metrics.inc(f"vision_tier_wins_{name}")
+                        baseline_task.cancel()
+                        return name, task_done.result()
+                if not done and launched < len(tiers):
+                    metrics.inc("vision_hedges_launched")
+                    launch()
+        finally:
+            for pending in running:
+                pending.cancel()
+
+        metrics.inc("vision_tier_wins_baseline")
+        return "baseline", await baseline_task
+
+    # --- Tier 0: Local classifier ---
+    async def _tier0_local_async(self, image_path: str) -> Optional[Tuple[str, float]]:
+        """Formatted top predictions and the top probability, or None when unavailable."""
+        classifier = await get_local_classifier_async()
+        if classifier is None:
+            return None
+        try:
+            preds = await classifier.classify_async(image_path)
+        except Exception as exc:
+            logger.warning(f"[Tier0] Local classifier failed: {exc}. Falling back.")
+            return None
+        if not preds:
+            return None
+        out = "[Tier 0 — Local classifier] Top predictions:\n"
+        for label, score in preds:
+            out += f"  - {label} — {score*100:.1f}%\n"
+        return out.strip(), preds[0][1]
 
     # --- Tier 1: HuggingFace ---
-    def _tier1_huggingface(self, image_path: str, task: str) -> Optional[str]:
+    async def _tier1_huggingface_async(self, image_path: str, task: str) -> Optional[str]:
         if not self.hf_api_key:
             logger.info("[Tier1] No HUGGINGFACE_API_KEY. Skipping.")
             return None
         model_id = HF_MODELS.get(task, HF_MODELS["disease"])
         api_url = f"https://api-inference.huggingface.co/models/{model_id}"
         try:
-            with open(image_path, "rb") as f:
-                image_bytes = f.read()
-            resp = httpx.post(api_url, content=image_bytes,
-                              headers={"Authorization": f"Bearer {self.hf_api_key}"}, timeout=10.0)
+            image_bytes = await asyncio.to_thread(_read_bytes, image_path)
+            resp = await get_http_client().post(api_url, content=image_bytes,
+                                                headers={"Authorization": f"Bearer {self.hf_api_key}"},
+                                                timeout=VISION_LATENCY_BUDGET_S)
             if resp.status_code == 200:
                 preds = resp.json()
                 if isinstance(preds, list) and preds:
@@ -96,17 +227,15 @@ class VisionService:
         return None
 
     # --- Tier 2: Groq Vision ---
-    def _tier2_groq_vision(self, image_path: str, task: str) -> Optional[str]:
+    async def _tier2_groq_vision_async(self, image_path: str, task: str) -> Optional[str]:
         if not self.groq_api_key:
             logger.info("[Tier2] No GROQ_API_KEY. Skipping.")
             return None
         prompt = GROQ_PROMPTS.get(task, GROQ_PROMPTS["disease"])
         try:
-            from groq import Groq
-            with open(image_path, "rb") as f:
-                b64 = base64.b64encode(f.read()).decode("utf-8")
-            client = Groq(api_key=self.groq_api_key)
-            comp = client.chat.completions.create(
+            b64 = base64.b64encode(await asyncio.to_thread(_read_bytes, image_path)).decode("utf-8")
+            client = get_async_groq(self.groq_api_key)
+            comp = await client.chat.completions.create(
                 model="llama-3.2-11b-vision-preview",
                 messages=[{"role": "user", "content": [
                     {"type": "text", "text": prompt},
@@ -1,16 +1,50 @@
-# Simple S3/local storage helper (optional)
+# Local file store with content-hash sharding and retention, plus an optional S3 helper
+import hashlib
 import os
-import boto3
-from botocore.exceptions import BotoCoreError
+import re
+import shutil
+import time
+from typing import Dict, List, Optional
+from uuid import uuid4
+
 from dotenv import load_dotenv
 
+from app.core.metrics import metrics
+
 load_dotenv()
 
 S3_BUCKET = os.getenv("S3_BUCKET", "")
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
 
+STORAGE_ROOT = os.getenv("STORAGE_ROOT", os.getenv("UPLOAD_DIR", "/tmp/uploads"))
+STORAGE_GC_INTERVAL_MINUTES = int(os.getenv("STORAGE_GC_INTERVAL_MINUTES", 60))
+# Long-lived service state (cache databases, checkpoints); never touched by gc()
+STATE_DIR = os.getenv("STATE_DIR", os.path.join(STORAGE_ROOT, "state"))
+# Directories under the root that hold state rather than a kind of stored file
+RESERVED_DIRS = frozenset({"state", "vector_index"})
+
+# File kinds and their default retention in days (None keeps files forever).
+# Images back community, listing and damage-report photos that database rows
+# keep pointing at, so they are never expired.
+KIND_AUDIO = "audio"
+KIND_IMAGE = "image"
+KIND_TTS = "tts"
+KIND_QR = "qr"
+DEFAULT_RETENTION_DAYS: Dict[str, Optional[float]] = {
+    KIND_AUDIO: 30,
+    KIND_IMAGE: None,
+    KIND_TTS: 7,
+    KIND_QR: None,
+}
+
+_HEX_RE = re.compile(r"[0-9a-f]{4,}")
+
+
 def upload_file_s3(local_path, key):
+    import boto3
+    from botocore.exceptions import BotoCoreError
+
     if not S3_BUCKET:
         raise RuntimeError("S3 bucket not configured")
     s3 = boto3.client("s3",
@@ -20,4 +54,197 @@ def upload_file_s3(local_path, key):
         s3.upload_file(local_path, S3_BUCKET, key)
         return f"s3://{S3_BUCKET}/{key}"
     except BotoCoreError as e:
-        raise
\ No newline at end of file
+        raise
+
+
+def _env_days(kind: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(f"STORAGE_RETENTION_{kind.upper()}_DAYS")
+    if value is None:
+        return default
+    return float(value) if float(value) > 0 else None
+
+
+def _env_quota(kind: str) -> int:
+    return int(float(os.getenv(f"STORAGE_QUOTA_{kind.upper()}_MB", 0)) * 1024 * 1024)
+
+
+class FileStore:
+    """
+    Files laid out as ``<root>/<kind>/<aa>/<bb>/<name>``, where ``aabb`` are
+    the first hex digits of the content hash in the file name. Sharding keeps
+    every directory small; retention and quotas are enforced per kind by gc().
+    Files written before sharding (loose in ``root``) may still be referenced
+    and are left alone. Directories in RESERVED_DIRS are skipped.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        retention_days: Optional[Dict[str, Optional[float]]] = None,
+        quotas_bytes: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.root = os.path.realpath(root)
+        self.retention_days = dict(DEFAULT_RETENTION_DAYS if retention_days is None else retention_days)
+        self.quotas_bytes = dict(quotas_bytes or {})
+
+    def kind_dir(self, kind: str) -> str:
+        return os.path.join(self.root, kind)
+
+    @staticmethod
+    def _shard(name: str) -> List[str]:
+        match = _HEX_RE.search(os.path.splitext(name)[0])
+        digest = match.group(0) if match else hashlib.sha256(name.encode("utf-8")).hexdigest()
+        return [digest[:2], digest[2:4]]
+
+    def path_for(self, kind: str, name: str) -> str:
+        """Sharded location of ``name``; the parent directory is created."""
+        directory = os.path.join(self.kind_dir(kind), *self._shard(name))
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, name)
+
+    def find(self, kind: str, name: str) -> Optional[str]:
+        name = os.path.basename(name)
+        path = os.path.join(self.kind_dir(kind), *self._shard(name), name)
+        return path if os.path.isfile(path) else None
+
+    def is_managed(self, path: str) -> bool:
+        return os.path.realpath(path).startswith(self.root + os.sep)
+
+    def put_bytes(self, kind: str, data: bytes, ext: str, prefix: str = "") -> str:
+        """
+        Store ``data`` under its sha256 and return the path. Identical
+        content maps to the same file, which is only touched on repeat writes.
+        """
+        return self.write_bytes(kind, f"{prefix}{hashlib.sha256(data).hexdigest()}{ext}", data)
+
+    def write_bytes(self, kind: str, name: str, data: bytes) -> str:
+        """Atomically write ``data`` as ``name``; an existing file is only touched."""
+        path = self.path_for(kind, name)
+        if os.path.exists(path):
+            os.utime(path, None)
+            return path
+        tmp_path = f"{path}.{uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def temp_path(self, kind: str) -> str:
+        """Scratch file on the same filesystem, to be passed to commit_file()."""
+        directory = self.kind_dir(kind)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f".incoming-{uuid4().hex}.tmp")
+
+    def commit_file(self, kind: str, tmp_path: str, digest: str, ext: str, prefix: str = "") -> str:
+        """Move a fully written temp file to its content-addressed location."""
+        path = self.path_for(kind, f"{prefix}{digest}{ext}")
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            os.utime(path, None)
+            return path
+        os.replace(tmp_path, path)
+        return path
+
+    def _files(self, kind: str, include_tmp: bool = False) -> List[os.DirEntry]:
+        files = []
+        base = self.kind_dir(kind)
+        if not os.path.isdir(base):
+            return files
+        for dirpath, _, _ in os.walk(base):
+            files.extend(e for e in os.scandir(dirpath) if e.is_file() and (include_tmp or not e.name.endswith(".tmp")))
+        return files
+
+    def usage(self, kind: str) -> Dict[str, int]:
+        entries = self._files(kind)
+        return {"files": len(entries), "bytes": sum(e.stat().st_size for e in entries)}
+
+    def enforce_quota(self, kind: str, max_bytes: int, target_ratio: float = 1.0) -> int:
+        """Delete least recently used files of ``kind`` until under the quota."""
+        entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in self._files(kind)]
+        total = sum(size for _, size, _ in entries)
+        if total <= max_bytes:
+            return 0
+        target = int(max_bytes * target_ratio)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        metrics.inc(f"storage_quota_deleted_{kind}", removed)
+        return removed
+
+    def _expire(self, kind: str, days: Optional[float], now: float) -> int:
+        cutoff = None if days is None else now - days * 86400
+        removed = 0
+        for entry in self._files(kind, include_tmp=True):
+            # Stale temp files from interrupted writes go after an hour, even
+            # for kinds that are kept forever
+            limit = now - 3600 if entry.name.endswith(".tmp") else cutoff
+            if limit is not None and entry.stat().st_mtime < limit:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def _prune_empty_dirs(self, kind: str) -> None:
+        base = self.kind_dir(kind)
+        for dirpath, dirnames, filenames in os.walk(base, topdown=False):
+            if dirpath != base and not dirnames and not filenames:
+                try:
+                    os.rmdir(dirpath)
+                except OSError:
+                    pass
+
+    def gc(self, now: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """Apply retention and quotas to every kind; returns per-kind stats."""
+        now = time.time() if now is None else now
+        start = time.perf_counter()
+        stats = {}
+        kinds = set(self.retention_days) | set(self.quotas_bytes)
+        if os.path.isdir(self.root):
+            kinds |= {e.name for e in os.scandir(self.root) if e.is_dir()}
+        kinds -= RESERVED_DIRS
+        for kind in sorted(kinds):
+            deleted = self._expire(kind, _env_days(kind, self.retention_days.get(kind)), now)
+            quota = self.quotas_bytes.get(kind) or _env_quota(kind)
+            if quota:
+                deleted += self.enforce_quota(kind, quota)
+            self._prune_empty_dirs(kind)
+            usage = self.usage(kind)
+            stats[kind] = {"deleted": deleted, **usage}
+            metrics.set_gauge(f"storage_bytes_{kind}", usage["bytes"])
+            metrics.set_gauge(f"storage_files_{kind}", usage["files"])
+            metrics.inc("storage_gc_deleted", deleted)
+
+        metrics.observe("storage_gc_seconds", time.perf_counter() - start)
+        if os.path.isdir(self.root):
+            metrics.set_gauge("storage_disk_free_bytes", shutil.disk_usage(self.root).free)
+        return stats
+
+
+def content_hash(path: str) -> Optional[str]:
+    """The sha256 a stored file is named after, or None for other files."""
+    match = re.search(r"[0-9a-f]{64}", os.path.basename(path))
+    return match.group(0) if match else None
+
+
+_file_store: Optional[FileStore] = None
+
+
+def get_file_store() -> FileStore:
+    """Get or create the file store rooted at STORAGE_ROOT"""
+    global _file_store
+    if _file_store is None:
+        _file_store = FileStore(STORAGE_ROOT)
+    return _file_store
@@ -1,4 +1,5 @@
 from langchain.tools import BaseTool
+from app.core.executors import run_coroutine_sync
 from app.services.soil_service import SoilService
 from typing import Any, Optional
 
@@ -11,14 +12,7 @@ class SoilVisionTool(BaseTool):
         return SoilService()
 
     def _run(self, image_path: str, **kwargs) -> str:
-        import asyncio
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        return loop.run_until_complete(self.service.analyze_soil_image(image_path))
+        return run_coroutine_sync(self.service.analyze_soil_image(image_path))
 
 class DIYSoilTestTool(BaseTool):
     name: str = "DIY Soil Test Interpreter"
@@ -0,0 +1,71 @@
+"""
+pgvector index management for embedding columns.
+
+Embeddings from sentence-transformers are compared by cosine, so indexes are
+built with ``vector_cosine_ops`` and queried with the ``<=>`` operator (an
+index only serves the operator of its opclass). Two index types are
+supported:
+
+* ``hnsw`` (default): graph index, best recall/latency trade-off, no training
+  step, so it can be built on an empty table. Build: ``m``,
+  ``ef_construction``; query: ``hnsw.ef_search``.
+* ``ivfflat``: faster to build and smaller, but its ``lists`` are trained on
+  the rows present at build time, so rebuild it as the table grows. Query:
+  ``ivfflat.probes``.
+
+Query-time settings are applied per call with ``SET LOCAL``, so they only
+affect the surrounding transaction.
+"""
+
+import math
+import os
+from typing import List, Optional
+
+PGVECTOR_INDEX_TYPE = os.getenv("PGVECTOR_INDEX_TYPE", "hnsw")
+PGVECTOR_HNSW_M = int(os.getenv("PGVECTOR_HNSW_M", 16))
+PGVECTOR_HNSW_EF_CONSTRUCTION = int(os.getenv("PGVECTOR_HNSW_EF_CONSTRUCTION", 64))
+PGVECTOR_IVFFLAT_LISTS = int(os.getenv("PGVECTOR_IVFFLAT_LISTS", 0))  # 0 derives lists from the row count
+PGVECTOR_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", 40))
+PGVECTOR_PROBES = int(os.getenv("PGVECTOR_PROBES", 10))
+
+INDEX_TYPES = ("hnsw", "ivfflat")
+
+
+def ivfflat_lists(rows: int) -> int:
+    """pgvector's guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond."""
+    if rows <= 1_000_000:
+        return max(10, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def index_ddl(
+    table: str,
+    column: str,
+    index_name: str,
+    kind: str = PGVECTOR_INDEX_TYPE,
+    m: int = PGVECTOR_HNSW_M,
+    ef_construction: int = PGVECTOR_HNSW_EF_CONSTRUCTION,
+    lists: Optional[int] = None,
+    rows: int = 0,
+    concurrently: bool = False,
+) -> str:
+    """CREATE INDEX statement for a cosine index of ``kind`` on ``table.column``."""
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown vector index type '{kind}', expected one of {INDEX_TYPES}")
+    if kind == "hnsw":
+        params = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+    else:
+        params = f"lists = {int(lists or PGVECTOR_IVFFLAT_LISTS or ivfflat_lists(rows))}"
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index_name} "
+        f"ON {table} USING {kind} ({column} vector_cosine_ops) WITH ({params})"
+    )
+
+
+def search_settings(ef_search: Optional[int] = None, probes: Optional[int] = None, limit: int = 0) -> List[str]:
+    """SET LOCAL statements for one search; ef_search is raised to at least ``limit``."""
+    ef = max(int(ef_search or PGVECTOR_EF_SEARCH), int(limit))
+    return [
+        f"SET LOCAL hnsw.ef_search = {ef}",
+        f"SET LOCAL ivfflat.probes = {int(probes or PGVECTOR_PROBES)}",
+    ]
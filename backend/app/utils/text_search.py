@@ -0,0 +1,131 @@
+"""
+Lexical (full-text) search over community questions.
+
+Embeddings blur exact tokens such as chemical names, varieties and pest
+names, so hybrid search pairs the vector index with a keyword leg:
+
+* Postgres: a GIN index on ``to_tsvector('simple', question_text)``. The
+  ``simple`` configuration does no stemming, which suits mixed Bengali and
+  English text; query terms are OR-ed and ranked with ``ts_rank_cd``.
+* SQLite: an FTS5 table kept in sync by triggers and ranked with ``bm25``.
+  Its tokenizer keeps combining marks (``M*``) inside tokens, otherwise
+  Bengali words would be split at every vowel sign.
+
+``ensure_lexical_index`` is idempotent: it runs after ``create_all`` for new
+databases and at startup for existing ones.
+"""
+
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.community_models import CommunityQuestion
+from app.utils.vector_index import index_key
+from app.utils.vector_utils import fetch_rows
+
+FTS_TABLE = "community_questions_fts"
+
+
+def _tsvector(column: str = "question_text") -> str:
+    return f"to_tsvector('simple', coalesce({column}, ''))"
+
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+        USING fts5(question_id UNINDEXED, question_text, tokenize="unicode61 categories 'L* N* Co M*'")""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON community_questions BEGIN
+        INSERT INTO {FTS_TABLE} (question_id, question_text) VALUES (new.id, new.question_text);
+    END""",
+    # Edits and deletes are rare (moderation), so the unindexed lookup by question_id is acceptable
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF question_text ON community_questions BEGIN
+        UPDATE {FTS_TABLE} SET question_text = new.question_text WHERE question_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON community_questions BEGIN
+        DELETE FROM {FTS_TABLE} WHERE question_id = old.id;
+    END""",
+]
+_POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS idx_community_questions_text_search ON community_questions USING gin ({_tsvector()})",
+]
+
+
+def tokenize(value: str) -> List[str]:
+    """Case-folded tokens of letters, digits and combining marks (matches the FTS5 tokenizer)."""
+    chars = [ch if unicodedata.category(ch)[0] in "LNM" else " " for ch in unicodedata.normalize("NFC", value)]
+    return "".join(chars).casefold().split()
+
+
+def _fts_query(tokens: List[str]) -> str:
+    return " OR ".join('"' + token.replace('"', '""') + '"' for token in dict.fromkeys(tokens))
+
+
+def ensure_lexical_index(connection) -> None:
+    """Create the full-text index for the connection's dialect (sync connection)."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        indexed = connection.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+        if not indexed:
+            connection.execute(text(
+                f"INSERT INTO {FTS_TABLE} (question_id, question_text) SELECT id, question_text FROM community_questions"
+            ))
+    elif dialect == "postgresql":
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+
+
+@event.listens_for(CommunityQuestion.__table__, "after_create")
+def _create_lexical_index(target, connection, **kw) -> None:
+    ensure_lexical_index(connection)
+
+
+async def lexical_ranking(session: AsyncSession, query: str, limit: int = 10,
+                          filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+    """(index key, score) of questions matching any query term, best first."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    filters = filters or {}
+    dialect = session.get_bind().dialect.name
+    params: Dict[str, Any] = {f"filter_{column}": value for column, value in filters.items()}
+    conditions = "".join(f" AND q.{column} = :filter_{column}" for column in filters)
+    if dialect == "sqlite":
+        # bm25 is lower-is-better; negate so every leg ranks higher-is-better
+        sql = f"""
+            SELECT q.id, -bm25({FTS_TABLE}) AS score
+            FROM {FTS_TABLE} JOIN community_questions q ON q.id = {FTS_TABLE}.question_id
+            WHERE {FTS_TABLE} MATCH :match{conditions}
+            ORDER BY bm25({FTS_TABLE})
+            LIMIT :limit
+        """
+        params.update(match=_fts_query(tokens), limit=limit)
+    else:
+        # Postgres tokenizes the query itself (consistent with the index); its terms are OR-ed
+        sql = f"""
+            SELECT q.id, ts_rank_cd({_tsvector('q.question_text')}, tsq) AS score
+            FROM community_questions q,
+                 CAST(replace(CAST(plainto_tsquery('simple', :query) AS text), ' & ', ' | ') AS tsquery) tsq
+            WHERE {_tsvector('q.question_text')} @@ tsq{conditions}
+            ORDER BY score DESC
+            LIMIT :limit
+        """
+        params.update(query=query, limit=limit)
+    result = await session.execute(text(sql), params)
+    return [(index_key(row[0]), float(row[1])) for row in result]
+
+
+async def lexical_search(session: AsyncSession, query: str, limit: int = 10,
+                         filters: Optional[Dict[str, Any]] = None) -> List[dict]:
+    """Question rows matching any query term, best first, with a ``lexical_score`` key."""
+    ranked = await lexical_ranking(session, query, limit, filters)
+    rows = await fetch_rows(session, CommunityQuestion.__table__, [key for key, _ in ranked])
+    results = []
+    for key, score in ranked:
+        row = rows.get(key)
+        if row is not None:
+            row["lexical_score"] = score
+            results.append(row)
+    return results
@@ -0,0 +1,315 @@
+"""
+In-process cosine-similarity index for deployments without pgvector.
+
+Vectors are L2-normalized into a contiguous float32 matrix, so a query is one
+matrix-vector product (exact, and fast up to a few hundred thousand rows).
+When hnswlib is installed and the index holds at least VECTOR_INDEX_HNSW_MIN
+vectors, an HNSW graph is maintained alongside for approximate search; the
+matrix stays the source of truth for rebuilds and persistence.
+
+Indexes are persisted under VECTOR_INDEX_DIR as ``<name>.npz`` (ids,
+float32 vectors and a JSON stamp) plus ``<name>.hnsw`` for the graph. The
+stamp holds the index's ``meta`` (e.g. the embedding model), which must match
+on load, and a token that changes on every save: a process that finds a
+token it did not write knows another process (such as the re-embedding
+script) replaced the file, and rebuilds instead of overwriting it.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.storage import STORAGE_ROOT
+
+logger = logging.getLogger("VectorIndex")
+
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(STORAGE_ROOT, "vector_index"))
+VECTOR_INDEX_HNSW_MIN = int(os.getenv("VECTOR_INDEX_HNSW_MIN", 50000))
+VECTOR_INDEX_HNSW_M = int(os.getenv("VECTOR_INDEX_HNSW_M", 16))
+VECTOR_INDEX_HNSW_EF_CONSTRUCTION = int(os.getenv("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", 200))
+VECTOR_INDEX_HNSW_EF_SEARCH = int(os.getenv("VECTOR_INDEX_HNSW_EF_SEARCH", 64))
+
+
+def index_key(value: Any) -> str:
+    """Row ids as stored by SQLite for UUID columns (32 hex chars); other ids as strings."""
+    if isinstance(value, uuid.UUID):
+        return value.hex
+    return str(value)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class VectorIndex:
+    def __init__(self, dim: int, name: str = "index", directory: Optional[str] = VECTOR_INDEX_DIR,
+                 hnsw_min: int = VECTOR_INDEX_HNSW_MIN, meta: Optional[Dict[str, str]] = None) -> None:
+        self.dim = dim
+        self.name = name
+        self.directory = directory
+        self.hnsw_min = hnsw_min
+        self.meta = dict(meta or {})
+        self.token: Optional[str] = None  # stamp token of the file this process last loaded or saved
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._hnsw = None
+        self._labels: Dict[str, int] = {}
+        self._label_ids: Dict[int, str] = {}
+        self._next_label = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item_id: Any) -> bool:
+        return index_key(item_id) in self._rows
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._ids[: self._size])
+
+    def vector(self, item_id: Any) -> Optional[np.ndarray]:
+        """The stored (normalized) vector for ``item_id``."""
+        with self._lock:
+            row = self._rows.get(index_key(item_id))
+            return None if row is None else self._matrix[row].copy()
+
+    # --- Updates ---
+    def _grow(self, needed: int) -> None:
+        if needed <= self._matrix.shape[0]:
+            return
+        capacity = max(needed, self._matrix.shape[0] * 2, 1024)
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+
+    def add_many(self, ids: Sequence[Any], vectors: np.ndarray) -> None:
+        if not len(ids):
+            return
+        vectors = _normalize(np.asarray(vectors).reshape(len(ids), self.dim))
+        with self._lock:
+            new_keys, new_rows = [], []
+            for item_id, vector in zip(ids, vectors):
+                key = index_key(item_id)
+                row = self._rows.get(key)
+                if row is None:
+                    self._grow(self._size + 1)
+                    row = self._size
+                    self._size += 1
+                    self._ids.append(key)
+                    self._rows[key] = row
+                self._matrix[row] = vector
+                new_keys.append(key)
+                new_rows.append(row)
+            if self._hnsw is not None:
+                self._hnsw_add(new_keys, self._matrix[new_rows])
+            elif self._size >= self.hnsw_min:
+                self._build_hnsw()
+            self.dirty = True
+
+    def add(self, item_id: Any, vector: Sequence[float]) -> None:
+        self.add_many([item_id], np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+    def remove(self, item_id: Any) -> bool:
+        key = index_key(item_id)
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is None:
+                return False
+            last = self._size - 1
+            if row != last:  # move the last row into the hole to keep the matrix dense
+                moved = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._ids.pop()
+            self._size -= 1
+            if self._hnsw is not None and key in self._labels:
+                label = self._labels.pop(key)
+                self._label_ids.pop(label, None)
+                self._hnsw.mark_deleted(label)
+            self.dirty = True
+            return True
+
+    # --- HNSW ---
+    def _build_hnsw(self) -> None:
+        try:
+            import hnswlib
+        except ImportError:
+            return
+        graph = hnswlib.Index(space="ip", dim=self.dim)
+        graph.init_index(max_elements=max(self._size * 2, 1024), ef_construction=VECTOR_INDEX_HNSW_EF_CONSTRUCTION,
+                         M=VECTOR_INDEX_HNSW_M)
+        graph.set_ef(VECTOR_INDEX_HNSW_EF_SEARCH)
+        self._hnsw = graph
+        self._labels, self._label_ids, self._next_label = {}, {}, 0
+        self._hnsw_add(self._ids[: self._size], self._matrix[: self._size])
+        logger.info(f"Built HNSW graph for '{self.name}' over {self._size} vectors")
+
+    def _hnsw_add(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        labels = []
+        for key in keys:
+            label = self._labels.get(key)
+            if label is None:
+                label = self._next_label
+                self._next_label += 1
+                self._labels[key] = label
+                self._label_ids[label] = key
+            labels.append(label)
+        capacity = self._hnsw.get_max_elements()
+        if self._next_label > capacity:
+            self._hnsw.resize_index(max(self._next_label, capacity * 2))
+        self._hnsw.add_items(vectors, np.asarray(labels))
+
+    # --- Queries ---
+    def search(self, query: Sequence[float], k: int = 10, threshold: Optional[float] = None,
+               ef_search: Optional[int] = None, exact: bool = False) -> List[Tuple[str, float]]:
+        """Top-``k`` (id, cosine similarity) pairs, best first, at or above ``threshold``."""
+        q = _normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+        with self._lock:
+            if self._size == 0:
+                return []
+            k = min(k, self._size)
+            if self._hnsw is not None and not exact:
+                self._hnsw.set_ef(max(ef_search or VECTOR_INDEX_HNSW_EF_SEARCH, k))
+                labels, distances = self._hnsw.knn_query(q, k=k)
+                hits = [(self._label_ids[int(l)], 1.0 - float(d)) for l, d in zip(labels[0], distances[0])
+                        if int(l) in self._label_ids]
+            else:
+                scores = self._matrix[: self._size] @ q
+                top = np.argpartition(-scores, k - 1)[:k] if k < self._size else np.arange(self._size)
+                top = top[np.argsort(-scores[top])]
+                hits = [(self._ids[i], float(scores[i])) for i in top]
+        if threshold is not None:
+            hits = [(i, s) for i, s in hits if s >= threshold]
+        return hits
+
+    # --- Persistence ---
+    def _paths(self) -> Tuple[str, str]:
+        base = os.path.join(self.directory, self.name)
+        return f"{base}.npz", f"{base}.hnsw"
+
+    def _stored_stamp(self) -> Optional[Dict[str, Any]]:
+        npz_path, _ = self._paths()
+        try:
+            with np.load(npz_path) as data:
+                return json.loads(str(data["stamp"])) if "stamp" in data.files else {}
+        except (OSError, ValueError):
+            return None
+
+    def changed_on_disk(self) -> bool:
+        """True when another process saved this index since this one last loaded or saved it."""
+        if not self.directory:
+            return False
+        stamp = self._stored_stamp()
+        return stamp is not None and stamp.get("token") != self.token
+
+    def save(self, force: bool = False) -> bool:
+        """Persist the index; unless ``force``, refuses (False) to overwrite a file saved by another process."""
+        if not self.directory:
+            return False
+        if not force and self.changed_on_disk():
+            logger.warning(f"Not saving vector index '{self.name}': replaced on disk by another process")
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        npz_path, hnsw_path = self._paths()
+        with self._lock:
+            token = uuid.uuid4().hex
+            tmp = f"{npz_path}.tmp.npz"
+            np.savez(tmp, ids=np.asarray(self._ids[: self._size]), vectors=self._matrix[: self._size],
+                     stamp=np.asarray(json.dumps({**self.meta, "token": token})))
+            os.replace(tmp, npz_path)
+            if self._hnsw is not None:
+                self._hnsw.save_index(f"{hnsw_path}.tmp")
+                os.replace(f"{hnsw_path}.tmp", hnsw_path)
+                np.save(f"{hnsw_path}.labels.npy", np.asarray([self._labels[i] for i in self._ids[: self._size]]))
+            elif os.path.exists(hnsw_path):
+                os.remove(hnsw_path)
+            self.token = token
+            self.dirty = False
+        return True
+
+    def load(self) -> bool:
+        """Load a persisted index; False when none exists or its stamp does not match ``meta``."""
+        if not self.directory:
+            return False
+        npz_path, hnsw_path = self._paths()
+        if not os.path.exists(npz_path):
+            return False
+        with np.load(npz_path) as data:
+            stamp = json.loads(str(data["stamp"])) if "stamp" in data.files else {}
+            if {k: v for k, v in stamp.items() if k != "token"} != self.meta:
+                logger.info(f"Ignoring persisted vector index '{self.name}': stamp {stamp} does not match {self.meta}")
+                return False
+            ids = [str(i) for i in data["ids"]]
+            vectors = data["vectors"].astype(np.float32)
+        with self._lock:
+            self.token = stamp.get("token")
+            self._matrix = vectors.copy() if len(ids) else np.zeros((0, self.dim), dtype=np.float32)
+            self._size = len(ids)
+            self._ids = ids
+            self._rows = {key: row for row, key in enumerate(ids)}
+            self._hnsw = None
+            if self._size >= self.hnsw_min and not self._load_hnsw(hnsw_path):
+                self._build_hnsw()
+            self.dirty = False
+        return True
+
+    def _load_hnsw(self, hnsw_path: str) -> bool:
+        labels_path = f"{hnsw_path}.labels.npy"
+        if not (os.path.exists(hnsw_path) and os.path.exists(labels_path)):
+            return False
+        try:
+            import hnswlib
+        except ImportError:
+            return False
+        labels = np.load(labels_path)
+        if len(labels) != self._size:
+            return False
+        graph = hnswlib.Index(space="ip", dim=self.dim)
+        graph.load_index(hnsw_path, allow_replace_deleted=False)
+        graph.set_ef(VECTOR_INDEX_HNSW_EF_SEARCH)
+        self._hnsw = graph
+        self._labels = {key: int(label) for key, label in zip(self._ids, labels)}
+        self._label_ids = {label: key for key, label in self._labels.items()}
+        self._next_label = int(labels.max()) + 1 if len(labels) else 0
+        return True
+
+    def replace_all(self, items: Iterable[Tuple[Any, Sequence[float]]]) -> None:
+        """Rebuild from scratch (e.g. from the database at startup)."""
+        items = list(items)
+        with self._lock:
+            self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+            self._size, self._ids, self._rows = 0, [], {}
+            self._hnsw, self._labels, self._label_ids, self._next_label = None, {}, {}, 0
+            if items:
+                self.add_many([i for i, _ in items], np.asarray([v for _, v in items], dtype=np.float32))
+            self.dirty = True
+
+
+_indexes: Dict[str, VectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vector_index(name: str, dim: int, meta: Optional[Dict[str, str]] = None) -> VectorIndex:
+    """Process-wide index for ``name`` (e.g. ``community_questions.embedding``)."""
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = _indexes[name] = VectorIndex(dim, name=name, meta=meta)
+        return index
+
+
+def all_vector_indexes() -> List[VectorIndex]:
+    with _indexes_lock:
+        return list(_indexes.values())
@@ -1,20 +1,327 @@
-"""Vector and embedding utility helpers."""
+"""Vector and embedding utility helpers.
 
-from sqlalchemy import text
-from typing import List
-from app.db import AsyncSessionLocal
+On Postgres, similarity queries run in the database with pgvector, ranked by
+cosine distance (``<=>``) so the cosine index is used; see
+``app.utils.pgvector_index`` for index types and query-time tuning. SQLite
+deployments have no vector operators, so each tracked embedding column is
+served from an in-process VectorIndex (see ``app.utils.vector_index``) that is
+loaded at startup and kept current through ORM insert/update/delete events,
+applied when the writing transaction commits.
+A persisted index is only reused when its stamp (embedding model) matches and
+a sample of its vectors matches the database; otherwise it is rebuilt.
+"""
 
+import asyncio
+import logging
+import os
+import random
+import uuid
 
-async def query_vector_similarity(table_name: str, embedding_column: str, query_embedding: List[float], threshold: float = 0.7, limit: int = 5):
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import bindparam, event, func, inspect, literal, select, text
+from sqlalchemy.orm import Session, object_session
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.db import AsyncSessionLocal, DATABASE_URL
+from app.models.db_models import Base
+from app.utils.pgvector_index import search_settings
+from app.utils.vector_index import all_vector_indexes, get_vector_index, index_key
+
+logger = logging.getLogger(__name__)
+
+USE_LOCAL_INDEX = "sqlite" in DATABASE_URL
+# Candidate multiplier when results are filtered after the approximate scan
+VECTOR_FILTER_OVERSAMPLE = int(os.getenv("VECTOR_FILTER_OVERSAMPLE", 4))
+
+# Persisted vectors compared with the database before a saved index is reused
+VECTOR_INDEX_VERIFY_SAMPLE = int(os.getenv("VECTOR_INDEX_VERIFY_SAMPLE", 32))
+
+# (table, embedding column, dimension, index meta) served by the local index on SQLite
+_tracked: Dict[str, Tuple[str, str, int, Dict[str, str]]] = {}
+
+
+def _index_name(table_name: str, embedding_column: str) -> str:
+    return f"{table_name}.{embedding_column}"
+
+
+def track_embeddings(model: Any, embedding_column: str, dim: int, embedding_model: Optional[str] = None) -> None:
+    """
+    Keep the local index for ``model.<embedding_column>`` in sync with ORM
+    writes (SQLite only). ``embedding_model`` is stamped on the persisted index
+    so a saved index from another model is never reused.
+    """
+    table_name = model.__tablename__
+    name = _index_name(table_name, embedding_column)
+    _tracked[name] = (table_name, embedding_column, dim, {"model": embedding_model} if embedding_model else {})
+    if not USE_LOCAL_INDEX:
+        return
+
+    @event.listens_for(model, "after_insert")
+    @event.listens_for(model, "after_update")
+    def _upsert(mapper, connection, target) -> None:
+        state = inspect(target)
+        if not state.attrs[embedding_column].history.has_changes():
+            return  # an update that did not touch the embedding
+        _defer(target, name, state.dict.get(embedding_column))
+
+    @event.listens_for(model, "after_delete")
+    def _delete(mapper, connection, target) -> None:
+        _defer(target, name, None)
+
+
+# Index writes are collected at flush and applied once the transaction commits,
+# so a rolled-back write never leaves a phantom vector in the index
+_PENDING_KEY = "pending_vector_index_ops"
+
+
+def _defer(target: Any, name: str, vector: Any) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    session.info.setdefault(_PENDING_KEY, []).append((name, target.id, vector))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session) -> None:
+    for name, item_id, vector in session.info.pop(_PENDING_KEY, []):
+        index = _local_index(name)
+        if vector is None:
+            index.remove(item_id)
+        else:
+            index.add(item_id, vector)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _local_index(name: str):
+    _, _, dim, meta = _tracked[name]
+    return get_vector_index(name, dim, meta)
+
+
+async def _matches_database(session, table, column, index, sample: int = VECTOR_INDEX_VERIFY_SAMPLE) -> bool:
+    """Whether a random sample of the index's vectors equals the stored embeddings."""
+    keys = index.keys()
+    keys = random.sample(keys, min(sample, len(keys)))
+    if not keys:
+        return True
+    ids = [id_param(table, key) for key in keys]
+    rows = (await session.execute(select(table.c.id, column).where(table.c.id.in_(ids)))).all()
+    stored = {index_key(row[0]): row[1] for row in rows}
+    for key in keys:
+        vector, indexed = stored.get(key), index.vector(key)
+        if vector is None or indexed is None:
+            return False
+        vector = np.asarray(vector, dtype=np.float32)
+        if float(vector @ indexed) < 0.999 * float(np.linalg.norm(vector)):
+            return False
+    return True
+
+
+async def _rebuild_local_index(name: str) -> None:
+    table_name, embedding_column, _, _ = _tracked[name]
+    table = Base.metadata.tables[table_name]
+    column = table.c[embedding_column]
+    index = _local_index(name)
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(select(table.c.id, column).where(column.isnot(None)))).all()
+    await asyncio.to_thread(index.replace_all, [(row[0], row[1]) for row in rows])
+    await asyncio.to_thread(index.save, True)
+    logger.info(f"Rebuilt vector index {name} from the database ({len(rows)} vectors)")
+
+
+async def load_local_indexes() -> None:
+    """Load persisted local indexes, rebuilding from the database when stale."""
+    if not USE_LOCAL_INDEX:
+        return
+    for name, (table_name, embedding_column, _, _) in _tracked.items():
+        table = Base.metadata.tables[table_name]
+        column = table.c[embedding_column]
+        index = _local_index(name)
+        async with AsyncSessionLocal() as session:
+            count = (await session.execute(select(func.count()).select_from(table).where(column.isnot(None)))).scalar()
+            if (await asyncio.to_thread(index.load) and len(index) == count
+                    and await _matches_database(session, table, column, index)):
+                logger.info(f"Loaded vector index {name} ({count} vectors)")
+                continue
+        await _rebuild_local_index(name)
+
+
+def index_vectors(table_name: str, embedding_column: str, ids: List[Any], vectors) -> None:
+    """Mirror a bulk embedding write (which bypasses ORM events) into the local index."""
+    name = _index_name(table_name, embedding_column)
+    if USE_LOCAL_INDEX and name in _tracked:
+        _local_index(name).add_many(ids, vectors)
+
+
+def save_local_indexes(force: bool = False) -> None:
+    """Persist changed indexes; one replaced on disk by another process is left alone unless ``force``."""
+    for index in all_vector_indexes():
+        if index.dirty or force:
+            index.save(force)
+
+
+async def sync_local_indexes() -> None:
+    """
+    Periodic job: reload indexes another process rewrote (e.g. the bulk
+    re-embedding script) from the database, and persist the rest.
+    """
+    if not USE_LOCAL_INDEX:
+        return
+    for name in _tracked:
+        index = _local_index(name)
+        if await asyncio.to_thread(index.changed_on_disk):
+            logger.info(f"Vector index {name} was replaced on disk; reloading from the database")
+            await _rebuild_local_index(name)
+        elif index.dirty:
+            await asyncio.to_thread(index.save)
+
+
+def id_param(table, key: str) -> Any:
+    """Bind value for an ``index_key`` of ``table``'s id column."""
+    try:
+        if table.c.id.type.python_type is uuid.UUID:
+            return uuid.UUID(hex=key)
+    except NotImplementedError:
+        pass
+    return key
+
+
+async def fetch_rows(session, table, keys: List[str], filters: Optional[Dict[str, Any]] = None) -> Dict[str, dict]:
+    """Rows of ``table`` by ``index_key``, restricted to those matching ``filters`` (column -> value)."""
+    if not keys:
+        return {}
+    stmt = select(table).where(table.c.id.in_([id_param(table, key) for key in keys]))
+    for column, value in (filters or {}).items():
+        stmt = stmt.where(table.c[column] == value)
+    result = await session.execute(stmt)
+    return {index_key(row["id"]): dict(row) for row in result.mappings()}
+
+
+async def _query_local_index(table_name: str, embedding_column: str, query_embedding: List[float], threshold: float,
+                             limit: int, ef_search: Optional[int] = None, filters: Optional[Dict[str, Any]] = None):
+    table = Base.metadata.tables[table_name]
+    name = _index_name(table_name, embedding_column)
+    index = _local_index(name) if name in _tracked else get_vector_index(name, len(query_embedding))
+    # Filters are applied to the fetched rows, so over-fetch to still fill ``limit``
+    k = limit * VECTOR_FILTER_OVERSAMPLE if filters else limit
+    hits = await asyncio.to_thread(index.search, query_embedding, k, threshold, ef_search)
+    if not hits:
+        return []
+    async with AsyncSessionLocal() as session:
+        rows = await fetch_rows(session, table, [key for key, _ in hits], filters)
+    results = []
+    for key, score in hits:
+        row = rows.get(key)
+        if row is not None:  # filtered out, or deleted outside the ORM
+            row["similarity"] = score
+            results.append(row)
+    return results[:limit]
+
+
+def _exact_similarity_stmt(table, column, query_embedding: List[float], filters: Dict[str, Any],
+                           threshold: float, limit: int, columns: Sequence[str]):
+    """Postgres exact scan: B-tree filters, then every candidate ranked by ``<=>``."""
+    distance = column.cosine_distance(list(map(float, query_embedding)))
+    stmt = select(*[table.c[name] for name in columns], (literal(1.0) - distance).label("similarity"))
+    stmt = stmt.where(column.isnot(None), distance <= 1 - threshold)
+    for name, value in filters.items():
+        stmt = stmt.where(table.c[name] == value)
+    # Ordering by an expression rather than the bare distance keeps the planner
+    # off the approximate vector index, which would filter after its top-k
+    return stmt.order_by(distance + 0.0).limit(limit)
+
+
+async def exact_vector_similarity(
+    table_name: str,
+    embedding_column: str,
+    query_embedding: List[float],
+    filters: Dict[str, Any],
+    threshold: float = 0.7,
+    limit: int = 5,
+    columns: Sequence[str] = ("id",),
+    session_factory=AsyncSessionLocal,
+) -> List[dict]:
+    """
+    Exact cosine ranking over the rows matching ``filters``.
+
+    Use it when the filters are selective and must hold for every candidate:
+    ``query_vector_similarity`` filters after an approximate global top-k, so
+    a match can be crowded out by closer rows that the filters reject. On
+    Postgres the scan runs in SQL; SQLite has no vector operators, so the
+    filtered embeddings are scored in numpy. Each result holds ``columns``
+    plus ``similarity``.
+    """
+    table = Base.metadata.tables[table_name]
+    column = table.c[embedding_column]
+    if not USE_LOCAL_INDEX:
+        stmt = _exact_similarity_stmt(table, column, query_embedding, filters, threshold, limit, columns)
+        async with session_factory() as session:
+            return [dict(row._mapping) for row in await session.execute(stmt)]
+
+    stmt = select(*[table.c[name] for name in columns], column).where(column.isnot(None))
+    for name, value in filters.items():
+        stmt = stmt.where(table.c[name] == value)
+    async with session_factory() as session:
+        rows = (await session.execute(stmt)).all()
+    if not rows:
+        return []
+    matrix = np.asarray([row[-1] for row in rows], dtype=np.float32)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    scores = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+    results = []
+    for i in np.argsort(-scores)[:limit]:
+        if scores[i] < threshold:
+            break
+        results.append({**dict(zip(columns, rows[i][:-1])), "similarity": float(scores[i])})
+    return results
+
+
+async def query_vector_similarity(
+    table_name: str,
+    embedding_column: str,
+    query_embedding: List[float],
+    threshold: float = 0.7,
+    limit: int = 5,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    filters: Optional[Dict[str, Any]] = None,
+):
+    """
+    Rows of ``table_name`` most similar to ``query_embedding`` by cosine, best
+    first, with a ``similarity`` key (1 - cosine distance) of at least
+    ``threshold``. ``filters`` (column -> value) restrict the candidates;
+    ``ef_search`` (HNSW) and ``probes`` (ivfflat) trade latency for recall on
+    this call only.
+    """
+    if USE_LOCAL_INDEX:
+        return await _query_local_index(table_name, embedding_column, query_embedding, threshold, limit, ef_search,
+                                        filters)
+    filters = filters or {}
+    conditions = "".join(f" AND {column} = :filter_{column}" for column in filters)
+    # The threshold is applied after the index scan: a WHERE on the distance
+    # would turn the top-k index scan into a filtered one
     query = text(
         f"""
-        SELECT *, 1 - ({embedding_column} <-> :query_embedding) AS similarity
+        SELECT *, 1 - ({embedding_column} <=> :query_embedding) AS similarity
         FROM {table_name}
-        WHERE 1 - ({embedding_column} <-> :query_embedding) >= :threshold
-        ORDER BY ({embedding_column} <-> :query_embedding) ASC
+        WHERE {embedding_column} IS NOT NULL{conditions}
+        ORDER BY {embedding_column} <=> :query_embedding
         LIMIT :limit
         """
-    )
+    ).bindparams(bindparam("query_embedding", type_=Vector()))
+    params = {"query_embedding": list(map(float, query_embedding)), "limit": limit}
+    params.update({f"filter_{column}": value for column, value in filters.items()})
+    # Filters drop candidates after the index scan; widen the scan to compensate
+    candidates = limit * VECTOR_FILTER_OVERSAMPLE if filters else limit
     async with AsyncSessionLocal() as session:
-        result = await session.execute(query, {"query_embedding": query_embedding, "threshold": threshold, "limit": limit})
-        return [dict(row) for row in result.fetchall()]
+        async with session.begin():
+            for statement in search_settings(ef_search, probes, candidates):
+                await session.execute(text(statement))
+            result = await session.execute(query, params)
+            rows = [dict(row._mapping) for row in result]
+    return [row for row in rows if row["similarity"] >= threshold]
@@ -0,0 +1,90 @@
+"""
+Compare the torch and ONNX embedding backends on CPU.
+
+Each backend runs in a fresh subprocess so cold start (imports + model load +
+first encode) and peak memory are measured in isolation; throughput is
+sentences/sec over a batch of mixed Bengali/English questions. Also reports
+the cosine agreement of the ONNX vectors with torch. Run from backend/ after
+scripts.export_embedding_onnx:
+
+    python -m scripts.benchmark_embedding_backends
+    python -m scripts.benchmark_embedding_backends --sentences 2000 --batch-size 64
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def _sentences(n: int):
+    from scripts.export_embedding_onnx import SAMPLE_SENTENCES
+
+    base = [s for s in SAMPLE_SENTENCES if s.strip() and len(s) < 200]
+    return [f"{base[i % len(base)]} ({i})" for i in range(n)]
+
+
+def child(backend: str, n: int, batch_size: int, vectors_path: str) -> None:
+    start = time.perf_counter()
+    if backend == "onnx":
+        from app.services.onnx_embedding import OnnxEmbeddingModel
+
+        model = OnnxEmbeddingModel.load()
+    else:
+        from sentence_transformers import SentenceTransformer
+
+        from app.services.embedding_service import EMBEDDING_MODEL
+
+        model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+    model.encode(["warm-up"], convert_to_numpy=True)
+    cold_start = time.perf_counter() - start
+
+    sentences = _sentences(n)
+    start = time.perf_counter()
+    vectors = model.encode(sentences, convert_to_numpy=True, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    np.save(vectors_path, np.asarray(vectors, dtype=np.float32))
+    print(json.dumps({
+        "backend": backend,
+        "cold_start_s": round(cold_start, 2),
+        "sentences_per_s": round(n / elapsed, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def run(backend: str, args, vectors_path: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "scripts.benchmark_embedding_backends", "--child", backend,
+         "--sentences", str(args.sentences), "--batch-size", str(args.batch_size), "--vectors", vectors_path],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--sentences", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--child", choices=("torch", "onnx"), help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.sentences, args.batch_size, args.vectors)
+        sys.exit(0)
+
+    from app.services.onnx_embedding import cosine_agreement
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {b: run(b, args, os.path.join(tmp, f"{b}.npy")) for b in ("torch", "onnx")}
+        cosines = cosine_agreement(np.load(os.path.join(tmp, "torch.npy")), np.load(os.path.join(tmp, "onnx.npy")))
+
+    print(f"{'backend':>8} {'cold start s':>13} {'sent/s':>8} {'peak RSS MB':>12}")
+    for r in results.values():
+        print(f"{r['backend']:>8} {r['cold_start_s']:>13.2f} {r['sentences_per_s']:>8.1f} {r['peak_rss_mb']:>12.1f}")
+    print(f"ONNX vs torch cosine: min {cosines.min():.4f}, mean {cosines.mean():.4f}")
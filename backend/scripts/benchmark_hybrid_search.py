@@ -0,0 +1,93 @@
+"""
+Offline relevance and latency benchmark for community question search.
+
+Compares the keyword leg, the semantic leg and hybrid (RRF) search over the
+configured database, reporting recall@k, MRR and p50/p95 latency. Labeled
+queries come from a JSONL file of {"query", "relevant": [ids], "crop_type"?,
+"district"?}; without one, queries are derived from stored questions (a few
+of their words, and the full text) with the question itself as the answer.
+Run from backend/:
+
+    python -m scripts.benchmark_hybrid_search --samples 200
+    python -m scripts.benchmark_hybrid_search --queries labeled.jsonl --k 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+from sqlalchemy import select
+
+from app.db import AsyncSessionLocal
+from app.models.community_models import CommunityQuestion
+from app.services.community_service import SEARCH_VECTOR_THRESHOLD, search_community_questions
+from app.services.embedding_service import encode_text_async
+from app.utils.text_search import lexical_search, tokenize
+from app.utils.vector_utils import query_vector_similarity
+
+
+async def derived_queries(samples: int, seed: int = 0):
+    rng = random.Random(seed)
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(select(CommunityQuestion.id, CommunityQuestion.question_text))).all()
+    queries = []
+    for row_id, question_text in rng.sample(rows, min(samples, len(rows))):
+        tokens = tokenize(question_text)
+        if not tokens:
+            continue
+        keywords = " ".join(rng.sample(tokens, min(2, len(tokens))))
+        queries.append({"query": keywords, "relevant": [str(row_id)], "kind": "keywords"})
+        queries.append({"query": question_text, "relevant": [str(row_id)], "kind": "full"})
+    return queries
+
+
+async def run_mode(mode: str, item: dict, k: int):
+    filters = {c: item[c] for c in ("crop_type", "district") if item.get(c)}
+    async with AsyncSessionLocal() as session:
+        if mode == "lexical":
+            rows = await lexical_search(session, item["query"], limit=k, filters=filters)
+        elif mode == "semantic":
+            embedding = await encode_text_async(item["query"])
+            rows = await query_vector_similarity("community_questions", "embedding", embedding,
+                                                 threshold=SEARCH_VECTOR_THRESHOLD, limit=k, filters=filters)
+        else:
+            rows = await search_community_questions(session, item["query"], limit=k, **filters)
+    return [str(row["id"]) for row in rows]
+
+
+async def main(args) -> None:
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [json.loads(line) for line in f if line.strip()]
+    else:
+        queries = await derived_queries(args.samples)
+    if not queries:
+        raise SystemExit("No queries: the community_questions table is empty")
+    await encode_text_async("warm-up")
+
+    print(f"{'mode':>9} {'queries':>8} {'recall@k':>9} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    for kind in sorted({q.get("kind", "labeled") for q in queries}):
+        subset = [q for q in queries if q.get("kind", "labeled") == kind]
+        print(f"-- {kind}")
+        for mode in ("lexical", "semantic", "hybrid"):
+            recalls, reciprocal_ranks, latencies = [], [], []
+            for item in subset:
+                relevant = {str(r) for r in item["relevant"]}
+                start = time.perf_counter()
+                ranked = await run_mode(mode, item, args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                recalls.append(len(relevant & set(ranked)) / len(relevant))
+                rank = next((i for i, key in enumerate(ranked, start=1) if key in relevant), None)
+                reciprocal_ranks.append(1 / rank if rank else 0.0)
+            print(f"{mode:>9} {len(subset):>8} {np.mean(recalls):>9.3f} {np.mean(reciprocal_ranks):>6.3f} "
+                  f"{np.percentile(latencies, 50):>8.1f} {np.percentile(latencies, 95):>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark community question search")
+    parser.add_argument("--queries", help="JSONL file of labeled queries")
+    parser.add_argument("--samples", type=int, default=200, help="questions to derive queries from")
+    parser.add_argument("--k", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
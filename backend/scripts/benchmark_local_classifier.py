@@ -0,0 +1,76 @@
+"""
+Benchmark the local crop-disease classifier under concurrent load.
+
+For each max batch size, N client threads submit images as fast as the
+batcher returns them; images/sec and per-request latency percentiles are
+reported. Run from backend/:
+
+    python -m scripts.benchmark_local_classifier --images path/to/leaves --requests 256
+    python -m scripts.benchmark_local_classifier --batch-sizes 1,4,8,16,32 --clients 32
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from app.services.local_classifier import LOCAL_VISION_MODEL_PATH, LocalClassifier, preprocess
+
+
+def synthetic_images(directory: str, count: int = 16):
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"leaf_{i}.jpg")
+        Image.fromarray(rng.integers(0, 255, size=(768, 1024, 3), dtype=np.uint8)).save(path, quality=85)
+        paths.append(path)
+    return paths
+
+
+def run(classifier: LocalClassifier, tensors, requests: int, clients: int):
+    latencies = []
+
+    def one(i: int) -> None:
+        start = time.perf_counter()
+        classifier.batcher.infer_sync(tensors[i % len(tensors)])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    lat = np.array(latencies) * 1000
+    return requests / elapsed, np.percentile(lat, 50), np.percentile(lat, 95)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local vision classifier")
+    parser.add_argument("--model", default=LOCAL_VISION_MODEL_PATH)
+    parser.add_argument("--images", default=None, help="Directory of .jpg/.png images (synthetic if omitted)")
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16,32")
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--clients", type=int, default=32)
+    args = parser.parse_args()
+
+    base = LocalClassifier.load(args.model)
+    base.close()
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.images:
+            paths = sorted(glob.glob(os.path.join(args.images, "*.jpg")) + glob.glob(os.path.join(args.images, "*.png")))
+        else:
+            paths = synthetic_images(tmp)
+        # Preprocess once so the numbers measure the model and batching only
+        tensors = [preprocess(p, base.input_size) for p in paths]
+
+    print(f"{'batch':>6} {'img/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for size in (int(s) for s in args.batch_sizes.split(",")):
+        classifier = LocalClassifier(base.session, base.labels, base.input_size, size, args.max_wait_ms)
+        classifier.batcher.infer_sync(tensors[0])  # warm-up
+        throughput, p50, p95 = run(classifier, tensors, args.requests, args.clients)
+        classifier.close()
+        print(f"{classifier.batcher.max_batch_size:>6} {throughput:>9.1f} {p50:>9.1f} {p95:>9.1f}")
@@ -0,0 +1,101 @@
+"""
+Recall-vs-latency benchmark for pgvector cosine indexes.
+
+Loads synthetic clustered 384-dim vectors into a scratch table, builds the
+requested index types and sweeps the query-time knob (``hnsw.ef_search`` or
+``ivfflat.probes``), reporting recall@k against exact NumPy search and p50/p95
+latency per setting. Needs a Postgres DATABASE_URL with the vector extension;
+the scratch table is dropped afterwards. Run from backend/:
+
+    python -m scripts.benchmark_pgvector --rows 100000
+    python -m scripts.benchmark_pgvector --types hnsw --ef 20,40,80,160
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from app.db import DATABASE_URL, engine
+from app.utils.pgvector_index import index_ddl, search_settings
+from scripts.benchmark_vector_index import synthetic
+
+TABLE = "bench_pgvector"
+
+
+def _literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+
+async def load(conn, data: np.ndarray, batch: int = 1000) -> None:
+    await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await conn.execute(text(f"CREATE TABLE {TABLE} (id integer PRIMARY KEY, embedding vector({data.shape[1]}))"))
+    for start in range(0, len(data), batch):
+        await conn.execute(
+            text(f"INSERT INTO {TABLE} (id, embedding) VALUES (:id, CAST(:v AS vector))"),
+            [{"id": start + i, "v": _literal(v)} for i, v in enumerate(data[start:start + batch])],
+        )
+
+
+async def sweep(conn, queries: np.ndarray, truth, k: int, ef_search: int = None, probes: int = None):
+    latencies, recalls = [], []
+    for q, expected in zip(queries, truth):
+        async with conn.begin():
+            for statement in search_settings(ef_search, probes, k):
+                await conn.execute(text(statement))
+            start = time.perf_counter()
+            result = await conn.execute(
+                text(f"SELECT id FROM {TABLE} ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k"),
+                {"q": _literal(q), "k": k},
+            )
+            ids = {row[0] for row in result}
+            latencies.append(time.perf_counter() - start)
+        recalls.append(len(ids & expected) / k)
+    lat = np.array(latencies) * 1000
+    return float(np.mean(recalls)), float(np.percentile(lat, 50)), float(np.percentile(lat, 95))
+
+
+async def main(args) -> None:
+    data = synthetic(args.rows, args.dim)
+    queries = synthetic(args.queries, args.dim, seed=1)
+    normed = data / np.linalg.norm(data, axis=1, keepdims=True)
+    scores = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ normed.T
+    truth = [set(np.argsort(-s)[: args.k].tolist()) for s in scores]
+
+    async with engine.connect() as conn:
+        async with conn.begin():
+            await load(conn, data)
+        print(f"{'index':>8} {'knob':>16} {'build s':>8} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        try:
+            for kind in args.types.split(","):
+                async with conn.begin():
+                    await conn.execute(text(f"DROP INDEX IF EXISTS {TABLE}_idx"))
+                    start = time.perf_counter()
+                    await conn.execute(text(index_ddl(TABLE, "embedding", f"{TABLE}_idx", kind=kind, rows=args.rows)))
+                    build = time.perf_counter() - start
+                values = args.ef if kind == "hnsw" else args.probes
+                for value in (int(v) for v in values.split(",")):
+                    knob = {"ef_search": value} if kind == "hnsw" else {"probes": value}
+                    recall, p50, p95 = await sweep(conn, queries, truth, args.k, **knob)
+                    label = f"{next(iter(knob))}={value}"
+                    print(f"{kind:>8} {label:>16} {build:>8.1f} {recall:>7.3f} {p50:>8.2f} {p95:>8.2f}")
+        finally:
+            async with conn.begin():
+                await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pgvector cosine indexes")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", default="hnsw,ivfflat")
+    parser.add_argument("--ef", default="10,20,40,80,160", help="hnsw.ef_search values")
+    parser.add_argument("--probes", default="1,5,10,20,50", help="ivfflat.probes values")
+    args = parser.parse_args()
+    if "postgresql" not in DATABASE_URL:
+        raise SystemExit("This benchmark needs a Postgres DATABASE_URL with pgvector")
+    asyncio.run(main(args))
@@ -0,0 +1,66 @@
+"""
+Benchmark the in-process vector index (SQLite deployments).
+
+Builds indexes over synthetic clustered 384-dim vectors and reports recall@k
+against exact search plus per-query latency, for brute force and (when
+hnswlib is installed) HNSW. 1M vectors need ~1.5 GB of RAM. Run from backend/:
+
+    python -m scripts.benchmark_vector_index
+    python -m scripts.benchmark_vector_index --sizes 10000,100000 --ef 32,64,128
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.vector_index import VectorIndex
+
+
+def synthetic(n: int, dim: int, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """Clustered data: sentence embeddings are far from uniformly spread."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    data = centers[rng.integers(0, clusters, n)] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32)
+    return data
+
+
+def measure(index: VectorIndex, queries: np.ndarray, truth, k: int, **kwargs):
+    latencies, recalls = [], []
+    for q, expected in zip(queries, truth):
+        start = time.perf_counter()
+        hits = index.search(q, k, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len({h for h, _ in hits} & expected) / k)
+    lat = np.array(latencies) * 1000
+    return float(np.mean(recalls)), float(np.percentile(lat, 50)), float(np.percentile(lat, 95))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local vector index")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef", default="32,64,128,256", help="HNSW ef_search values")
+    args = parser.parse_args()
+
+    print(f"{'vectors':>9} {'mode':>12} {'build s':>8} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        data = synthetic(n, args.dim)
+        queries = synthetic(args.queries, args.dim, seed=1)
+        ids = np.arange(n)
+
+        start = time.perf_counter()
+        index = VectorIndex(args.dim, name=f"bench_{n}", directory=None, hnsw_min=n)
+        index.add_many(ids, data)
+        build = time.perf_counter() - start
+
+        truth = [{h for h, _ in index.search(q, args.k, exact=True)} for q in queries]
+        recall, p50, p95 = measure(index, queries, truth, args.k, exact=True)
+        print(f"{n:>9} {'brute':>12} {'-':>8} {recall:>7.3f} {p50:>8.2f} {p95:>8.2f}")
+        if index._hnsw is None:
+            print(f"{n:>9} {'hnsw':>12}  skipped (pip install hnswlib)")
+            continue
+        for ef in (int(e) for e in args.ef.split(",")):
+            recall, p50, p95 = measure(index, queries, truth, args.k, ef_search=ef)
+            print(f"{n:>9} {f'hnsw ef={ef}':>12} {build:>8.1f} {recall:>7.3f} {p50:>8.2f} {p95:>8.2f}")
@@ -0,0 +1,100 @@
+"""
+Pre-render the TTS phrase bank.
+
+Renders frequent Bengali phrases (numbers, units, crop names and standard
+advisory sentences) with a TTS backend and writes them, plus manifest.json,
+to PHRASE_BANK_DIR. Run from backend/:
+
+    python -m scripts.build_phrase_bank --provider espeak
+    python -m scripts.build_phrase_bank --phrases extra_phrases.txt
+"""
+import argparse
+import hashlib
+import json
+import os
+
+from app.services.phrase_bank import MANIFEST_NAME, PHRASE_BANK_DIR, reload_phrase_bank
+from app.services.tts_backends import get_tts_backend
+
+BENGALI_DIGITS = "০১২৩৪৫৬৭৮৯"
+
+UNITS = ["কেজি", "গ্রাম", "লিটার", "মিলি", "টাকা", "বিঘা", "একর", "শতাংশ", "দিন", "সপ্তাহ", "মাস", "মণ", "টন"]
+
+CROPS = [
+    "ধান", "গম", "পাট", "আলু", "পেঁয়াজ", "রসুন", "টমেটো", "বেগুন", "মরিচ", "বাঁধাকপি",
+    "ফুলকপি", "ভুট্টা", "সরিষা", "মসুর", "আম", "কলা", "পেঁপে", "চা", "আখ", "লাউ",
+]
+
+SENTENCES = [
+    "আমি বুঝতে পারিনি।",
+    "অনুগ্রহ করে আবার বলুন।",
+    "হ্যালো! আমি আপনার কৃষিবন্ধু।",
+    "আমি কীভাবে সাহায্য করতে পারি?",
+    "আজকের আবহাওয়া",
+    "বৃষ্টির সম্ভাবনা আছে।",
+    "আজ সেচ দেওয়ার দরকার নেই।",
+    "আজ সেচ দিন।",
+    "বাজারদর",
+    "প্রতি কেজি",
+    "জমিতে",
+    "প্রয়োগ করুন।",
+    "নিকটস্থ কৃষি অফিসে যোগাযোগ করুন।",
+    "ধন্যবাদ।",
+]
+
+
+def to_bengali_number(n: int) -> str:
+    return "".join(BENGALI_DIGITS[int(d)] for d in str(n))
+
+
+def default_phrases() -> list:
+    numbers = [to_bengali_number(n) for n in range(0, 101)]
+    return numbers + UNITS + CROPS + SENTENCES
+
+
+def build(phrases: list, out_dir: str, provider: str, lang: str) -> int:
+    backend = get_tts_backend(provider)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    entries = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") == backend.ext and manifest.get("lang") == lang:
+            entries = manifest.get("phrases", {})
+
+    rendered = 0
+    for phrase in phrases:
+        phrase = phrase.strip()
+        if not phrase or phrase in entries:
+            continue
+        filename = f"{hashlib.sha1(phrase.encode('utf-8')).hexdigest()[:16]}.{backend.ext}"
+        try:
+            backend.synthesize(phrase, lang, os.path.join(out_dir, filename))
+        except Exception as e:
+            print(f"Skipping '{phrase}': {e}")
+            continue
+        entries[phrase] = filename
+        rendered += 1
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"lang": lang, "format": backend.ext, "voice": backend.voice, "phrases": entries}, f, ensure_ascii=False, indent=2)
+    return rendered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render the TTS phrase bank")
+    parser.add_argument("--provider", default=None, help="TTS backend (defaults to TTS_PROVIDER)")
+    parser.add_argument("--phrases", default=None, help="Extra phrases file, one per line")
+    parser.add_argument("--out", default=PHRASE_BANK_DIR)
+    parser.add_argument("--lang", default="bn")
+    args = parser.parse_args()
+
+    phrases = default_phrases()
+    if args.phrases:
+        with open(args.phrases, encoding="utf-8") as f:
+            phrases += f.read().splitlines()
+
+    count = build(phrases, args.out, args.provider, args.lang)
+    reload_phrase_bank()
+    print(f"Rendered {count} new phrases into {args.out}")
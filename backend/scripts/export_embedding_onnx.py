@@ -0,0 +1,113 @@
+"""
+Export EMBEDDING_MODEL to int8-quantized ONNX for the onnx embedding backend.
+
+Exports the transformer (pooling happens in app.services.onnx_embedding),
+applies dynamic int8 quantization to the weights, saves the fast tokenizer,
+and validates the result against sentence-transformers on sample sentences:
+the export is rejected unless every sentence keeps a cosine similarity of at
+least EMBEDDING_ONNX_MIN_COSINE to the torch embedding. Needs torch,
+transformers, sentence-transformers, onnx and onnxruntime. Run from backend/:
+
+    python -m scripts.export_embedding_onnx
+    python -m scripts.export_embedding_onnx --output models/embedding_onnx --no-quantize
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from app.services.embedding_service import EMBEDDING_MODEL
+from app.services.onnx_embedding import (
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_MAX_LENGTH,
+    EMBEDDING_ONNX_MIN_COSINE,
+    OnnxEmbeddingModel,
+    cosine_agreement,
+)
+
+SAMPLE_SENTENCES = [
+    "ধানের পাতায় বাদামি দাগ দেখা যাচ্ছে, কী করব?",
+    "আলুর নাবি ধসা রোগে কোন ছত্রাকনাশক স্প্রে করব?",
+    "পাট গাছের গোড়া পচে যাচ্ছে",
+    "গমের জমিতে কখন সেচ দিতে হবে?",
+    "How much urea should I apply to boro rice per bigha?",
+    "Tricyclazole dose for rice blast",
+    "টমেটো গাছে সাদা মাছি, Imidacloprid দেওয়া যাবে?",
+    "What is the best time to transplant aman seedlings?",
+    "বেগুনের ডগা ও ফল ছিদ্রকারী পোকা দমন",
+    "soil pH 5.2, should I add lime before planting maize?",
+    "",
+    "ধান " * 200,  # longer than the max sequence length: exercises truncation
+]
+
+
+def export(output_dir: str, opset: int) -> str:
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL)
+    model = AutoModel.from_pretrained(EMBEDDING_MODEL).eval()
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer.save_pretrained(output_dir)  # writes tokenizer.json for the runtime
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=opset,
+        )
+    return fp32_path
+
+
+def quantize(fp32_path: str, output_dir: str) -> str:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = os.path.join(output_dir, "model.int8.onnx")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+def validate(output_dir: str, model_file: str) -> np.ndarray:
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer(EMBEDDING_MODEL).encode(SAMPLE_SENTENCES, convert_to_numpy=True)
+    candidate = OnnxEmbeddingModel.load(output_dir, model_file).encode(SAMPLE_SENTENCES)
+    return cosine_agreement(reference, candidate)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the embedding model to quantized ONNX")
+    parser.add_argument("--output", default=EMBEDDING_ONNX_DIR)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--no-quantize", action="store_true", help="keep fp32 weights")
+    args = parser.parse_args()
+
+    fp32_path = export(args.output, args.opset)
+    model_path = fp32_path if args.no_quantize else quantize(fp32_path, args.output)
+    cosines = validate(args.output, os.path.basename(model_path))
+    report = {
+        "model": EMBEDDING_MODEL,
+        "file": os.path.basename(model_path),
+        "max_length": EMBEDDING_ONNX_MAX_LENGTH,
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "size_mb": round(os.path.getsize(model_path) / 1e6, 1),
+    }
+    with open(os.path.join(args.output, "export.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    if cosines.min() < EMBEDDING_ONNX_MIN_COSINE:
+        print(f"Rejected: min cosine {cosines.min():.4f} < {EMBEDDING_ONNX_MIN_COSINE}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,56 @@
+"""
+Rebuild the community question embedding index on Postgres without blocking
+writes (CREATE INDEX CONCURRENTLY under a temporary name, then swap).
+
+Use it to switch between HNSW and ivfflat, to change build parameters, or to
+retrain ivfflat lists after the table has grown. Run from backend/:
+
+    python -m scripts.manage_vector_index --type hnsw --m 16 --ef-construction 64
+    python -m scripts.manage_vector_index --type ivfflat   # lists from the row count
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.db import DATABASE_URL, engine
+from app.utils.pgvector_index import (
+    INDEX_TYPES,
+    PGVECTOR_HNSW_EF_CONSTRUCTION,
+    PGVECTOR_HNSW_M,
+    PGVECTOR_INDEX_TYPE,
+    index_ddl,
+)
+
+TABLE = "community_questions"
+COLUMN = "embedding"
+INDEX_NAME = "idx_community_questions_embedding"
+
+
+async def rebuild(kind: str, m: int, ef_construction: int, lists: int) -> None:
+    building = f"{INDEX_NAME}_new"
+    # CONCURRENTLY cannot run inside a transaction block
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        rows = (await conn.execute(text(f"SELECT count(*) FROM {TABLE}"))).scalar() or 0
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {building}"))
+        start = time.perf_counter()
+        await conn.execute(text(index_ddl(TABLE, COLUMN, building, kind=kind, m=m, ef_construction=ef_construction,
+                                          lists=lists or None, rows=rows, concurrently=True)))
+        print(f"Built {kind} index over {rows} rows in {time.perf_counter() - start:.1f}s")
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}"))
+        await conn.execute(text(f"ALTER INDEX {building} RENAME TO {INDEX_NAME}"))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the community question vector index")
+    parser.add_argument("--type", choices=INDEX_TYPES, default=PGVECTOR_INDEX_TYPE)
+    parser.add_argument("--m", type=int, default=PGVECTOR_HNSW_M)
+    parser.add_argument("--ef-construction", type=int, default=PGVECTOR_HNSW_EF_CONSTRUCTION)
+    parser.add_argument("--lists", type=int, default=0, help="ivfflat lists (0 = from the row count)")
+    args = parser.parse_args()
+    if "postgresql" not in DATABASE_URL:
+        raise SystemExit("Vector indexes are managed in Postgres; SQLite uses the in-process index")
+    asyncio.run(rebuild(args.type, args.m, args.ef_construction, args.lists))
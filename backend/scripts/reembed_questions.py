@@ -0,0 +1,56 @@
+"""
+Recompute community question embeddings in bulk (SQLite or Postgres).
+
+    python -m scripts.reembed_questions                 # rows without an embedding
+    python -m scripts.reembed_questions --mode all      # after changing EMBEDDING_MODEL
+    python -m scripts.reembed_questions --mode all --restart --chunk-size 512 --pause 0
+
+Progress is checkpointed after every chunk; re-running the same command after
+an interruption resumes from the last committed row. The same job can be
+queued for the background worker as an AsyncTask of type
+``reembed_questions`` or ``reembed_questions_all``. On SQLite prefer the
+task: it updates the running app's in-process vector index directly, while
+this script rewrites the persisted index. A running app notices the rewrite
+at its next index save (every 10 minutes) and reloads the index from the
+database instead of overwriting the file; until then it serves its old
+vectors.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+import app.services.community_service  # noqa: F401 - registers tracked embeddings
+from app.services.reembed_service import (
+    MODES,
+    REEMBED_CHECKPOINT,
+    REEMBED_CHUNK_SIZE,
+    REEMBED_PAUSE_S,
+    reembed_questions,
+)
+from app.utils.vector_utils import load_local_indexes, save_local_indexes
+
+
+async def main(args) -> dict:
+    await load_local_indexes()  # SQLite only: updated alongside the rows, then persisted
+    summary = await reembed_questions(
+        mode=args.mode, chunk_size=args.chunk_size, pause_s=args.pause, checkpoint_path=args.checkpoint,
+        restart=args.restart, max_rows=args.max_rows,
+    )
+    save_local_indexes(force=True)  # a new stamp token tells a running app to reload
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-embed community questions")
+    parser.add_argument("--mode", choices=MODES, default="missing")
+    parser.add_argument("--chunk-size", type=int, default=REEMBED_CHUNK_SIZE)
+    parser.add_argument("--pause", type=float, default=REEMBED_PAUSE_S, help="seconds to sleep between chunks")
+    parser.add_argument("--checkpoint", default=REEMBED_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="ignore any saved checkpoint")
+    parser.add_argument("--max-rows", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    summary = asyncio.run(main(args))
+    print(json.dumps(summary, indent=2))
@@ -3,6 +3,7 @@ Shared test fixtures for KrishiBondhu backend tests.
 
 Provides:
   - Async SQLite database (in-memory) with auto-rollback
+  - Bare-schema SQLite copies of single model tables
   - FastAPI TestClient with dependency overrides
   - Mock Redis
   - Required environment variables
@@ -11,6 +12,7 @@ Provides:
 import os
 import sys
 import pytest
+import pytest_asyncio
 import asyncio
 from unittest.mock import MagicMock, AsyncMock, patch
 from typing import AsyncGenerator
@@ -26,6 +28,8 @@ os.environ.update({
     "UPLOAD_DIR": "/tmp/test_uploads",
 })
 
+from geoalchemy2 import Geometry
+from sqlalchemy import Column, MetaData, Table
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -101,6 +105,40 @@ async def db_session(async_engine) -> AsyncGenerator[AsyncSession, None]:
         await session.rollback()
 
 
+class BareSchema:
+    """
+    In-memory SQLite copies of model tables reduced to plain columns (no
+    foreign keys, indexes, constraints or PostGIS geometry), so a service can
+    be tested against one table without SpatiaLite or the rest of the schema.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.metadata = MetaData()
+        self.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def create(self, model, *columns: str) -> Table:
+        """Create ``model``'s table (mapped class or Table) with ``columns`` in that order, default all."""
+        table = getattr(model, "__table__", model)
+        names = columns or [c.name for c in table.columns if not isinstance(c.type, Geometry)]
+        bare = Table(
+            table.name,
+            self.metadata,
+            *(Column(name, table.c[name].type, primary_key=table.c[name].primary_key) for name in names),
+        )
+        async with self.engine.begin() as conn:
+            await conn.run_sync(bare.create)
+        return bare
+
+
+@pytest_asyncio.fixture
+async def bare_schema():
+    """Empty in-memory database; create the tables a test needs with ``await bare_schema.create(Model, ...)``."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    yield BareSchema(engine)
+    await engine.dispose()
+
+
 # ---------------------------------------------------------------------------
 # FastAPI TestClient
 # ---------------------------------------------------------------------------
@@ -8,20 +8,22 @@ from unittest.mock import patch, MagicMock
 class TestVisionServiceFallbackChain:
     """Test the 3-tier fallback chain in VisionService."""
 
-    def test_tier1_skipped_without_api_key(self):
+    @pytest.mark.asyncio
+    async def test_tier1_skipped_without_api_key(self):
         """When HUGGINGFACE_API_KEY is empty, Tier 1 should be skipped."""
         with patch.dict(os.environ, {"HUGGINGFACE_API_KEY": "", "GROQ_API_KEY": ""}):
             from app.services.vision_service import VisionService
             svc = VisionService()
-            result = svc._tier1_huggingface("/fake/path.jpg", "disease")
+            result = await svc._tier1_huggingface_async("/fake/path.jpg", "disease")
             assert result is None
 
-    def test_tier2_skipped_without_groq_key(self):
+    @pytest.mark.asyncio
+    async def test_tier2_skipped_without_groq_key(self):
         """When GROQ_API_KEY is empty, Tier 2 should be skipped."""
         with patch.dict(os.environ, {"GROQ_API_KEY": ""}):
             from app.services.vision_service import VisionService
             svc = VisionService()
-            result = svc._tier2_groq_vision("/fake/path.jpg", "disease")
+            result = await svc._tier2_groq_vision_async("/fake/path.jpg", "disease")
             assert result is None
 
     def test_full_fallback_to_offline(self, tmp_path):
@@ -98,3 +98,149 @@ class TestEmergencyEndpoints:
     def test_emergency_providers_endpoint(self, test_client):
         response = test_client.get("/api/emergency/providers")
         assert response.status_code in [200, 404]
+
+
+class TestStreamingSTTEndpoint:
+    """Test the streaming speech recognition WebSocket."""
+
+    def test_pending_transcriptions_are_bounded(self, monkeypatch):
+        import threading
+        import time
+        from types import SimpleNamespace
+
+        import numpy as np
+        from fastapi.testclient import TestClient
+
+        from app import main
+        from app.core import security
+        from app.services import audio
+        from app.services.streaming_stt import MAX_PENDING_SEGMENTS
+
+        class _Session:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, stmt):
+                user = SimpleNamespace(id=1, external_id="farmer-1", username="farmer")
+                return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: user))
+
+        lock = threading.Lock()
+        stats = {"active": 0, "peak": 0, "calls": 0, "samples": 0}
+
+        def slow_transcribe(segment, sample_rate):
+            with lock:
+                stats["active"] += 1
+                stats["calls"] += 1
+                stats["samples"] += len(segment)
+                stats["peak"] = max(stats["peak"], stats["active"])
+            time.sleep(0.2)
+            with lock:
+                stats["active"] -= 1
+            return {"text": ""}
+
+        monkeypatch.setattr(security, "decode_access_token", lambda token: {"sub": "farmer"})
+        monkeypatch.setattr(main, "AsyncSessionLocal", _Session)
+        monkeypatch.setattr(audio, "transcribe_pcm_segment", slow_transcribe)
+
+        def pcm(seconds, amplitude):
+            return np.full(int(16000 * seconds), amplitude * 32767, dtype=np.float32).astype("<i2").tobytes()
+
+        segments = 6
+        with TestClient(main.app).websocket_connect("/api/ws/stt?token=t") as ws:
+            ws.send_json({"type": "start", "sample_rate": 16000})
+            for _ in range(segments):
+                ws.send_bytes(pcm(0.5, 0.3) + pcm(0.45, 0.0))
+            ws.send_json({"type": "stop"})
+            final = ws.receive_json()
+
+        assert final["type"] == "final" and final["unclear_audio"] is True
+        assert stats["peak"] <= MAX_PENDING_SEGMENTS
+        assert stats["calls"] < segments  # queued segments were merged
+        assert stats["samples"] >= segments * 8000  # but none were lost
+
+    @pytest.mark.parametrize("sample_rate", [0, 1_000_000_000, "fast"])
+    def test_unsupported_sample_rate_closes_the_socket(self, monkeypatch, sample_rate):
+        from types import SimpleNamespace
+
+        from fastapi.testclient import TestClient
+        from starlette.websockets import WebSocketDisconnect
+
+        from app import main
+        from app.core import security
+
+        class _Session:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, stmt):
+                user = SimpleNamespace(id=1, external_id="farmer-1", username="farmer")
+                return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: user))
+
+        monkeypatch.setattr(security, "decode_access_token", lambda token: {"sub": "farmer"})
+        monkeypatch.setattr(main, "AsyncSessionLocal", _Session)
+
+        with TestClient(main.app).websocket_connect("/api/ws/stt?token=t") as ws:
+            ws.send_json({"type": "start", "sample_rate": sample_rate})
+            error = ws.receive_json()
+            with pytest.raises(WebSocketDisconnect) as exc:
+                ws.receive_json()
+
+        assert error["type"] == "error" and error["code"] == "UNSUPPORTED_SAMPLE_RATE"
+        assert exc.value.code == 1003
+
+    def test_agent_reply_does_not_block_the_next_utterance(self, monkeypatch):
+        import asyncio
+        from types import SimpleNamespace
+
+        import numpy as np
+        from fastapi.testclient import TestClient
+
+        from app import main
+        from app.core import security
+        from app.services import audio
+
+        class _Session:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, stmt):
+                user = SimpleNamespace(id=1, external_id="farmer-1", username="farmer")
+                return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: user))
+
+        async def slow_reply(transcript, initial_state):
+            await asyncio.sleep(0.5)
+            return f"reply to {transcript}"
+
+        async def no_persist(*args, **kwargs):
+            return None
+
+        transcripts = iter(["আমার ধানে পোকা লেগেছে", "সার কখন দেব"])
+        monkeypatch.setattr(security, "decode_access_token", lambda token: {"sub": "farmer"})
+        monkeypatch.setattr(main, "AsyncSessionLocal", _Session)
+        monkeypatch.setattr(main, "_generate_agent_reply", slow_reply)
+        monkeypatch.setattr(main, "persist_turn", no_persist)
+        monkeypatch.setattr(audio, "transcribe_pcm_segment", lambda segment, sample_rate: {"text": next(transcripts)})
+
+        speech = np.full(8000, 0.3 * 32767, dtype=np.float32).astype("<i2").tobytes()
+        with TestClient(main.app).websocket_connect("/api/ws/stt?token=t") as ws:
+            events = []
+            for _ in range(2):
+                ws.send_bytes(speech)
+                ws.send_json({"type": "stop"})
+                while not events or events[-1]["type"] != "final":
+                    events.append(ws.receive_json())
+            while sum(e["type"] == "reply" for e in events) < 2:
+                events.append(ws.receive_json())
+
+        types = [e["type"] for e in events]
+        # The second utterance was transcribed while the first reply was still running
+        assert types.index("final", types.index("final") + 1) < types.index("reply")
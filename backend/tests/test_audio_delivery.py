@@ -0,0 +1,67 @@
+"""Unit tests for audio delivery: format negotiation, ETags and ranges."""
+import hashlib
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services import audio_delivery
+
+
+def test_wants_opus_negotiation():
+    firefox = "audio/webm,audio/ogg,audio/wav,audio/*;q=0.9,application/ogg;q=0.7,*/*;q=0.5"
+    assert audio_delivery.wants_opus(firefox) is True
+    assert audio_delivery.wants_opus("*/*") is False
+    assert audio_delivery.wants_opus("audio/mpeg, audio/ogg;q=0.5") is False
+    assert audio_delivery.wants_opus("*/*", fmt="opus") is True
+    assert audio_delivery.wants_opus("audio/ogg", fmt="mp3") is False
+
+
+def _client(path):
+    app = FastAPI()
+
+    @app.get("/clip")
+    async def clip(request: Request):
+        return audio_delivery.audio_file_response(request, str(path))
+
+    return TestClient(app)
+
+
+def test_tts_clip_etag_follows_bytes_not_name(tmp_path):
+    key = hashlib.sha256(b"x").hexdigest()
+    path = tmp_path / f"tts_{key}.mp3"
+    path.write_bytes(b"0123456789" * 10)
+    client = _client(path)
+
+    resp = client.get("/clip")
+    assert resp.status_code == 200
+    assert resp.headers["etag"] == f'"{hashlib.sha256(b"0123456789" * 10).hexdigest()}"'
+    assert resp.headers["cache-control"] == "no-cache"
+    assert resp.headers["content-type"] == "audio/mpeg"
+
+    assert client.get("/clip", headers={"If-None-Match": resp.headers["etag"]}).status_code == 304
+
+    partial = client.get("/clip", headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == b"0123456789"
+    assert partial.headers["content-range"] == "bytes 10-19/100"
+
+
+def test_uploaded_clip_gets_content_hash_etag(tmp_path):
+    path = tmp_path / "voice.webm"
+    path.write_bytes(b"webm-bytes")
+    resp = _client(path).get("/clip")
+
+    assert resp.headers["etag"] == f'"{hashlib.sha256(b"webm-bytes").hexdigest()}"'
+    assert resp.headers["cache-control"] == "no-cache"
+
+
+def test_rerendered_clip_gets_a_new_etag(tmp_path):
+    path = tmp_path / f"tts_{hashlib.sha256(b'x').hexdigest()}.mp3"
+    path.write_bytes(b"first render")
+    client = _client(path)
+    first = client.get("/clip").headers["etag"]
+
+    path.write_bytes(b"second render, evicted and rebuilt")
+
+    assert client.get("/clip", headers={"If-None-Match": first}).status_code == 200
+    assert client.get("/clip").headers["etag"] != first
@@ -0,0 +1,169 @@
+"""Unit tests for the speech-to-text service helpers."""
+import threading
+import time
+
+import numpy as np
+
+from app.services import audio
+from app.services.audio_chunking import split_on_silence, stitch_transcripts
+from app.services.streaming_stt import StreamingTranscriber
+from app.llm.provider import STT_TIER_SMALL, STT_TIER_LARGE
+
+
+class FakePipeline:
+    def __init__(self, text, name):
+        self.text = text
+        self.calls = 0
+        self.model = type("Model", (), {"name_or_path": name})()
+
+    def __call__(self, audio_array, batch_size=None):
+        self.calls += 1
+        if isinstance(audio_array, list):
+            return [self.transcribe(segment) for segment in audio_array]
+        return self.transcribe(audio_array)
+
+    def transcribe(self, segment):
+        return {"text": self.text}
+
+
+def test_select_stt_tier_uses_duration_and_queue_depth():
+    assert audio.select_stt_tier(2.0, 0) == STT_TIER_SMALL
+    assert audio.select_stt_tier(60.0, 50) == STT_TIER_LARGE
+    assert audio.select_stt_tier(15.0, 0) == STT_TIER_LARGE
+    assert audio.select_stt_tier(15.0, 10) == STT_TIER_SMALL
+
+
+def _whisper_pipelines(monkeypatch, seconds):
+    pipelines = {
+        STT_TIER_SMALL: FakePipeline("হ্যাঁ", "openai/whisper-small"),
+        STT_TIER_LARGE: FakePipeline("আমার ধানের পাতায় দাগ দেখা যাচ্ছে", "openai/whisper-large-v2"),
+    }
+    monkeypatch.setattr(audio.librosa, "load", lambda path, sr: (np.zeros(int(sr * seconds), dtype=np.float32), sr))
+    monkeypatch.setattr(audio, "init_stt_pipeline", lambda tier: pipelines[tier])
+    monkeypatch.setattr(audio, "select_stt_tier", lambda duration, depth: STT_TIER_SMALL)
+    return pipelines
+
+
+def test_local_whisper_keeps_short_one_word_replies_on_small_tier(monkeypatch, tmp_path):
+    clip = tmp_path / "clip.wav"
+    clip.write_bytes(b"fake")
+    pipelines = _whisper_pipelines(monkeypatch, 2)
+
+    result = audio.transcribe_with_local_whisper(str(clip))
+
+    assert result["text"] == "হ্যাঁ"
+    assert result["stt_model_tier"] == STT_TIER_SMALL
+    assert "stt_escalated" not in result
+    assert pipelines[STT_TIER_LARGE].calls == 0
+    assert audio.get_stt_queue_depth() == 0
+
+
+def test_local_whisper_escalates_unclear_longer_clip(monkeypatch, tmp_path):
+    clip = tmp_path / "clip.wav"
+    clip.write_bytes(b"fake")
+    pipelines = _whisper_pipelines(monkeypatch, 15)
+
+    result = audio.transcribe_with_local_whisper(str(clip))
+
+    assert result["stt_model_tier"] == STT_TIER_LARGE
+    assert result["stt_escalated"] is True
+    assert result["stt_model"] == "openai/whisper-large-v2"
+    assert pipelines[STT_TIER_SMALL].calls == 1
+
+
+def test_split_on_silence_cuts_in_quiet_gap():
+    sr = 16000
+    loud = np.full(sr * 20, 0.5, dtype=np.float32)
+    quiet = np.zeros(sr // 2, dtype=np.float32)
+    clip = np.concatenate([loud, quiet, loud])
+
+    ranges = split_on_silence(clip, sr, chunk_s=25.0, overlap_s=0.2, search_s=10.0)
+
+    assert len(ranges) == 2
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(clip)
+    cut = ranges[1][0] + int(0.2 * sr)
+    assert sr * 20 <= cut <= sr * 20 + sr // 2
+    assert ranges[0][1] > ranges[1][0]  # chunks overlap
+
+
+def test_stitch_transcripts_drops_overlap_duplicates():
+    texts = ["ধানের পাতায় বাদামি দাগ দেখা", "দাগ দেখা যাচ্ছে, কী করব?"]
+    assert stitch_transcripts(texts) == "ধানের পাতায় বাদামি দাগ দেখা যাচ্ছে, কী করব?"
+    assert stitch_transcripts(["hello world", "", "world again"]) == "hello world again"
+
+
+def _pcm(seconds, amplitude, sr=16000):
+    return (np.full(int(sr * seconds), amplitude * 32767, dtype=np.float32)).astype("<i2").tobytes()
+
+
+def test_streaming_transcriber_segments_and_detects_end_of_speech():
+    transcriber = StreamingTranscriber(sample_rate=16000, segment_silence_ms=300, end_of_speech_ms=900)
+
+    assert transcriber.feed(_pcm(0.5, 0.0)) == []
+    assert transcriber.heard_speech is False
+
+    segments = transcriber.feed(_pcm(1.0, 0.3) + _pcm(0.4, 0.0))
+    assert len(segments) == 1
+    assert 1.0 <= len(segments[0]) / 16000 <= 1.4
+    assert transcriber.end_of_speech is False
+
+    transcriber.feed(_pcm(0.6, 0.0))
+    assert transcriber.end_of_speech is True
+    assert transcriber.flush() is None
+
+
+def test_local_whisper_escalates_only_unclear_segments(monkeypatch, tmp_path):
+    clip = tmp_path / "long.wav"
+    clip.write_bytes(b"fake")
+    sr = 16000
+    audio_array = np.zeros(sr * 28, dtype=np.float32)
+    audio_array[sr * 14:] = 1.0  # marks the second half
+
+    class SegmentPipeline(FakePipeline):
+        def transcribe(self, segment):
+            return {"text": "" if segment[-1] else "ধানের পাতায় বাদামি দাগ"}
+
+    pipelines = {
+        STT_TIER_SMALL: SegmentPipeline("", "openai/whisper-small"),
+        STT_TIER_LARGE: FakePipeline("দেখা যাচ্ছে কী করব", "openai/whisper-large-v2"),
+    }
+    monkeypatch.setattr(audio.librosa, "load", lambda path, sr: (audio_array, sr))
+    monkeypatch.setattr(audio, "init_stt_pipeline", lambda tier: pipelines[tier])
+    monkeypatch.setattr(audio, "select_stt_tier", lambda duration, depth: STT_TIER_SMALL)
+    monkeypatch.setattr(audio, "split_on_silence", lambda *a, **kw: [(0, sr * 14), (sr * 14, sr * 28)])
+
+    result = audio.transcribe_with_local_whisper(str(clip))
+
+    assert result["text"] == "ধানের পাতায় বাদামি দাগ দেখা যাচ্ছে কী করব"
+    assert result["stt_model_tier"] == STT_TIER_SMALL
+    assert result["stt_escalated_segments"] == 1
+    assert result["stt_chunks"] == 2
+    assert pipelines[STT_TIER_SMALL].calls == 1  # both chunks in one batched call
+    assert pipelines[STT_TIER_LARGE].calls == 1
+
+
+def test_segments_do_not_call_a_pipeline_concurrently(monkeypatch):
+    class ExclusivePipeline(FakePipeline):
+        active = 0
+        overlapped = False
+
+        def __call__(self, audio_array, batch_size=None):
+            ExclusivePipeline.active += 1
+            ExclusivePipeline.overlapped |= ExclusivePipeline.active > 1
+            time.sleep(0.05)
+            ExclusivePipeline.active -= 1
+            return super().__call__(audio_array, batch_size)
+
+    pipeline = ExclusivePipeline("ধানের পাতায় দাগ", "openai/whisper-large-v2")
+    monkeypatch.setattr(audio, "init_stt_pipeline", lambda tier: pipeline)
+    clip = np.zeros(16000 * 4, dtype=np.float32)
+    ranges = [(0, 32000), (32000, 64000)]
+
+    threads = [threading.Thread(target=audio._transcribe_segments, args=(clip, ranges, STT_TIER_LARGE)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pipeline.calls == 3
+    assert ExclusivePipeline.overlapped is False
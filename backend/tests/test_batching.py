@@ -0,0 +1,126 @@
+"""Unit tests for the dynamic batcher and the local classifier tier."""
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.core.batching import DynamicBatcher
+from app.services import image_fingerprint, local_classifier, vision_service
+from app.services.image_fingerprint import FingerprintCache
+from app.services.local_classifier import LocalClassifier
+from app.services.vision_service import VisionService
+
+
+def test_concurrent_requests_are_batched_up_to_max_size():
+    sizes = []
+    release = threading.Event()
+
+    def process(items):
+        sizes.append(len(items))
+        release.wait(1)
+        return [i * 2 for i in items]
+
+    batcher = DynamicBatcher(process, max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(10)]
+    release.set()
+
+    assert [f.result(2) for f in futures] == [i * 2 for i in range(10)]
+    assert max(sizes) == 4
+    assert sum(sizes) == 10
+    batcher.close()
+
+
+def test_lone_request_waits_at_most_max_wait():
+    batcher = DynamicBatcher(lambda items: items, max_batch_size=64, max_wait_ms=20)
+    start = time.perf_counter()
+    assert batcher.infer_sync("x", timeout=2) == "x"
+    assert time.perf_counter() - start < 0.5
+    batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_propagate_to_every_caller():
+    def process(items):
+        raise ValueError("model crashed")
+
+    batcher = DynamicBatcher(process, max_batch_size=8, max_wait_ms=20)
+    results = await asyncio.gather(batcher.infer(1), batcher.infer(2), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    batcher.close()
+
+
+class _FakeInput:
+    name = "pixel_values"
+    shape = ["batch", 3, 224, 224]
+
+
+class _FakeSession:
+    def __init__(self):
+        self.batches = []
+
+    def get_inputs(self):
+        return [_FakeInput()]
+
+    def run(self, outputs, feeds):
+        batch = feeds["pixel_values"]
+        self.batches.append(batch.shape[0])
+        logits = np.zeros((batch.shape[0], 3), dtype=np.float32)
+        logits[:, 1] = 6.0
+        return [logits]
+
+
+@pytest.mark.asyncio
+async def test_confident_local_answer_skips_remote_tiers(monkeypatch, tmp_path):
+    img = tmp_path / "leaf.jpg"
+    Image.new("RGB", (400, 300), (40, 120, 40)).save(img)
+    session = _FakeSession()
+    classifier = LocalClassifier(session, ["healthy", "Rice___Brown_spot", "Rice___Blast"], max_wait_ms=1)
+    async def loaded():
+        return classifier
+
+    monkeypatch.setattr(vision_service, "get_local_classifier_async", loaded)
+    monkeypatch.setattr(image_fingerprint, "_cache", FingerprintCache(db_path=None))
+
+    svc = VisionService()
+
+    async def remote(image_path, task):
+        raise AssertionError("remote tier should not be called")
+
+    monkeypatch.setattr(svc, "_tier1_huggingface_async", remote)
+    monkeypatch.setattr(svc, "_tier2_groq_vision_async", remote)
+
+    result = await svc.analyze_image_async(str(img), "disease")
+
+    assert "Tier 0" in result and "Rice___Brown_spot" in result
+    assert session.batches == [1]
+    classifier.close()
+
+
+def test_missing_model_disables_local_tier(monkeypatch, tmp_path):
+    monkeypatch.setattr(local_classifier, "LOCAL_VISION_MODEL_PATH", str(tmp_path / "none.onnx"))
+    monkeypatch.setattr(local_classifier, "_load_attempted", False)
+    monkeypatch.setattr(local_classifier, "_classifier", None)
+    assert local_classifier.get_local_classifier() is None
+
+
+@pytest.mark.asyncio
+async def test_async_getter_loads_the_model_off_the_event_loop(monkeypatch, tmp_path):
+    model = tmp_path / "model.onnx"
+    model.write_bytes(b"")
+    loaded_on = []
+
+    def fake_load(model_path):
+        loaded_on.append(threading.current_thread())
+        return "classifier"
+
+    monkeypatch.setattr(local_classifier, "LOCAL_VISION_MODEL_PATH", str(model))
+    monkeypatch.setattr(local_classifier, "_load_attempted", False)
+    monkeypatch.setattr(local_classifier, "_classifier", None)
+    monkeypatch.setattr(LocalClassifier, "load", staticmethod(fake_load))
+
+    assert await local_classifier.get_local_classifier_async() == "classifier"
+    assert await local_classifier.get_local_classifier_async() == "classifier"
+    assert loaded_on and loaded_on[0] is not threading.main_thread() and len(loaded_on) == 1
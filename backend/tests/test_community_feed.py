@@ -0,0 +1,72 @@
+"""Tests for keyset pagination of the community feed."""
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.community_service import PAGE_SIZE, decode_cursor, encode_cursor, list_posts
+
+
+def _post(i, upvotes=0):
+    return SimpleNamespace(
+        id=uuid.uuid4(), farmer_id_hashed="f", question_text=f"q{i}", crop_type="ধান", growth_stage=None,
+        district="বগুড়া", photo_url=None, lat=0.0, lon=0.0, status="pending", moderation_flag=False,
+        is_archived=False, admin_review_needed=False, ai_answer=None, ai_answer_generated_at=None,
+        upvotes_count=upvotes, answers_count=0, duplicate_of_id=None, hot_score=0.0,
+        created_at=datetime(2026, 10, 1) - timedelta(minutes=i), updated_at=None,
+    )
+
+
+class _Result:
+    def __init__(self, values):
+        self.values = values
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.values
+
+
+class RecordingSession:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Result(self.results.pop(0))
+
+
+def test_cursor_round_trip():
+    post = _post(3, upvotes=7)
+    assert decode_cursor(encode_cursor(post, "top"), "top") == [7, post.created_at, post.id]
+    assert decode_cursor(encode_cursor(post, "new"), "new") == [post.created_at, post.id]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(_post(1), "new")])
+def test_invalid_or_mismatched_cursor_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "top")
+
+
+@pytest.mark.asyncio
+async def test_page_uses_keyset_and_one_upvote_query():
+    posts = [_post(i) for i in range(PAGE_SIZE + 1)]
+    session = RecordingSession(posts, [posts[0].id, posts[5].id])
+
+    first = await list_posts(session, district="বগুড়া", sort="new", viewer_id="viewer")
+    assert first["has_more"] and len(first["posts"]) == PAGE_SIZE
+    assert [p["upvoted_by_me"] for p in first["posts"]].count(True) == 2
+    assert len(session.statements) == 2  # posts + upvotes, regardless of page size
+    assert " IN (" in session.statements[1]
+
+    session = RecordingSession([], [])
+    second = await list_posts(session, sort="new", viewer_id="viewer", cursor=first["next_cursor"])
+    assert second == {"posts": [], "page": 1, "has_more": False, "next_cursor": None}
+    posts_sql = session.statements[0]
+    assert "(community_questions.created_at, community_questions.id) < (" in posts_sql
+    assert "OFFSET" not in posts_sql
+    assert len(session.statements) == 1  # no upvote lookup for an empty page
@@ -0,0 +1,107 @@
+"""Tests for the stored time-decayed hot ranking."""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.models.community_models import CommunityQuestion
+from app.services.community_ranking import (
+    HOT_DECAY_HOURS,
+    hot_score,
+    recompute_hot_scores,
+    refresh_hot_score,
+)
+from app.services.community_service import toggle_question_upvote
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+def test_hot_score_trades_engagement_for_age():
+    assert hot_score(10, 0, NOW) > hot_score(2, 0, NOW)
+    assert hot_score(0, 1, NOW) > hot_score(1, 0, NOW)  # answers weigh more than upvotes
+    assert hot_score(5, 0, NOW) > hot_score(5, 0, NOW - timedelta(hours=1))
+    # A post one decay period older needs 10x the engagement to rank level
+    older = NOW - timedelta(hours=HOT_DECAY_HOURS)
+    assert hot_score(99, 0, older) == pytest.approx(hot_score(9, 0, NOW))
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self.value
+
+
+class _Session:
+    def __init__(self, *values):
+        self.values = list(values)
+        self.added = []
+
+    async def execute(self, stmt, params=None):
+        return _Result(self.values.pop(0))
+
+    def add(self, item):
+        self.added.append(item)
+
+    async def delete(self, item):
+        pass
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_upvote_updates_hot_score():
+    question = CommunityQuestion(id=uuid.uuid4(), upvotes_count=0, answers_count=0, created_at=NOW)
+    refresh_hot_score(question)
+    before = question.hot_score
+
+    await toggle_question_upvote(_Session(question, None), str(question.id), "farmer-1")
+    assert question.hot_score == hot_score(1, 0, NOW) > before
+
+
+@pytest.mark.asyncio
+async def test_recompute_hot_scores_writes_only_stale_rows(bare_schema):
+    await bare_schema.create(
+        CommunityQuestion, "id", "upvotes_count", "answers_count", "created_at", "hot_score", "updated_at"
+    )
+    async with bare_schema.engine.begin() as conn:
+        fresh = hot_score(4, 1, NOW)
+        await conn.execute(
+            text("INSERT INTO community_questions VALUES (:id, :up, :ans, :created, :hot, NULL)"),
+            [
+                {"id": uuid.uuid4().hex, "up": 4, "ans": 1, "created": "2026-10-19 12:00:00.000000", "hot": fresh},
+                {"id": uuid.uuid4().hex, "up": 7, "ans": 0, "created": "2026-10-18 12:00:00.000000", "hot": 0},
+                {"id": uuid.uuid4().hex, "up": None, "ans": None, "created": "2026-10-17 12:00:00.000000", "hot": 0},
+            ],
+        )
+    factory = bare_schema.session_factory
+
+    summary = await recompute_hot_scores(chunk_size=2, session_factory=factory)
+    assert summary["scanned"] == 3 and summary["changed"] == 2
+
+    async with factory() as session:
+        scores = (await session.execute(text("SELECT upvotes_count, hot_score FROM community_questions"))).all()
+    assert {up: hot for up, hot in scores}[7] == pytest.approx(hot_score(7, 0, NOW - timedelta(days=1)))
+
+
+def test_hot_feed_sort_is_keyset_on_stored_score():
+    from sqlalchemy import select, tuple_
+    from sqlalchemy.dialects import postgresql
+
+    from app.services.community_service import FEED_SORT_KEYS, decode_cursor, encode_cursor
+
+    question = CommunityQuestion(id=uuid.uuid4(), created_at=NOW, hot_score=812.5)
+    values = decode_cursor(encode_cursor(question, "hot"), "hot")
+    assert values[0] == 812.5
+    sql = str(
+        select(CommunityQuestion.id)
+        .where(tuple_(*FEED_SORT_KEYS["hot"]) < tuple_(*values))
+        .compile(dialect=postgresql.dialect())
+    )
+    assert "community_questions.hot_score" in sql
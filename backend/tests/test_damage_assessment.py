@@ -0,0 +1,57 @@
+"""Unit tests for batch damage assessment."""
+import base64
+import io
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services.damage_assessment import (
+    GREEN_LOWER,
+    GREEN_UPPER,
+    assess_damage_batch,
+    assess_damage_batch_async,
+    green_mask,
+    laplacian_variance,
+)
+
+
+def _b64(color, size=(640, 480), noise=0):
+    rng = np.random.default_rng(0)
+    arr = np.full((size[1], size[0], 3), color, dtype=np.int16)
+    if noise:
+        arr += rng.integers(-noise, noise, size=arr.shape, dtype=np.int16)
+    buf = io.BytesIO()
+    Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8)).save(buf, format="JPEG", quality=90)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def test_vectorized_kernels_match_opencv():
+    rng = np.random.default_rng(1)
+    batch = rng.integers(0, 256, size=(3, 64, 64, 3), dtype=np.uint8)
+    for i, rgb in enumerate(batch):
+        bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+        expected = cv2.inRange(cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV), np.array(GREEN_LOWER), np.array(GREEN_UPPER)) > 0
+        assert (green_mask(rgb) == expected).mean() > 0.99
+        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        assert laplacian_variance(batch)[i] == pytest.approx(cv2.Laplacian(gray, cv2.CV_64F).var(), rel=1e-3)
+
+
+def test_green_field_scores_lower_than_brown_field():
+    result = assess_damage_batch([_b64((40, 150, 40)), _b64((120, 80, 40), noise=40)])
+    green, brown = result["images"]
+    assert green["damage_percent"] < brown["damage_percent"]
+    assert green["green_loss_percent"] < 5
+    assert result["aggregate"]["count"] == 2
+    assert result["aggregate"]["max_damage_percent"] == brown["damage_percent"]
+
+
+@pytest.mark.asyncio
+async def test_undecodable_photos_are_reported_not_fatal():
+    result = await assess_damage_batch_async([_b64((40, 150, 40)), "not-an-image", _b64((40, 150, 40), size=(300, 800))])
+
+    assert "error" in result["images"][1]
+    assert result["aggregate"]["failed"] == 1
+    assert result["aggregate"]["count"] == 2
+    assert result["images"][0]["damage_percent"] == pytest.approx(result["images"][2]["damage_percent"], abs=1.0)
@@ -0,0 +1,110 @@
+"""Unit tests for the batched embedding service."""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.core.metrics import metrics
+from app.services import embedding_service
+
+
+class FakeModel:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeModel(delay=0.05)
+    monkeypatch.setattr(embedding_service, "_embedding_model", model)
+    monkeypatch.setattr(embedding_service, "_batcher", None)
+    monkeypatch.setattr(embedding_service, "_cache", embedding_service.EmbeddingCache(db_path=None))
+    monkeypatch.setattr(embedding_service, "EMBEDDING_MAX_BATCH", 8)
+    monkeypatch.setattr(embedding_service, "EMBEDDING_MAX_WAIT_MS", 20)
+    yield model
+    if embedding_service._batcher is not None:
+        embedding_service._batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_batches(fake_model):
+    texts = [f"question {'x' * i}" for i in range(20)]
+    vectors = await asyncio.gather(*(embedding_service.encode_text_async(t) for t in texts))
+
+    assert [v[0] for v in vectors] == [float(len(t)) for t in texts]
+    assert len(fake_model.calls) < len(texts)
+    assert max(len(c) for c in fake_model.calls) <= 8
+    assert metrics.snapshot()["summaries"]["embedding_queue_seconds"]["count"] >= len(texts)
+
+
+@pytest.mark.asyncio
+async def test_inference_does_not_block_the_event_loop(fake_model):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await embedding_service.encode_texts_async(["a", "bb", "ccc"])
+    task.cancel()
+
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_repeat_texts_skip_the_model(fake_model):
+    await embedding_service.encode_text_async("How do I treat rice blast?")
+    again = await embedding_service.encode_text_async("  how do I   treat RICE blast? ")
+    batch = embedding_service.encode_texts(["How do I treat rice blast?", "new question"])
+
+    assert fake_model.calls == [["How do I treat rice blast?"], ["new question"]]
+    assert np.array_equal(again, batch[0])
+
+
+def test_persistent_tier_stores_float16(tmp_path, monkeypatch):
+    db = str(tmp_path / "emb.sqlite3")
+    model = FakeModel()
+    monkeypatch.setattr(embedding_service, "_embedding_model", model)
+    monkeypatch.setattr(embedding_service, "_cache", embedding_service.EmbeddingCache(db_path=db))
+    first = embedding_service.encode_text("ধানের পাতা হলুদ")
+
+    monkeypatch.setattr(embedding_service, "_cache", embedding_service.EmbeddingCache(db_path=db))
+    second = embedding_service.encode_text("ধানের পাতা হলুদ")
+
+    assert len(model.calls) == 1
+    assert np.allclose(first, second, rtol=1e-3)
+    blob = embedding_service._cache._db.query("SELECT vector FROM embeddings")[0][0]
+    assert len(blob) == first.size * 2
+
+
+def test_uncached_encoding_leaves_the_cache_untouched(tmp_path, monkeypatch):
+    model = FakeModel()
+    cache = embedding_service.EmbeddingCache(db_path=str(tmp_path / "emb.sqlite3"))
+    monkeypatch.setattr(embedding_service, "_embedding_model", model)
+    monkeypatch.setattr(embedding_service, "_cache", cache)
+
+    vectors = embedding_service.encode_texts(["ধানের পাতা হলুদ", "আলুর দাগ"], use_cache=False)
+
+    assert vectors.shape == (2, 2) and vectors.dtype == np.float32
+    assert cache.get_many([embedding_service.cache_key("ধানের পাতা হলুদ")]) == {}
+    assert cache._db.query("SELECT count(*) FROM embeddings")[0][0] == 0
+
+
+def test_empty_input_keeps_the_embedding_dimension(monkeypatch):
+    monkeypatch.setattr(embedding_service, "_embedding_model", FakeModel())
+    for use_cache in (True, False):
+        vectors = embedding_service.encode_texts([], use_cache=use_cache)
+        assert vectors.shape == (0, 2) and vectors.dtype == np.float32
@@ -0,0 +1,104 @@
+"""Tests for hybrid (keyword + semantic) community question search."""
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+from app.models.community_models import CommunityQuestion
+from app.services import community_service
+from app.services.community_service import reciprocal_rank_fusion, search_community_questions
+from app.utils.text_search import ensure_lexical_index, lexical_ranking, tokenize
+
+
+def test_tokenize_keeps_bengali_words_whole():
+    assert tokenize("ধানের পাতায় বাদামি দাগ, Tricyclazole দেব?") == [
+        "ধানের", "পাতায়", "বাদামি", "দাগ", "tricyclazole", "দেব",
+    ]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    scores = reciprocal_rank_fusion(["a", "b", "c"], ["c", "d"], k=60)
+    assert max(scores, key=scores.get) == "c"
+    assert scores["a"] == pytest.approx(1 / 61)
+
+
+@pytest_asyncio.fixture
+async def fts_session(bare_schema):
+    """Bare community_questions table with the FTS index."""
+    await bare_schema.create(CommunityQuestion, "id", "question_text", "crop_type", "district")
+    async with bare_schema.engine.begin() as conn:
+        await conn.execute(text("INSERT INTO community_questions VALUES ('q1', :t, 'ধান', 'বগুড়া')"), {"t": QUESTIONS[0]})
+        await conn.run_sync(ensure_lexical_index)  # backfills existing rows
+        await conn.execute(
+            text("INSERT INTO community_questions VALUES (:id, :t, :crop, :district)"),
+            [{"id": "q2", "t": QUESTIONS[1], "crop": "আলু", "district": "বগুড়া"},
+             {"id": "q3", "t": QUESTIONS[2], "crop": "ধান", "district": "রংপুর"}],
+        )
+    async with bare_schema.session_factory() as session:
+        yield session
+
+
+QUESTIONS = [
+    "ধানের পাতায় বাদামি দাগ, Tricyclazole দেব?",
+    "আলুর নাবি ধসা রোগে কী স্প্রে করব?",
+    "Tricyclazole dose for rice blast",
+]
+
+
+def _row(key, similarity=None):
+    return {
+        "id": key, "question_text": QUESTIONS[int(key[1]) - 1], "crop_type": "ধান", "growth_stage": None,
+        "district": "বগুড়া", "status": "pending", "created_at": datetime(2026, 10, 1), "similarity": similarity,
+    }
+
+
+@pytest.mark.asyncio
+async def test_lexical_ranking_matches_exact_terms_with_filters(fts_session):
+    ranked = await lexical_ranking(fts_session, "tricyclazole", limit=10)
+    assert {key for key, _ in ranked} == {"q1", "q3"}
+
+    ranked = await lexical_ranking(fts_session, "Tricyclazole পাতায়", limit=10, filters={"district": "বগুড়া"})
+    assert [key for key, _ in ranked] == ["q1"]
+    assert ranked[0][1] > 0
+
+    await fts_session.execute(text("DELETE FROM community_questions WHERE id = 'q1'"))
+    assert await lexical_ranking(fts_session, "পাতায়") == []
+
+
+@pytest.mark.asyncio
+async def test_semantic_leg_dropped_when_over_budget(monkeypatch):
+    async def keyword(session, query, limit, filters=None):
+        return [_row("q2")]
+
+    async def slow_semantic(query, limit, filters):
+        await asyncio.sleep(1)
+        return [_row("q1", 0.9)]
+
+    monkeypatch.setattr(community_service, "lexical_search", keyword)
+    monkeypatch.setattr(community_service, "_semantic_leg", slow_semantic)
+    results = await search_community_questions(None, "আলুর নাবি ধসা", limit=5, budget_ms=50)
+    assert [r["id"] for r in results] == ["q2"]
+    assert results[0]["similarity"] is None
+
+
+@pytest.mark.asyncio
+async def test_hybrid_fuses_both_legs_with_filters(monkeypatch):
+    seen = {}
+
+    async def keyword(session, query, limit, filters=None):
+        seen["lexical"] = filters
+        return [_row("q1"), _row("q3")]
+
+    async def semantic(query, limit, filters):
+        seen["semantic"] = filters
+        return [_row("q3", 0.9), _row("q2", 0.7)]
+
+    monkeypatch.setattr(community_service, "lexical_search", keyword)
+    monkeypatch.setattr(community_service, "_semantic_leg", semantic)
+    results = await search_community_questions(None, "rice blast Tricyclazole", limit=5, crop_type="ধান")
+    assert seen == {"lexical": {"crop_type": "ধান"}, "semantic": {"crop_type": "ধান"}}
+    assert [r["id"] for r in results][0] == "q3"
+    assert {r["id"] for r in results} == {"q1", "q2", "q3"}
+    assert results[0]["similarity"] == 0.9
@@ -0,0 +1,86 @@
+"""Unit tests for the perceptual-hash diagnosis cache."""
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services import image_fingerprint
+from app.services.image_fingerprint import FingerprintCache, dhash, hamming
+from app.services.vision_service import VisionService
+
+
+def _photo(path, seed=0, brightness=0, size=(640, 480)):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 200, size=(12, 16, 3), dtype=np.uint8)
+    img = Image.fromarray(base).resize(size, Image.BILINEAR)
+    arr = np.clip(np.asarray(img, dtype=np.int16) + brightness, 0, 255).astype(np.uint8)
+    Image.fromarray(arr).save(path, quality=90)
+    return str(path)
+
+
+def test_near_duplicate_hits_and_distinct_image_misses(tmp_path):
+    cache = FingerprintCache(db_path=None)
+    original = dhash(_photo(tmp_path / "a.jpg", seed=1))
+    # Same scene, re-encoded smaller and slightly brighter
+    near = dhash(_photo(tmp_path / "b.jpg", seed=1, brightness=12, size=(320, 240)))
+    other = dhash(_photo(tmp_path / "c.jpg", seed=2))
+    assert hamming(original, near) <= cache.max_distance
+
+    cache.put("vision:disease", original, "leaf blight")
+    assert cache.get("vision:disease", near) == "leaf blight"
+    assert cache.get("vision:disease", other) is None
+    assert cache.get("vision:soil", near) is None
+
+
+def test_persistent_tier_survives_restart(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    FingerprintCache(db_path=db).put("soil_service", 0x0F0F0F0F0F0F0F0F, "loamy")
+
+    fresh = FingerprintCache(db_path=db)
+    assert fresh.get("soil_service", 0x0F0F0F0F0F0F0F0E) == "loamy"
+
+
+def test_lru_is_bounded(tmp_path):
+    cache = FingerprintCache(db_path=None, max_entries=2, max_distance=0)
+    cache.put("ns", 1, "a")
+    cache.put("ns", 2, "b")
+    cache.get("ns", 1)
+    cache.put("ns", 4, "c")
+
+    assert cache.get("ns", 1) == "a"
+    assert cache.get("ns", 2) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_model_tiers(monkeypatch, tmp_path):
+    monkeypatch.setattr(image_fingerprint, "_cache", FingerprintCache(db_path=None))
+    svc = VisionService()
+    calls = []
+
+    async def hf(image_path, task):
+        calls.append(image_path)
+        return "[Tier 1 — HuggingFace] Tomato___Late_blight: 91.0%"
+
+    async def groq(image_path, task):
+        return None
+
+    monkeypatch.setattr(svc, "_tier1_huggingface_async", hf)
+    monkeypatch.setattr(svc, "_tier2_groq_vision_async", groq)
+
+    first = await svc.analyze_image_async(_photo(tmp_path / "a.jpg", seed=3), "disease")
+    second = await svc.analyze_image_async(_photo(tmp_path / "b.jpg", seed=3, brightness=8), "disease")
+
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_persistent_tier_is_bounded_by_age_and_size(tmp_path):
+    cache = FingerprintCache(db_path=str(tmp_path / "cache.sqlite3"), db_max_entries=2, ttl_days=1)
+    for h in (1, 2, 3):
+        cache.put("ns", h << 32, str(h))
+    cache.prune()
+    assert [r[0] for r in cache._db.query("SELECT result FROM image_fingerprints ORDER BY created")] == ["2", "3"]
+
+    cache.prune(now=time.time() + 2 * 86400)
+    assert cache._db.query("SELECT count(*) FROM image_fingerprints") == [(0,)]
@@ -0,0 +1,146 @@
+"""Unit tests for image ingestion and size variants."""
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image, JpegImagePlugin
+
+from app import storage
+from app.services import image_processing
+
+
+def _jpeg_with_orientation(path, size=(2400, 1600), orientation=6):
+    img = Image.new("RGB", size, (30, 120, 40))
+    exif = Image.Exif()
+    exif[0x0112] = orientation  # rotate 90 CW on display
+    img.save(path, format="JPEG", exif=exif.tobytes())
+
+
+def test_process_image_file_writes_upright_main_and_webp_variants(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "_file_store", storage.FileStore(str(tmp_path / "store")))
+    src = tmp_path / "photo.jpg"
+    _jpeg_with_orientation(src)
+    digest = "ab" * 32
+
+    result = image_processing.process_image_file(str(src), digest, ".jpg")
+
+    with Image.open(result["path"]) as main:
+        assert main.format == "JPEG"
+        assert main.size == (683, 1024)  # portrait after applying EXIF orientation
+    for size, path in result["variants"].items():
+        with Image.open(path) as variant:
+            assert variant.format == "WEBP"
+            assert max(variant.size) == size
+    assert image_processing.find_variant(result["path"], 300) == result["variants"][512]
+    assert image_processing.find_variant(os.path.basename(result["path"])) == result["path"]
+
+
+def test_load_oriented_uses_jpeg_draft_decoding(monkeypatch, tmp_path):
+    src = tmp_path / "big.jpg"
+    Image.new("RGB", (4000, 3000)).save(src, format="JPEG")
+    decoded_sizes = []
+    original_load = JpegImagePlugin.JpegImageFile.load
+
+    def recording_load(self):
+        decoded_sizes.append(self.size)  # the size libjpeg actually decodes at
+        return original_load(self)
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "load", recording_load)
+    img = image_processing.load_oriented(str(src), max_side=256)
+
+    assert max(img.size) == 256
+    assert decoded_sizes and max(decoded_sizes[0]) <= 500  # 1/8 scale, never the full 4000 px
+
+
+def test_reupload_skips_decoding(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "_file_store", storage.FileStore(str(tmp_path / "store")))
+    src = tmp_path / "leaf.png"
+    Image.new("RGB", (600, 400)).save(src, format="PNG")
+    first = image_processing.process_image_file(str(src), "cd" * 32, ".png")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not decode again")
+
+    monkeypatch.setattr(image_processing, "load_oriented", fail)
+    assert image_processing.process_image_file(str(src), "cd" * 32, ".png")["path"] == first["path"]
+
+
+def test_image_url_points_stored_images_at_variants(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "_file_store", storage.FileStore(str(tmp_path / "store")))
+    src = tmp_path / "leaf.png"
+    Image.new("RGB", (600, 400)).save(src, format="PNG")
+    stored = image_processing.process_image_file(str(src), "ef" * 32, ".png")["path"]
+
+    url = image_processing.image_url(stored)
+    assert url == f"/api/images/{'ef' * 32}.png"
+    assert image_processing.image_url(url, 512) == f"{url}?size=512"
+    assert image_processing.image_url("https://cdn.example.com/p.jpg", 512) == "https://cdn.example.com/p.jpg"
+    assert image_processing.image_url(None) is None
+
+
+class _Upload:
+    def __init__(self, data, filename="bomb.png"):
+        self._data = io.BytesIO(data)
+        self.filename = filename
+        self.size = len(data)
+
+    async def read(self, size=-1):
+        return self._data.read(size)
+
+
+@pytest.mark.asyncio
+async def test_decompression_bomb_is_rejected_with_413(monkeypatch, tmp_path):
+    from app.api import utils
+
+    monkeypatch.setattr(storage, "_file_store", storage.FileStore(str(tmp_path / "store")))
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)  # 2x this raises DecompressionBombError
+    buf = io.BytesIO()
+    Image.new("RGB", (200, 200)).save(buf, format="PNG")
+
+    with pytest.raises(HTTPException) as exc:
+        await utils.save_image_local(_Upload(buf.getvalue()))
+    assert exc.value.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_damage_report_photos_are_stored_as_variants(monkeypatch, tmp_path):
+    import base64
+
+    from app.services.emergency_service import _store_report_photo
+
+    monkeypatch.setattr(storage, "_file_store", storage.FileStore(str(tmp_path / "store")))
+    buf = io.BytesIO()
+    Image.new("RGB", (1600, 1200), (90, 60, 20)).save(buf, format="JPEG")
+
+    path = await _store_report_photo("data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode())
+    assert image_processing.find_variant(path, 256).endswith("_256.webp")
+    assert await _store_report_photo("not an image") is None
+
+
+@pytest.mark.asyncio
+async def test_report_photos_are_stored_and_assessed_from_one_decode(monkeypatch, tmp_path):
+    import base64
+
+    from app.services import emergency_service
+    from app.services.damage_assessment import assess_damage_batch_async
+
+    monkeypatch.setattr(storage, "_file_store", storage.FileStore(str(tmp_path / "store")))
+    photos = []
+    for color in ((40, 150, 40), (120, 80, 40)):
+        buf = io.BytesIO()
+        Image.new("RGB", (1600, 1200), color).save(buf, format="JPEG")
+        photos.append(base64.b64encode(buf.getvalue()).decode())
+    expected = await assess_damage_batch_async(photos + ["not an image"])
+
+    decodes = []
+    original = emergency_service.load_oriented
+    monkeypatch.setattr(emergency_service, "load_oriented", lambda *a: decodes.append(1) or original(*a))
+    paths, assessment = await emergency_service.ingest_report_photos(photos + ["not an image"])
+
+    assert len(decodes) == 2  # one per valid photo, shared by storage and scoring
+    assert all(image_processing.find_variant(p, 256).endswith("_256.webp") for p in paths[:2])
+    assert paths[2] is None
+    assert assessment["aggregate"]["failed"] == 1
+    for got, want in zip(assessment["images"][:2], expected["images"][:2]):
+        assert got["damage_percent"] == pytest.approx(want["damage_percent"], abs=1.0)
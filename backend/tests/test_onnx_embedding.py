@@ -0,0 +1,59 @@
+"""Unit tests for the ONNX embedding backend."""
+from types import SimpleNamespace
+
+import numpy as np
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+from app.services.onnx_embedding import OnnxEmbeddingModel, cosine_agreement, mean_pool
+
+VOCAB = {"<pad>": 0, "<unk>": 1, "rice": 2, "blast": 3, "ধান": 4, "দাগ": 5}
+
+
+class FakeSession:
+    """Hidden state of token t is the one-hot vector of its id."""
+
+    def __init__(self):
+        self.batches = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, outputs, feeds):
+        ids = feeds["input_ids"]
+        self.batches.append(ids.shape)
+        return [np.eye(len(VOCAB), dtype=np.float32)[ids]]
+
+
+def _tokenizer():
+    tokenizer = Tokenizer(WordLevel(VOCAB, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = Whitespace()
+    return tokenizer
+
+
+def test_mean_pool_ignores_padding():
+    hidden = np.array([[[1.0, 0.0], [3.0, 2.0], [100.0, 100.0]]])
+    mask = np.array([[1, 1, 0]])
+    np.testing.assert_allclose(mean_pool(hidden, mask), [[2.0, 1.0]])
+
+
+def test_encode_matches_unbatched_and_keeps_order():
+    session = FakeSession()
+    model = OnnxEmbeddingModel(session, _tokenizer(), max_length=3, batch_size=2)
+    texts = ["rice blast rice blast", "ধান", "ধান দাগ", "unknown"]
+
+    vectors = model.encode(texts)
+
+    assert vectors.shape == (4, len(VOCAB))
+    np.testing.assert_allclose(vectors[0][[2, 3]], [2 / 3, 1 / 3])  # truncated to 3 tokens
+    np.testing.assert_allclose(vectors[1][4], 1.0)  # padding in its batch is not averaged in
+    np.testing.assert_allclose(vectors[2][[4, 5]], [0.5, 0.5])
+    np.testing.assert_allclose(vectors[3][1], 1.0)
+    assert len(session.batches) == 2
+
+
+def test_cosine_agreement():
+    a = np.array([[1.0, 0.0], [1.0, 1.0]])
+    b = np.array([[2.0, 0.0], [1.0, -1.0]])
+    np.testing.assert_allclose(cosine_agreement(a, b), [1.0, 0.0], atol=1e-6)
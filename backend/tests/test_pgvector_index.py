@@ -0,0 +1,47 @@
+"""Unit tests for pgvector index DDL and query-time settings."""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.community_models import CommunityQuestion
+from app.utils.pgvector_index import index_ddl, ivfflat_lists, search_settings
+from app.utils.vector_utils import _exact_similarity_stmt
+
+
+def test_hnsw_ddl_uses_cosine_ops():
+    ddl = index_ddl("community_questions", "embedding", "idx_q", kind="hnsw", m=24, ef_construction=100)
+    assert "USING hnsw (embedding vector_cosine_ops)" in ddl
+    assert "WITH (m = 24, ef_construction = 100)" in ddl
+    assert "CONCURRENTLY" not in ddl
+
+
+def test_ivfflat_lists_follow_row_count():
+    assert ivfflat_lists(0) == 10
+    assert ivfflat_lists(250_000) == 250
+    assert ivfflat_lists(4_000_000) == 2000
+    ddl = index_ddl("t", "embedding", "idx_t", kind="ivfflat", rows=250_000, concurrently=True)
+    assert ddl.startswith("CREATE INDEX CONCURRENTLY")
+    assert "USING ivfflat (embedding vector_cosine_ops) WITH (lists = 250)" in ddl
+
+
+def test_unknown_index_type_rejected():
+    with pytest.raises(ValueError):
+        index_ddl("t", "embedding", "idx_t", kind="flat")
+
+
+def test_search_settings_never_below_limit():
+    statements = search_settings(ef_search=10, probes=7, limit=25)
+    assert statements == ["SET LOCAL hnsw.ef_search = 25", "SET LOCAL ivfflat.probes = 7"]
+
+
+def test_exact_scan_filters_in_sql_and_bypasses_the_ann_index():
+    table = CommunityQuestion.__table__
+    stmt = _exact_similarity_stmt(
+        table, table.c.embedding, [0.1] * 384, {"district": "Bogura", "status": "answered"},
+        threshold=0.8, limit=1, columns=("id", "duplicate_of_id"),
+    )
+    sql = " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+
+    assert "community_questions.district = " in sql and "community_questions.status = " in sql
+    assert "(community_questions.embedding <=> %(embedding_1)s) <= " in sql
+    assert "ORDER BY (community_questions.embedding <=> %(embedding_1)s) + " in sql
+    assert " LIMIT " in sql
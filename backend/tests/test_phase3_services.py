@@ -1,16 +1,21 @@
 """Unit tests for Phase 3 backend services."""
 import pytest
 import asyncio
+import uuid
+from types import SimpleNamespace
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
 from app.services.community_service import (
     create_community_question,
+    find_answered_duplicate,
+    get_thread_answer,
     search_community_questions,
 )
 from app.services.marketplace_service import scan_product
 from app.services.emergency_service import submit_claim
 from app.services.ocr_service import parse_label_text
+from app.services.product_index import get_product_index
 
 
 class DummyResult:
@@ -54,8 +59,10 @@ class DummySession:
 
 
 class DummyProduct:
-    def __init__(self, product_id: str, expiry_date=None):
+    def __init__(self, product_id: str, expiry_date=None, barcode=None, qr_code=None):
         self.id = product_id
+        self.barcode = barcode
+        self.qr_code = qr_code
         self.expiry_date = expiry_date or (datetime.utcnow().date() + timedelta(days=30))
 
 
@@ -99,12 +106,12 @@ async def test_create_community_question_commits_and_refreshes(monkeypatch):
     async def fake_refresh(item):
         question_created.append(item)
 
-    def fake_encode_text(text):
+    async def fake_encode_text(text):
         return [0.1] * 384
 
     dummy_session.commit = fake_commit
     dummy_session.refresh = fake_refresh
-    monkeypatch.setattr("app.services.community_service.encode_text", fake_encode_text)
+    monkeypatch.setattr("app.services.community_service.encode_text_async", fake_encode_text)
 
     question = await create_community_question(
         dummy_session,
@@ -125,6 +132,100 @@ async def test_create_community_question_commits_and_refreshes(monkeypatch):
     assert question.embedding == [0.1] * 384
 
 
+@pytest.mark.asyncio
+async def test_create_community_question_links_answered_duplicate(monkeypatch):
+    existing_id = uuid.uuid4()
+    seen = {}
+
+    async def fake_encode_text(text):
+        return [0.1] * 384
+
+    async def fake_similarity(table, column, embedding, filters, threshold, limit, columns):
+        seen["filters"] = filters
+        return [{"id": existing_id, "duplicate_of_id": None, "similarity": 0.97}]
+
+    monkeypatch.setattr("app.services.community_service.encode_text_async", fake_encode_text)
+    monkeypatch.setattr("app.services.community_service.exact_vector_similarity", fake_similarity)
+
+    question = await create_community_question(
+        DummySession(),
+        farmer_id_hashed="farmer-2",
+        question_text="ধানের পাতায় বাদামি দাগ",
+        crop_type="ধান",
+        growth_stage=None,
+        lat=24.8,
+        lon=89.3,
+        district="বগুড়া",
+    )
+    assert question.duplicate_of_id == existing_id
+    assert question.status == "answered"
+    assert seen["filters"] == {"district": "বগুড়া", "crop_type": "ধান", "status": "answered", "is_archived": False}
+
+
+@pytest.mark.asyncio
+async def test_find_answered_duplicate_resolves_thread_root(monkeypatch):
+    root_id = uuid.uuid4()
+
+    async def fake_similarity(table, column, embedding, filters, threshold, limit, columns):
+        return [{"id": uuid.uuid4(), "duplicate_of_id": root_id, "similarity": 0.95}]
+
+    monkeypatch.setattr("app.services.community_service.exact_vector_similarity", fake_similarity)
+    assert (await find_answered_duplicate([0.1] * 384, "বগুড়া", "ধান"))["id"] == root_id
+    assert await find_answered_duplicate([0.1] * 384, None, "ধান") is None
+
+
+@pytest.mark.asyncio
+async def test_find_answered_duplicate_is_not_crowded_out_by_other_districts(monkeypatch, bare_schema):
+    from functools import partial
+
+    import numpy as np
+    from sqlalchemy import text
+
+    from app.models.community_models import CommunityQuestion
+    from app.utils import vector_utils
+
+    rng = np.random.default_rng(7)
+    query = rng.standard_normal(384)
+    local_id = uuid.uuid4()
+    # Ten other districts asked the same seasonal question almost verbatim
+    rows = [(uuid.uuid4(), f"district-{i}", query + 0.01 * rng.standard_normal(384)) for i in range(10)]
+    rows.append((local_id, "বগুড়া", query + 0.2 * rng.standard_normal(384)))
+    await bare_schema.create(
+        CommunityQuestion, "id", "district", "crop_type", "status", "is_archived", "duplicate_of_id", "embedding"
+    )
+    async with bare_schema.engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO community_questions VALUES (:id, :d, 'ধান', 'answered', 0, NULL, :e)"),
+            [{"id": i.hex, "d": d, "e": "[" + ",".join(map(str, v)) + "]"} for i, d, v in rows],
+        )
+    monkeypatch.setattr(
+        "app.services.community_service.exact_vector_similarity",
+        partial(vector_utils.exact_vector_similarity, session_factory=bare_schema.session_factory),
+    )
+
+    match = await find_answered_duplicate(query.tolist(), "বগুড়া", "ধান", threshold=0.9)
+    assert match["id"] == local_id and match["similarity"] > 0.9
+
+
+@pytest.mark.asyncio
+async def test_get_thread_answer_prefers_expert_then_ai():
+    thread = SimpleNamespace(id=uuid.uuid4(), question_text="q", ai_answer="AI says spray")
+    expert = SimpleNamespace(
+        id=uuid.uuid4(), question_id=thread.id, answerer_id="e1", answerer_name="Officer",
+        answerer_credentials=None, answer_text="Expert says spray", is_expert_answer=True,
+        is_verified=False, created_at=None, verified_at=None,
+    )
+    farmer = SimpleNamespace(**{**vars(expert), "is_expert_answer": False, "answer_text": "Farmer reply"})
+
+    answer = await get_thread_answer(DummySession([DummyResult(thread), DummyResult(expert)]), thread.id)
+    assert (answer["source"], answer["answer_text"]) == ("expert", "Expert says spray")
+
+    answer = await get_thread_answer(DummySession([DummyResult(thread), DummyResult(farmer)]), thread.id)
+    assert (answer["source"], answer["answer_text"]) == ("ai", "AI says spray")
+
+    assert await get_thread_answer(DummySession(), thread.id) is None
+
+
 @pytest.mark.asyncio
 async def test_search_community_questions_returns_semantic_matches(monkeypatch):
     dummy_rows = [
@@ -139,11 +240,18 @@ async def test_search_community_questions_returns_semantic_matches(monkeypatch):
         }
     ]
 
-    async def mock_query_vector_similarity(table, column, embedding, threshold, limit):
+    async def mock_query_vector_similarity(table, column, embedding, threshold, limit, filters=None):
         return dummy_rows
 
-    monkeypatch.setattr("app.services.community_service.encode_text", lambda q: [0.04] * 384)
+    async def fake_encode_text(q):
+        return [0.04] * 384
+
+    async def no_keyword_matches(session, query, limit, filters=None):
+        return []
+
+    monkeypatch.setattr("app.services.community_service.encode_text_async", fake_encode_text)
     monkeypatch.setattr("app.services.community_service.query_vector_similarity", mock_query_vector_similarity)
+    monkeypatch.setattr("app.services.community_service.lexical_search", no_keyword_matches)
 
     results = await search_community_questions(None, "tomato blight")
     assert len(results) == 1
@@ -153,8 +261,9 @@ async def test_search_community_questions_returns_semantic_matches(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_scan_product_returns_verified_for_known_barcode(monkeypatch):
-    dummy_product = DummyProduct("verified-123")
-    session = DummySession([DummyResult(dummy_product)])
+    dummy_product = DummyProduct("verified-123", barcode="12345")
+    session = DummySession([DummyResult(all_values=[dummy_product])])
+    get_product_index().invalidate()
     monkeypatch.setattr("app.services.barcode_service.decode_barcode_base64", lambda image: "12345")
 
     result = await scan_product(
@@ -0,0 +1,85 @@
+"""Tests for the resumable bulk re-embedding job."""
+import json
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from app.models.community_models import CommunityQuestion
+from app.services import reembed_service
+from app.services.reembed_service import reembed_questions
+
+
+async def _seed(schema, rows):
+    """Bare community_questions table seeded with ``rows``; returns the session factory."""
+    await schema.create(CommunityQuestion, "id", "question_text", "embedding", "updated_at")
+    async with schema.engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO community_questions VALUES (:id, :t, :e, :u)"),
+            [{"id": i, "t": t, "e": e, "u": "2026-01-01 00:00:00.000000"} for i, t, e in rows],
+        )
+    return schema.session_factory
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    calls = []
+
+    def encode(texts, use_cache=True):
+        assert use_cache is False  # bulk jobs bypass the embedding cache
+        calls.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+    monkeypatch.setattr(reembed_service, "encode_texts", encode)
+    # Keep the process-wide local vector index out of these tests
+    monkeypatch.setattr(reembed_service, "index_vectors", lambda table, column, ids, vectors: indexed.extend(ids))
+    indexed = []
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_missing_mode_resumes_from_checkpoint(tmp_path, fake_encoder, bare_schema):
+    ids = sorted(uuid.uuid4().hex for _ in range(5))
+    rows = [(ids[0], "a", "[0.5,0.5]"), (ids[1], "bb", None), (ids[2], "ccc", None),
+            (ids[3], "dddd", "[0.5,0.5]"), (ids[4], "eeeee", None)]
+    factory = await _seed(bare_schema, rows)
+    checkpoint = str(tmp_path / "checkpoint.json")
+
+    first = await reembed_questions(chunk_size=2, pause_s=0, checkpoint_path=checkpoint, max_rows=2,
+                                    session_factory=factory)
+    assert first["processed"] == 2 and not first["done"]
+    saved = json.loads(open(checkpoint).read())
+    assert saved["last_id"] == ids[2] and saved["processed"] == 2
+
+    second = await reembed_questions(chunk_size=2, pause_s=0, checkpoint_path=checkpoint, session_factory=factory)
+    assert second["processed"] == 1 and second["total_processed"] == 3 and second["done"]
+    assert fake_encoder == [["bb", "ccc"], ["eeeee"]]
+
+    async with factory() as session:
+        result = await session.execute(text("SELECT id, embedding, updated_at FROM community_questions ORDER BY id"))
+        stored = {row[0]: (row[1], row[2]) for row in result}
+    assert stored[ids[4]][0] == "[5.0,1.0]"
+    assert stored[ids[0]][0] == "[0.5,0.5]"  # already embedded rows are untouched
+    assert stored[ids[4]][1] == "2026-01-01 00:00:00.000000"
+
+
+@pytest.mark.asyncio
+async def test_all_mode_restarts_when_model_changes(tmp_path, fake_encoder, monkeypatch, bare_schema):
+    rows = [(uuid.uuid4().hex, f"q{i}", "[0.5,0.5]") for i in range(3)]
+    factory = await _seed(bare_schema, rows)
+    checkpoint = str(tmp_path / "checkpoint.json")
+    json.dump({"model": "old-model", "mode": "all", "last_id": max(r[0] for r in rows), "processed": 3,
+               "started_at": datetime.utcnow().isoformat(), "done": False}, open(checkpoint, "w"))
+
+    summary = await reembed_questions(mode="all", chunk_size=10, pause_s=0, checkpoint_path=checkpoint,
+                                      session_factory=factory)
+    assert summary["processed"] == 3 and summary["done"]
+    assert summary["rows_per_second"] > 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        await reembed_questions(mode="stale")
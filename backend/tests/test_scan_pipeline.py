@@ -0,0 +1,135 @@
+"""Unit tests for the scan pipeline: barcode decoding and the product index."""
+import io
+from datetime import date, timedelta
+
+import pytest
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.marketplace_models import VerifiedProduct
+from app.services import barcode_service, marketplace_service
+from app.services.product_index import ProductIndex, get_product_index
+
+
+class _Result:
+    def __init__(self, values):
+        self._values = values
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._values
+
+
+class _Session:
+    def __init__(self, products):
+        self.products = products
+        self.queries = 0
+        self.added = []
+
+    async def execute(self, stmt, params=None):
+        self.queries += 1
+        return _Result(self.products)
+
+    def add(self, item):
+        self.added.append(item)
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, item):
+        pass
+
+
+class _Product:
+    def __init__(self, product_id, barcode, qr_code=None, expiry_date=None):
+        self.id = product_id
+        self.barcode = barcode
+        self.qr_code = qr_code
+        self.expiry_date = expiry_date or date.today() + timedelta(days=90)
+
+
+@pytest.mark.asyncio
+async def test_index_serves_repeat_lookups_without_queries():
+    index = ProductIndex(ttl_s=60)
+    session = _Session([_Product("p1", "8901234", qr_code="https://verify/p1"), _Product("p2", "8905678")])
+
+    assert (await index.lookup(session, barcode="8901234")).id == "p1"
+    assert (await index.lookup(session, qr_text="https://verify/p1")).id == "p1"
+    assert await index.lookup(session, barcode="0000") is None
+    assert session.queries == 1
+
+    index.invalidate()
+    session.products.append(_Product("p3", "0000"))
+    assert (await index.lookup(session, barcode="0000")).id == "p3"
+    assert session.queries == 2
+
+
+@pytest.mark.asyncio
+async def test_index_is_invalidated_on_commit_not_on_rolled_back_flush(bare_schema):
+    await bare_schema.create(VerifiedProduct)
+    index = get_product_index()
+
+    def product(barcode):
+        return VerifiedProduct(
+            barcode=barcode, product_name="Urea", manufacturer="ACI",
+            batch_number="B1", expiry_date=date.today() + timedelta(days=90),
+        )
+
+    async with AsyncSession(bare_schema.engine) as session:
+        await index.refresh(session)
+        session.add(product("111"))
+        await session.flush()
+        assert not index.stale  # not committed yet
+        await session.rollback()
+        assert not index.stale
+
+        session.add(product("222"))
+        await session.commit()
+        assert index.stale
+        assert (await index.lookup(session, barcode="222")) is not None
+        assert await index.lookup(session, barcode="111") is None
+
+
+@pytest.mark.asyncio
+async def test_ocr_runs_only_without_registered_code(monkeypatch):
+    index = ProductIndex(ttl_s=60)
+    monkeypatch.setattr(marketplace_service, "get_product_index", lambda: index)
+    ocr_calls = []
+
+    async def fake_decode(image_base64):
+        return "8901234"
+
+    async def fake_ocr(image_base64):
+        ocr_calls.append(image_base64)
+        return "Urea Fertilizer 46%\nNPK 46-0-0"
+
+    monkeypatch.setattr(marketplace_service, "decode_barcode_async", fake_decode)
+    monkeypatch.setattr(marketplace_service, "extract_text_async", fake_ocr)
+
+    session = _Session([_Product("p1", "8901234")])
+    verified = await marketplace_service.scan_product(session, "farmer-1", image_base64="aW1n")
+    assert verified["verification_result"] == "VERIFIED"
+    assert ocr_calls == []
+
+    session.products.clear()
+    index.invalidate()
+    unregistered = await marketplace_service.scan_product(session, "farmer-1", image_base64="aW1n")
+    assert unregistered["verification_result"] == "MATCH_FOUND"
+    assert len(ocr_calls) == 1
+
+
+def test_barcode_retries_full_resolution_only_on_miss(monkeypatch):
+    sizes = []
+
+    def fake_decode(image):
+        sizes.append(image.size)
+        return "8901234" if image.size[0] > 1024 else None
+
+    monkeypatch.setattr(barcode_service, "_decode_gray", fake_decode)
+    buf = io.BytesIO()
+    Image.new("RGB", (3000, 2000), "white").save(buf, format="JPEG")
+
+    assert barcode_service.decode_barcode_bytes(buf.getvalue()) == "8901234"
+    assert sizes == [(1024, 683), (3000, 2000)]
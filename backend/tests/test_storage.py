@@ -0,0 +1,141 @@
+"""Unit tests for the sharded local file store and upload ingestion."""
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.storage import FileStore
+
+
+def test_put_bytes_shards_by_content_hash_and_dedupes(tmp_path):
+    store = FileStore(str(tmp_path))
+
+    path = store.put_bytes("audio", b"voice-note", ".webm")
+    again = store.put_bytes("audio", b"voice-note", ".webm")
+
+    name = os.path.basename(path)
+    assert path == again
+    assert path == os.path.join(store.root, "audio", name[:2], name[2:4], name)
+    assert store.find("audio", name) == path
+    assert store.find("tts", name) is None
+    assert store.usage("audio") == {"files": 1, "bytes": len(b"voice-note")}
+
+
+def test_gc_applies_retention_per_kind_and_keeps_legacy(tmp_path):
+    store = FileStore(str(tmp_path))
+    now = time.time()
+    old_tts = store.put_bytes("tts", b"old clip", ".mp3", "tts_")
+    fresh_tts = store.put_bytes("tts", b"new clip", ".mp3", "tts_")
+    old_audio = store.put_bytes("audio", b"old upload", ".webm")
+    qr = store.put_bytes("qr", b"png", ".png", "qr_")
+    photo = store.put_bytes("image", b"jpeg", ".jpg")
+    legacy = tmp_path / "abc.webm"
+    legacy.write_bytes(b"legacy")
+    for path in (old_tts, qr, photo):
+        os.utime(path, (now - 10 * 86400, now - 10 * 86400))
+    os.utime(old_audio, (now - 10 * 86400, now - 10 * 86400))
+    os.utime(legacy, (now - 400 * 86400, now - 400 * 86400))
+
+    stats = store.gc(now=now)
+
+    assert not os.path.exists(old_tts) and os.path.exists(fresh_tts)
+    assert os.path.exists(old_audio)  # within its 30 day retention
+    assert os.path.exists(qr)  # kept forever
+    os.utime(photo, (now - 400 * 86400, now - 400 * 86400))
+    store.gc(now=now)
+    assert os.path.exists(photo)  # referenced by photo_url rows, kept forever
+    assert legacy.exists()  # loose pre-sharding uploads are never swept
+    assert stats["tts"]["deleted"] == 1 and stats["tts"]["files"] == 1
+    assert not os.path.exists(os.path.dirname(old_tts)) or os.listdir(os.path.dirname(old_tts))
+
+
+def test_gc_never_touches_state_dirs(monkeypatch, tmp_path):
+    monkeypatch.setenv("STORAGE_RETENTION_STATE_DAYS", "1")
+    store = FileStore(str(tmp_path), retention_days={"audio": 30})
+    old = time.time() - 90 * 86400
+    for name in ("state", "vector_index"):
+        (tmp_path / name).mkdir()
+        path = tmp_path / name / "cache.sqlite3"
+        path.write_bytes(b"db")
+        os.utime(path, (old, old))
+
+    stats = store.gc()
+
+    assert (tmp_path / "state" / "cache.sqlite3").exists()
+    assert (tmp_path / "vector_index" / "cache.sqlite3").exists()
+    assert "state" not in stats
+
+
+def test_gc_enforces_quota_lru_first(tmp_path):
+    store = FileStore(str(tmp_path), retention_days={}, quotas_bytes={"image": 25})
+    paths = [store.put_bytes("image", bytes([i]) * 10, ".jpg") for i in range(3)]
+    for age, path in zip((30, 20, 10), paths):
+        os.utime(path, (time.time() - age, time.time() - age))
+
+    store.gc()
+
+    assert [os.path.exists(p) for p in paths] == [False, True, True]
+
+
+class FakeUpload:
+    def __init__(self, data, filename="note.webm"):
+        self.data = data
+        self.filename = filename
+        self.size = None
+        self.reads = []
+
+    async def read(self, size=-1):
+        chunk, self.data = (self.data, b"") if size < 0 else (self.data[:size], self.data[size:])
+        self.reads.append(len(chunk))
+        return chunk
+
+
+@pytest.mark.asyncio
+async def test_save_audio_local_streams_in_chunks_and_names_by_hash(monkeypatch, tmp_path):
+    from app import storage
+    from app.api import utils
+
+    monkeypatch.setattr(storage, "_file_store", FileStore(str(tmp_path)))
+    monkeypatch.setattr(utils, "UPLOAD_CHUNK_BYTES", 4)
+    upload = FakeUpload(b"0123456789")
+
+    path = await utils.save_audio_local(upload)
+
+    assert max(upload.reads) <= 4
+    assert storage.content_hash(path) == hashlib.sha256(b"0123456789").hexdigest()
+    assert path.endswith(".webm")
+    with open(path, "rb") as f:
+        assert f.read() == b"0123456789"
+
+
+@pytest.mark.asyncio
+async def test_save_audio_local_rejects_oversize_while_streaming(monkeypatch, tmp_path):
+    from fastapi import HTTPException
+    from app import storage
+    from app.api import utils
+
+    monkeypatch.setattr(storage, "_file_store", FileStore(str(tmp_path)))
+    monkeypatch.setattr(utils, "UPLOAD_CHUNK_BYTES", 4)
+    monkeypatch.setattr(utils, "MAX_AUDIO_BYTES", 8)
+    upload = FakeUpload(b"0123456789abcdef")
+
+    with pytest.raises(HTTPException) as exc:
+        await utils.save_audio_local(upload)
+
+    assert exc.value.status_code == 413
+    assert sum(upload.reads) == 12  # stopped at the first chunk past the limit
+    assert storage.get_file_store().usage("audio")["files"] == 0
+    assert not [f for _, _, files in os.walk(tmp_path) for f in files]
+
+
+def test_gc_removes_stale_temp_files_of_kept_kinds(tmp_path):
+    store = FileStore(str(tmp_path))
+    tmp = store.temp_path("image")
+    with open(tmp, "wb") as f:
+        f.write(b"partial")
+    now = time.time()
+    os.utime(tmp, (now - 7200, now - 7200))
+
+    assert store.gc(now=now)["image"]["deleted"] == 1
+    assert not os.path.exists(tmp)
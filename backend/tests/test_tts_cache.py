@@ -0,0 +1,184 @@
+"""Unit tests for TTS caching and sentence-level streaming."""
+import os
+
+import pytest
+
+from app import storage
+from app.core.metrics import metrics
+from app.services import phrase_bank, tts, tts_backends
+
+
+class FakeGTTS:
+    calls = 0
+
+    def __init__(self, text, lang="bn", tld="com"):
+        self.text = text
+
+    def save(self, path):
+        FakeGTTS.calls += 1
+        with open(path, "wb") as f:
+            f.write(b"ID3" + self.text.encode("utf-8").ljust(197, b"\0")[:197])
+
+
+def _use_cache_dir(monkeypatch, tmp_path, max_bytes=10_000_000):
+    FakeGTTS.calls = 0
+    metrics.reset()
+    monkeypatch.setattr(tts_backends, "gTTS", FakeGTTS)
+    monkeypatch.setattr(tts, "get_phrase_bank", lambda: None)
+    monkeypatch.setattr(storage, "_file_store", storage.FileStore(str(tmp_path)))
+    monkeypatch.setattr(tts, "TTS_CACHE_MAX_BYTES", max_bytes)
+    monkeypatch.setattr(tts, "_cache_bytes", None)
+
+
+def test_identical_text_reuses_cached_file(monkeypatch, tmp_path):
+    _use_cache_dir(monkeypatch, tmp_path)
+
+    first = tts.synthesize_tts("**আমি বুঝতে পারিনি**", lang="bn")
+    second = tts.synthesize_tts("আমি বুঝতে পারিনি", lang="bn")
+    other_lang = tts.synthesize_tts("আমি বুঝতে পারিনি", lang="en")
+
+    assert first == second != other_lang
+    assert FakeGTTS.calls == 2
+    assert metrics.counter("tts_cache_hits") == 1
+    assert metrics.counter("tts_cache_misses") == 2
+    assert os.path.dirname(first).startswith(str(tmp_path / "tts"))
+    assert not [f for _, _, files in os.walk(tmp_path) for f in files if f.endswith(".tmp")]
+
+
+def test_cache_evicts_least_recently_used(monkeypatch, tmp_path):
+    _use_cache_dir(monkeypatch, tmp_path, max_bytes=450)
+
+    old = tts.synthesize_tts("প্রথম উত্তর")
+    os.utime(old, (1, 1))
+    recent = tts.synthesize_tts("দ্বিতীয় উত্তর")
+    os.utime(recent, (2, 2))
+    tts.synthesize_tts("তৃতীয় উত্তর")
+
+    assert not os.path.exists(old)
+    assert os.path.exists(recent)
+    assert metrics.counter("tts_cache_evictions") >= 1
+
+
+def test_sentence_segmenter_releases_complete_sentences():
+    segmenter = tts.SentenceSegmenter()
+    assert segmenter.feed("ধান রোপণ করুন। সার ") == ["ধান রোপণ করুন।"]
+    assert segmenter.feed("দিন. Water it? ") == ["সার দিন.", "Water it?"]
+    assert segmenter.flush() == []
+    assert tts.split_sentences("এক। দুই. তিন") == ["এক।", "দুই.", "তিন"]
+
+
+@pytest.mark.asyncio
+async def test_sentence_tts_stream_yields_segments_in_order(monkeypatch):
+    import asyncio
+    import time
+
+    def fake_generate_tts(text, language="bn"):
+        time.sleep(0.05 if text == "প্রথম।" else 0.0)
+        if text == "ভুল।":
+            raise RuntimeError("synthesis failed")
+        return f"/tmp/{text}.mp3"
+
+    monkeypatch.setattr(tts, "generate_tts", fake_generate_tts)
+    stream = tts.SentenceTTSStream(language="bn", concurrency=2)
+    for sentence in ["প্রথম।", "ভুল।", "তৃতীয়।"]:
+        stream.add(sentence)
+
+    await asyncio.sleep(0.01)
+    assert stream.ready() == []  # the slow first sentence holds back later ones
+    segments = [s async for s in stream.drain()]
+
+    assert [s["index"] for s in segments] == [0, 2]
+    assert segments[1]["path"] == "/tmp/তৃতীয়।.mp3"
+
+
+def _write_wav(path, n_frames):
+    import wave
+    with wave.open(str(path), "wb") as clip:
+        clip.setparams((1, 2, 16000, 0, "NONE", "not compressed"))
+        clip.writeframes(b"\x01\x00" * n_frames)
+
+
+def test_phrase_bank_assembles_fully_covered_text(monkeypatch, tmp_path):
+    import json
+    import wave
+
+    bank_dir = tmp_path / "bank"
+    bank_dir.mkdir()
+    _write_wav(bank_dir / "a.wav", 100)
+    _write_wav(bank_dir / "b.wav", 50)
+    _write_wav(bank_dir / "c.wav", 30)
+    (bank_dir / "manifest.json").write_text(json.dumps({
+        "lang": "bn", "format": "wav", "voice": tts_backends.EspeakBackend().voice,
+        "phrases": {"ধানে": "a.wav", "২৫ কেজি": "b.wav", "ইউরিয়া দিন।": "c.wav"},
+    }), encoding="utf-8")
+    bank = phrase_bank.PhraseBank.load(str(bank_dir))
+
+    assert bank.match("ধানে ২৫ কেজি ইউরিয়া দিন", "bn") == [str(bank_dir / n) for n in ("a.wav", "b.wav", "c.wav")]
+    assert bank.match("ধানে ৩০ কেজি ইউরিয়া দিন", "bn") is None
+    assert bank.match("ধানে", "en") is None
+
+    _use_cache_dir(monkeypatch, tmp_path / "cache")
+    monkeypatch.setattr(tts, "get_phrase_bank", lambda: bank)
+    monkeypatch.setattr(tts, "get_backend_chain", lambda: [tts_backends.GTTSBackend(), tts_backends.EspeakBackend()])
+    path = tts.synthesize_tts("ধানে ২৫ কেজি ইউরিয়া দিন।", lang="bn")
+
+    assert path.endswith(".wav") and FakeGTTS.calls == 0
+    with wave.open(path, "rb") as clip:
+        assert clip.getnframes() == 180
+    assert metrics.counter("tts_phrase_bank_hits") == 1
+    # Cached under the espeak voice the bank was rendered with, not the primary gTTS voice
+    cleaned = tts.clean_text_for_tts("ধানে ২৫ কেজি ইউরিয়া দিন।")
+    assert tts._cache_lookup(tts.tts_cache_key(cleaned, "bn", bank.voice)) == path
+    assert tts._cache_lookup(tts.tts_cache_key(cleaned, "bn", tts_backends.GTTSBackend().voice)) is None
+
+    # A bank rendered with a voice that is not configured is ignored
+    bank.voice = "espeak:other:120"
+    other = tts.synthesize_tts("২৫ কেজি ইউরিয়া দিন।", lang="bn")
+    assert other.endswith(".mp3") and FakeGTTS.calls == 1
+
+
+def test_raw_text_render_is_not_cached_under_the_cleaned_key(monkeypatch, tmp_path):
+    _use_cache_dir(monkeypatch, tmp_path)
+
+    class CleanedTextFails(tts_backends.GTTSBackend):
+        def synthesize(self, text, lang, path):
+            if text == "বাদামি দাগ":
+                raise RuntimeError("rejected")
+            super().synthesize(text, lang, path)
+
+    monkeypatch.setattr(tts, "get_backend_chain", lambda: [CleanedTextFails()])
+    path = tts.synthesize_tts("**বাদামি দাগ**")
+
+    cleaned_key = tts.tts_cache_key("বাদামি দাগ", "bn", CleanedTextFails().voice)
+    assert os.path.exists(path) and cleaned_key not in path
+    assert tts._cache_lookup(cleaned_key) is None
+
+
+def test_offline_fallback_clip_is_not_served_for_the_primary_voice(monkeypatch, tmp_path):
+    _use_cache_dir(monkeypatch, tmp_path)
+
+    class FakeEspeak(tts_backends.EspeakBackend):
+        def synthesize(self, text, lang, path):
+            with open(path, "wb") as f:
+                f.write(b"RIFF" + b"\0" * 60)
+
+    class OfflineGTTS:
+        def __init__(self, *args, **kwargs):
+            raise ConnectionError("no network")
+
+    monkeypatch.setattr(tts, "get_backend_chain", lambda: [tts_backends.GTTSBackend(), FakeEspeak()])
+    monkeypatch.setattr(tts_backends, "gTTS", OfflineGTTS)
+    during_outage = tts.synthesize_tts("সেচ দিন")
+    assert during_outage.endswith(".wav")
+
+    monkeypatch.setattr(tts_backends, "gTTS", FakeGTTS)
+    assert tts.synthesize_tts("সেচ দিন").endswith(".mp3")
+    assert FakeGTTS.calls == 1
+
+
+def test_backends_must_implement_synthesize():
+    class Incomplete(tts_backends.TTSBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
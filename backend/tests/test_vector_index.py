@@ -0,0 +1,135 @@
+"""Unit tests for the in-process vector index."""
+import uuid
+
+import numpy as np
+import pytest
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, MetaData, String, Table
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import declarative_base
+
+from app.utils import vector_index, vector_utils
+from app.utils.vector_index import VectorIndex, index_key
+from app.utils.vector_utils import _matches_database
+
+
+def _vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_brute_force_matches_exact_cosine():
+    data = _vectors(500)
+    index = VectorIndex(16, directory=None)
+    index.add_many(list(range(500)), data)
+
+    query = data[42] + 0.01
+    hits = index.search(query, k=5)
+
+    normed = data / np.linalg.norm(data, axis=1, keepdims=True)
+    expected = np.argsort(-(normed @ (query / np.linalg.norm(query))))[:5]
+    assert [int(i) for i, _ in hits] == list(expected)
+    assert hits[0][1] > 0.99
+    assert index.search(query, k=5, threshold=0.999) == hits[:1]
+
+
+def test_incremental_remove_and_update():
+    data = _vectors(10)
+    ids = [uuid.uuid4() for _ in range(10)]
+    index = VectorIndex(16, directory=None)
+    index.add_many(ids, data)
+
+    assert index.remove(ids[3])
+    assert ids[3] not in index and len(index) == 9
+    assert all(hit != index_key(ids[3]) for hit, _ in index.search(data[3], k=9))
+
+    index.add(ids[0], data[5])  # re-embedding replaces the vector in place
+    assert len(index) == 9
+    top_two = {hit for hit, _ in index.search(data[5], k=2)}
+    assert top_two == {index_key(ids[0]), index_key(ids[5])}
+
+
+def test_persists_and_reloads(tmp_path):
+    data = _vectors(50)
+    index = VectorIndex(16, name="community_questions.embedding", directory=str(tmp_path))
+    index.add_many([f"q{i}" for i in range(50)], data)
+    index.save()
+
+    loaded = VectorIndex(16, name="community_questions.embedding", directory=str(tmp_path))
+    assert loaded.load()
+    assert len(loaded) == 50
+    assert loaded.search(data[7], k=1)[0][0] == "q7"
+    assert not VectorIndex(16, name="missing", directory=str(tmp_path)).load()
+
+
+def test_stamp_mismatch_forces_rebuild(tmp_path):
+    index = VectorIndex(16, name="q", directory=str(tmp_path), meta={"model": "old-model"})
+    index.add_many(["a", "b"], _vectors(2))
+    index.save()
+
+    assert VectorIndex(16, name="q", directory=str(tmp_path), meta={"model": "old-model"}).load()
+    assert not VectorIndex(16, name="q", directory=str(tmp_path), meta={"model": "new-model"}).load()
+
+
+def test_save_does_not_overwrite_a_file_rewritten_elsewhere(tmp_path):
+    app_index = VectorIndex(16, name="q", directory=str(tmp_path))
+    app_index.add_many(["a"], _vectors(1, seed=1))
+    app_index.save()
+    script_index = VectorIndex(16, name="q", directory=str(tmp_path))
+    assert script_index.load()
+    script_index.add_many(["a"], _vectors(1, seed=2))
+    assert script_index.save()
+
+    app_index.add_many(["b"], _vectors(1, seed=3))
+    assert app_index.changed_on_disk()
+    assert not app_index.save()
+    reloaded = VectorIndex(16, name="q", directory=str(tmp_path))
+    assert reloaded.load() and len(reloaded) == 1
+    assert np.allclose(reloaded.vector("a") * np.linalg.norm(_vectors(1, seed=2)), _vectors(1, seed=2)[0], atol=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_sample_check_detects_vectors_from_another_model(bare_schema):
+    table = await bare_schema.create(
+        Table("items", MetaData(), Column("id", String, primary_key=True), Column("embedding", Vector(16)))
+    )
+    async with bare_schema.engine.begin() as conn:
+        await conn.execute(table.insert(), [{"id": f"q{i}", "embedding": v} for i, v in enumerate(_vectors(5, seed=1))])
+    index = VectorIndex(16, directory=None)
+    index.add_many([f"q{i}" for i in range(5)], _vectors(5, seed=1))
+
+    async with AsyncSession(bare_schema.engine) as session:
+        assert await _matches_database(session, table, table.c.embedding, index)
+        index.add("q3", _vectors(1, seed=9)[0])  # re-embedded in the database, not in this index
+        assert not await _matches_database(session, table, table.c.embedding, index)
+
+
+@pytest.mark.asyncio
+async def test_index_follows_commits_not_rolled_back_flushes(monkeypatch, bare_schema):
+    monkeypatch.setattr(vector_utils, "USE_LOCAL_INDEX", True)
+    monkeypatch.setattr(vector_utils, "_tracked", {})
+    monkeypatch.setattr(vector_index, "_indexes", {})
+
+    class Item(declarative_base()):
+        __tablename__ = "tracked_items"
+        id = Column(String, primary_key=True)
+        embedding = Column(Vector(16))
+
+    vector_utils.track_embeddings(Item, "embedding", 16)
+    await bare_schema.create(Item)
+    index = vector_utils._local_index("tracked_items.embedding")
+    vectors = _vectors(2, seed=4)
+
+    async with AsyncSession(bare_schema.engine) as session:
+        session.add(Item(id="kept", embedding=vectors[0]))
+        await session.commit()
+        session.add(Item(id="phantom", embedding=vectors[1]))
+        await session.flush()
+        assert index.keys() == ["kept"]  # flushed but not committed yet
+        await session.rollback()
+    assert index.keys() == ["kept"]
+
+    async with AsyncSession(bare_schema.engine) as session:
+        await session.delete(await session.get(Item, "kept"))
+        await session.flush()
+        await session.rollback()
+    assert index.keys() == ["kept"]
@@ -0,0 +1,125 @@
+"""Unit tests for hedged vision tiers."""
+import asyncio
+import time
+
+import pytest
+
+from app.services import vision_service
+from app.services.vision_service import VisionService
+
+
+def _service(monkeypatch, hf, groq, budget=1.0, hedge=0.1):
+    monkeypatch.setattr(vision_service, "VISION_LATENCY_BUDGET_S", budget)
+    monkeypatch.setattr(vision_service, "VISION_HEDGE_DELAY_S", hedge)
+    svc = VisionService()
+    monkeypatch.setattr(svc, "_tier1_huggingface_async", hf)
+    monkeypatch.setattr(svc, "_tier2_groq_vision_async", groq)
+    monkeypatch.setattr(svc, "_tier3_cv2_damage", lambda path, crop: f"[Tier 3 — CV2] Damage: 40.0% for {crop}.")
+    return svc
+
+
+def _tier(result, delay):
+    async def run(image_path, task):
+        await asyncio.sleep(delay)
+        return result
+    return run
+
+
+@pytest.mark.asyncio
+async def test_slow_tier1_is_hedged_by_tier2(monkeypatch, tmp_path):
+    img = tmp_path / "leaf.jpg"
+    img.write_bytes(b"jpeg")
+    svc = _service(monkeypatch, _tier("hf", 5.0), _tier("[Tier 2 — Groq Vision] blight", 0.05))
+
+    start = time.perf_counter()
+    result = await svc.analyze_image_async(str(img), "disease")
+
+    assert "blight" in result
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_failed_tier1_starts_tier2_without_hedge_delay(monkeypatch, tmp_path):
+    img = tmp_path / "leaf.jpg"
+    img.write_bytes(b"jpeg")
+    svc = _service(monkeypatch, _tier(None, 0.0), _tier("DAMAGE_PERCENT: 30%", 0.0), hedge=5.0)
+
+    start = time.perf_counter()
+    result = await svc.assess_damage_async(str(img), "rice")
+
+    assert result.startswith("Groq Damage Assessment: 30.0%")
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_budget_exceeded_returns_local_baseline(monkeypatch, tmp_path):
+    img = tmp_path / "field.jpg"
+    img.write_bytes(b"jpeg")
+    svc = _service(monkeypatch, _tier("hf", 5.0), _tier("groq", 5.0), budget=0.3, hedge=0.1)
+
+    start = time.perf_counter()
+    result = await svc.assess_damage_async(str(img), "rice")
+
+    assert result.startswith("[Tier 3 — CV2]")
+    assert time.perf_counter() - start < 1.0
+
+
+def test_sync_wrapper_runs_from_worker_thread(monkeypatch, tmp_path):
+    img = tmp_path / "leaf.jpg"
+    img.write_bytes(b"jpeg")
+    svc = _service(monkeypatch, _tier("[Tier 1] rust", 0.0), _tier(None, 0.0))
+    assert svc.analyze_image(str(img), "disease") == "[Tier 1] rust"
+
+
+def _local(result, delay, cancelled=None):
+    async def run(image_path):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append("local")
+            raise
+        return result
+    return run
+
+
+@pytest.mark.asyncio
+async def test_confident_local_answer_cancels_remote_tiers(monkeypatch, tmp_path):
+    img = tmp_path / "leaf.jpg"
+    img.write_bytes(b"local-wins")
+    cancelled = []
+
+    async def hf(image_path, task):
+        try:
+            await asyncio.sleep(5.0)
+        except asyncio.CancelledError:
+            cancelled.append("hf")
+            raise
+
+    svc = _service(monkeypatch, hf, _tier(None, 0.0))
+    monkeypatch.setattr(svc, "_tier0_local_async", _local(("[Tier 0] blast", 0.95), 0.05))
+
+    start = time.perf_counter()
+    result = await svc.analyze_image_async(str(img), "disease")
+
+    assert result == "[Tier 0] blast"
+    assert time.perf_counter() - start < 0.5
+    await asyncio.sleep(0.05)  # let the cancellations propagate
+    assert cancelled == ["hf"]
+
+
+@pytest.mark.asyncio
+async def test_remote_tier_does_not_wait_for_slow_local_classifier(monkeypatch, tmp_path):
+    img = tmp_path / "leaf.jpg"
+    img.write_bytes(b"remote-wins")
+    cancelled = []
+    svc = _service(monkeypatch, _tier("[Tier 1] rust", 0.05), _tier(None, 0.0))
+    monkeypatch.setattr(svc, "_tier0_local_async", _local(("[Tier 0] blast", 0.95), 5.0, cancelled))
+
+    start = time.perf_counter()
+    result = await svc.analyze_image_async(str(img), "disease")
+
+    assert result == "[Tier 1] rust"
+    assert time.perf_counter() - start < 0.5
+    await asyncio.sleep(0.05)  # let the cancellations propagate
+    assert cancelled == ["local"]
@@ -107,6 +107,8 @@ export default function ChatPage() {
   const fileInputRef = useRef(null);
   const bottomRef = useRef(null);
   const audioRef = useRef(null); // single Audio instance reused
+  const audioQueueRef = useRef([]); // clips still to play for the current message
+  const playingIdxRef = useRef(null); // playingIdx, readable from streaming callbacks
 
   // ── Helpers ────────────────────────────────
 
@@ -116,25 +118,66 @@ export default function ChatPage() {
     localStorage.setItem('kb_tts_enabled', String(val));
   };
 
-  /** Play the TTS file for a message. Stops any currently playing audio first. */
-  const playTts = useCallback((tts_path, msgIdx) => {
-    if (!tts_path) return;
+  const stopAudio = () => {
     if (audioRef.current) {
       audioRef.current.pause();
       audioRef.current.onended = null;
       audioRef.current.onerror = null;
     }
-    const audio = new Audio(`/api/get_tts?path=${encodeURIComponent(tts_path)}`);
+    audioRef.current = null;
+    audioQueueRef.current = [];
+  };
+
+  const finishPlayback = () => {
+    audioRef.current = null;
+    playingIdxRef.current = null;
+    setPlayingIdx(null);
+  };
+
+  /** Play the next queued clip; the queue drains one clip after another. */
+  const playNext = useCallback(() => {
+    const path = audioQueueRef.current.shift();
+    if (!path) {
+      finishPlayback();
+      return;
+    }
+    // On 2G/3G ask for the low-bitrate Opus rendition
+    const slowLink = ['slow-2g', '2g', '3g'].includes(navigator.connection?.effectiveType);
+    const audio = new Audio(`/api/get_tts?path=${encodeURIComponent(path)}${slowLink ? '&format=opus' : ''}`);
     audioRef.current = audio;
-    setPlayingIdx(msgIdx);
+    audio.onended = playNext;
+    audio.onerror = playNext; // skip a clip that fails to load
     audio.play().catch(() => {
       // Autoplay policy blocked it – silently ignore
-      setPlayingIdx(null);
+      stopAudio();
+      finishPlayback();
     });
-    audio.onended = () => setPlayingIdx(null);
-    audio.onerror = () => setPlayingIdx(null);
   }, []);
 
+  /**
+   * Play a message's TTS: one file, or the sentence clips of a streamed reply
+   * in order. Stops any currently playing audio first.
+   */
+  const playTts = useCallback((paths, msgIdx) => {
+    const queue = [].concat(paths ?? []).filter(Boolean);
+    if (!queue.length) return;
+    stopAudio();
+    audioQueueRef.current = queue;
+    playingIdxRef.current = msgIdx;
+    setPlayingIdx(msgIdx);
+    playNext();
+  }, [playNext]);
+
+  /** Queue a streamed sentence clip behind the ones already playing for that message. */
+  const enqueueTts = useCallback((path, msgIdx) => {
+    if (playingIdxRef.current === msgIdx && audioRef.current) {
+      audioQueueRef.current.push(path);
+    } else if (playingIdxRef.current === null || playingIdxRef.current === msgIdx) {
+      playTts(path, msgIdx);
+    }
+    // Otherwise the user is replaying another message; the clip stays available for replay
+  }, [playTts]);
+
   /** Called after every API response with a tts_path */
   const maybeAutoPlay = useCallback(
     (tts_path, msgIdx) => {
@@ -146,13 +189,7 @@ export default function ChatPage() {
   );
 
   // Cleanup audio on unmount
-  useEffect(() => {
-    return () => {
-      if (audioRef.current) {
-        audioRef.current.pause();
-      }
-    };
-  }, []);
+  useEffect(() => stopAudio, []);
 
   // ── Banner handlers ─────────────────────────
   const handleBannerEnable = () => {
@@ -193,6 +230,7 @@ export default function ChatPage() {
       { role: 'assistant', content: '', ts: Date.now(), streaming: true },
     ]);
 
+    const replyIdx = messages.length + 1;
     try {
       await streamChat(
         text,
@@ -224,7 +262,7 @@ export default function ChatPage() {
           });
           setLoading(false);
           if (tts_path) {
-            setTimeout(() => maybeAutoPlay(tts_path, messages.length + 1), 50);
+            setTimeout(() => maybeAutoPlay(tts_path, replyIdx), 50);
           }
         },
         /* onError */ (errMsg) => {
@@ -249,7 +287,24 @@ export default function ChatPage() {
             return copy;
           });
           setLoading(false);
-        }
+        },
+        /* onAudio */ ttsEnabled
+          ? (segment) => {
+              // Sentence clips arrive while the text streams; play them as they come
+              setMessages((m) => {
+                const copy = [...m];
+                const last = copy[copy.length - 1];
+                if (last?.streaming) {
+                  copy[copy.length - 1] = {
+                    ...last,
+                    tts_segments: [...(last.tts_segments ?? []), segment.path],
+                  };
+                }
+                return copy;
+              });
+              enqueueTts(segment.path, replyIdx);
+            }
+          : null
       );
     } catch (err) {
       /* Catch unexpected rejections */
@@ -401,11 +456,11 @@ export default function ChatPage() {
                   </div>
 
                   {/* Per-message replay button for assistant messages */}
-                  {msg.role === 'assistant' && !msg.error && msg.tts_path && (
+                  {msg.role === 'assistant' && !msg.error && (msg.tts_path || msg.tts_segments?.length > 0) && (
                     <button
                       id={`tts-replay-${i}`}
                       className={`tts-replay-btn ${playingIdx === i ? 'tts-replay-btn--playing' : ''}`}
-                      onClick={() => playTts(msg.tts_path, i)}
+                      onClick={() => playTts(msg.tts_path ?? msg.tts_segments, i)}
                       title="Replay audio"
                       aria-label="Replay audio"
                     >
@@ -179,6 +179,7 @@ function BrowseTab() {
   const [posts, setPosts] = useState([]);
   const [page, setPage] = useState(1);
   const [hasMore, setHasMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
@@ -186,7 +187,7 @@ function BrowseTab() {
   const reqId = useRef(0);
 
   const fetchPage = useCallback(
-    async (pageNum, append) => {
+    async (pageNum, append, cursor) => {
       const id = ++reqId.current;
       if (append) setLoadingMore(true);
       else {
@@ -199,12 +200,14 @@ function BrowseTab() {
           crop: crop || undefined,
           sort,
           page: pageNum,
+          cursor: append ? cursor : undefined,
         });
         if (id !== reqId.current) return; // a newer request superseded this one
         const next = data.posts || [];
         setPosts((prev) => (append ? [...prev, ...next] : next));
         setPage(pageNum);
         setHasMore(!!data.has_more);
+        setNextCursor(data.next_cursor || null);
       } catch (e) {
         if (id !== reqId.current) return;
         setError(e.message || t(`${CK}.failed`));
@@ -246,6 +249,7 @@ function BrowseTab() {
             {[
               ['new', `🕒 ${t(`${CK}.sort_new`)}`],
               ['top', `🔥 ${t(`${CK}.sort_top`)}`],
+              ['hot', `📈 ${t(`${CK}.sort_hot`)}`],
             ].map(([key, label]) => (
               <button
                 key={key}
@@ -292,7 +296,7 @@ function BrowseTab() {
           </div>
           {hasMore && (
             <button
-              onClick={() => fetchPage(page + 1, true)}
+              onClick={() => fetchPage(page + 1, true, nextCursor)}
               disabled={loadingMore}
               className="btn-outline w-full !py-2.5 flex items-center justify-center gap-2"
             >
@@ -109,13 +109,16 @@ export const postChat = (message, lat, lon, image, signal) => {
  * @param {function} onChunk  - Called with each text chunk string
  * @param {function} onDone   - Called with the full reply text when stream ends
  * @param {function} onError  - Called with an error message string on failure
+ * @param {function} [onAudio] - If given, requests sentence-level TTS and is called
+ *                               with each {index, text, path} audio segment, in order
  * @returns {Promise<void>}
  */
-export async function streamChat(message, lat, lon, onChunk, onDone, onError) {
+export async function streamChat(message, lat, lon, onChunk, onDone, onError, onAudio = null) {
   const formData = new FormData();
   formData.append('message', message);
   if (lat != null) formData.append('lat', lat);
   if (lon != null) formData.append('lon', lon);
+  if (onAudio) formData.append('tts', 'true');
 
   const token = localStorage.getItem('kb_auth_token');
   const lang = localStorage.getItem('kb_lang') || 'bn';
@@ -160,6 +163,7 @@ export async function streamChat(message, lat, lon, onChunk, onDone, onError) {
           try {
             const data = JSON.parse(line.slice(6));
             if (data.type === 'chunk') onChunk(data.text);
+            else if (data.type === 'audio') onAudio?.(data);
             else if (data.type === 'done') onDone(data.full_text);
             else if (data.type === 'error') onError(data.message);
             // 'thinking' events are intentionally ignored here (UI handles loading state)
@@ -275,12 +279,14 @@ export const postCommunityAnswer = (questionId, data) =>
   request('POST', `/api/community/questions/${questionId}/answers`, { body: data });
 
 // New /posts surface — discovery feed, AI answers, toggle upvotes, replies.
-export const getCommunityPosts = ({ district, crop, sort = 'new', page = 1 } = {}, signal) => {
+// Pass the previous response's next_cursor to load the following page.
+export const getCommunityPosts = ({ district, crop, sort = 'new', page = 1, cursor } = {}, signal) => {
   const params = new URLSearchParams();
   if (district) params.set('district', district);
   if (crop) params.set('crop', crop);
   if (sort) params.set('sort', sort);
   params.set('page', page);
+  if (cursor) params.set('cursor', cursor);
   return request('GET', `/api/community/posts?${params.toString()}`, { signal });
 };
 
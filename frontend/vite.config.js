@@ -34,6 +34,17 @@ export default defineConfig({
             handler: 'NetworkFirst',
             options: { cacheName: 'alerts-api', expiration: { maxEntries: 20, maxAgeSeconds: 1800 } },
           },
+          {
+            // TTS clips are content-addressed and served with immutable caching
+            urlPattern: /\/api\/get_tts/,
+            handler: 'CacheFirst',
+            options: {
+              cacheName: 'tts-audio',
+              rangeRequests: true,
+              cacheableResponse: { statuses: [200] },
+              expiration: { maxEntries: 200, maxAgeSeconds: 86400 * 30 },
+            },
+          },
           {
             urlPattern: /\/api\//,
             handler: 'NetworkFirst',